@@ -0,0 +1,27 @@
+""" 
+    This program provides a user-interface to play a simplified RPG.
+    The types of items and their stats are read from a file.
+    The user interactively chooses their equipment and determines how best to use their items.
+    The program governs turn order, enemies, and their actions, 
+    creating a complete log in the designated output file.
+
+    The game is a package so it can be imported without side effects: nothing is opened,
+    read or asked for until a game is started, so tools and worker processes can use the
+    combat core as a library. It is split into
+        models - the Inventory and the characters (Character, Player and Enemy).
+        items - reading items and enemy templates and generating enemies and their gear.
+        combat - the Battle state machine and playing a battle on the console.
+        console - messages, the battle log, the player's responses, events and traces.
+        cli - main(), the interactive game, run with python -m RPG.
+    Everything is also available from the package itself (from RPG import Player).
+"""
+
+from RPG.console import (SEPARATOR, say, log, consoleSink, attachSink, detachSink, setSinks, setLog, event,
+                         setEvents, askNumber, askYesNo, setInput, setTrace)
+from RPG.models import Inventory, Character, Player, Enemy, REPLACE_PROMPT, gearStats, invalidateGear
+from RPG.items import (readItems, randomizeEnemyOrder, generateGear, GEAR_ODDS, gearOutcome, generateEnemies,
+                       readEnemies, generateWave)
+from RPG.combat import (FIGHT_START, PLAYER_TURN, ENEMY_TURN, FIGHT_END, LOOT, OVER, PHASE_NAMES, PLAYER_OPTIONS,
+                        Battle, battle, playBattle, playPhase, showOptions, playerChoice, showLoot, takeLoot,
+                        setProfiler)
+from RPG.cli import main, showStartingItems
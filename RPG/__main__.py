@@ -0,0 +1,7 @@
+"""
+    Plays the game on the console: python -m RPG
+"""
+
+from RPG.cli import main
+
+main()
@@ -0,0 +1,85 @@
+"""
+    The interactive game: main() asks for a hero, a starting item and every choice on the
+    console and writes the game to battle-log.txt. Run it with python -m RPG.
+"""
+
+from rng import GameRandom
+from RPG import console
+from RPG.console import SEPARATOR, say, log, setLog, askNumber
+from RPG.models import Player
+from RPG.items import readItems, readEnemies, generateEnemies
+from RPG.combat import battle
+
+#------------------------------ Main ------------------------------
+
+def main(seed = None):
+    """ 
+        The main function for user interface (including nested methods) and input/output and enemy generation. 
+        The whole game is rolled from one GameRandom, so giving a seed replays the same characters, 
+        enemies and dice for the same choices.
+    """
+    # Open battle-log.txt for this game unless a log has already been set with setLog().
+    ownsLog = console.battleLog is None
+    if ownsLog:
+        from battlelog import BattleLog
+        setLog(BattleLog("battle-log.txt"))
+    if console.eventStream is not None:
+        console.eventStream.startGame()
+
+    say(SEPARATOR)
+    name = console.readInput("Enter a name for your hero: ")
+    log("Hero: {}", name)
+    rng = GameRandom(seed)
+    if console.traceWriter is not None:
+        console.traceWriter.startGame(rng.seedValue, name)
+    player = Player(name, rng)
+    say(SEPARATOR)
+
+    itemList = readItems()
+    d = showStartingItems(itemList)
+    
+    itemIndex = askNumber("\nEnter a number: ")
+    log("\nEnter a number: {}", itemIndex)
+     # Add the player's chosen item to their inventory.
+    player.addItem(d.get(itemIndex))
+    say(SEPARATOR)
+    # Display stats and inventory at the begenning of the game.
+    player.getStats()
+    player.getInventory()
+
+    enemies = generateEnemies(itemList, readEnemies(), rng = rng)
+    # Potions grabbed and passed to battle for player use.
+    potion = itemList[2][0]
+    
+    result = battle(player, potion, enemies, rng) 
+    if console.traceWriter is not None:
+        console.traceWriter.endGame(result == "Victory!", player.health)
+    
+    say(result)
+    say(SEPARATOR)
+
+    if ownsLog:
+        setLog(None).close()
+
+def showStartingItems(itemList):
+    """
+        Lists every item of itemList as a numbered starting item and returns a dictionary of 
+        the items by number.
+    """
+    say("Choose a starting item:\n")
+
+    d = {}
+
+    listIndex = 0
+    # For each item in itemList add each as an option in the dictionary d.
+    for index, category in enumerate(itemList):
+        for item in category:
+            if index == 0:
+                say("{} {}, Damage: {}, Weight: {}", listIndex, item.name.capitalize(), item.stat, item.weight)
+            elif index == 1:
+                say("{} {}, Defense: {}, Weight: {}", listIndex, item.name.capitalize(), item.stat, item.weight)
+            else:
+                say("{} {}, Recovery: {}, Weight: {}", listIndex, item.name.capitalize(), item.stat, item.weight)
+            d.update({listIndex: item})
+            listIndex += 1
+    return d
@@ -0,0 +1,301 @@
+"""
+    Battles: the Battle state machine, stepped one action at a time, and playBattle(), which
+    plays one on the console one step at a time between the player's choices (the server's
+    sessions play the same steps, asking for each choice themselves). The steps report what
+    happens through say() and event(), which only reach the console's sinks and event stream:
+    detach those (setSinks(), setEvents()) to play battles headlessly as a library.
+"""
+
+from events import ATTACK, BLOCK, DEATH
+from RPG.console import SEPARATOR, say, log, event, askNumber
+from RPG.items import randomizeEnemyOrder
+
+#------------------------------ Battles ------------------------------
+
+# The phases of a Battle: an enemy is about to appear, the player or the enemy is to move, a 
+# fight has ended, the player is choosing loot, or the battle is over.
+FIGHT_START, PLAYER_TURN, ENEMY_TURN, FIGHT_END, LOOT, OVER = range(6)
+# What the time spent in each phase is reported as when profiling.
+PHASE_NAMES = ("description", "player turn", "enemy turn", "fight end", "loot", "over")
+# The options of the player's turn.
+PLAYER_OPTIONS = {0: "Attack", 1: "Use Health Potion", 2: "Run Away", 3: "Check Stats", 4: "Check Inventory"}
+
+class Battle:
+    """
+        The state of a battle as an object instead of battle()'s local variables, so it can be 
+        stepped one action at a time, paused between any two steps, and saved and restored 
+        (see snapshot.py). Each step moves the battle to its next phase. The steps only change 
+        the characters; showing what happened is left to the caller, so the same battle can 
+        be played on the console, by the server or headlessly.
+    """
+    __slots__ = ("player", "potion", "enemies", "index", "playerTurn", "ran", "phase", "loot", "result", "rng")
+
+    def __init__(self, player, potion, enemies, rng = None):
+        """
+            Starts a battle against enemies in a random order rolled with rng (the player's by 
+            default). potion is the health potion enemies can drop.
+        """
+        self.player = player
+        self.potion = potion
+        self.rng = rng if rng is not None else player.rng
+        self.enemies = randomizeEnemyOrder(enemies, self.rng)
+        self.index = 0
+        self.playerTurn = True
+        self.ran = False
+        self.phase = FIGHT_START if self.enemies else OVER
+        self.loot = None
+        self.result = None if self.enemies else "Victory!"
+
+    def enemy(self):
+        """
+            Returns the enemy being fought (or about to appear), or None once the battle is over.
+        """
+        return self.enemies[self.index] if self.index < len(self.enemies) else None
+
+    def lastEnemy(self):
+        """
+            Returns True if the enemy being fought is the last one (who can't be run from).
+        """
+        return self.index == len(self.enemies) - 1
+
+    def startFight(self):
+        """
+            FIGHT_START: the enemy has appeared. Turn order is decided by agility (the player 
+            wins ties).
+        """
+        self.playerTurn = self.player.agility >= self.enemy().agility
+        self.ran = False
+        self.advance()
+
+    def advance(self):
+        """
+            Moves to whoever's turn it is, or to FIGHT_END once either side is dead or the 
+            player has run.
+        """
+        enemy = self.enemies[self.index]
+        if self.player.health > 0 and enemy.health > 0 and not(self.ran):
+            self.phase = PLAYER_TURN if self.playerTurn else ENEMY_TURN
+        else:
+            self.phase = FIGHT_END
+
+    def endTurn(self, ran = False):
+        """
+            Ends the turn after the mover acted (ran is True if the player got away) and hands 
+            the turn over.
+        """
+        self.ran = ran
+        self.playerTurn = not(self.playerTurn)
+        self.advance()
+
+    def playerAttack(self):
+        """
+            PLAYER_TURN: the player attacks. Returns [damage, change in health, amount blocked].
+        """
+        damage = self.player.damageGen()
+        [modifier, blocked] = self.enemies[self.index].takeDamage(damage)
+        self.endTurn()
+        return [damage, modifier, blocked]
+
+    def enemyAttack(self):
+        """
+            ENEMY_TURN: the enemy attacks. Returns [damage, change in health, amount blocked].
+        """
+        damage = self.enemies[self.index].damageGen()
+        [modifier, blocked] = self.player.takeDamage(damage)
+        self.endTurn()
+        return [damage, modifier, blocked]
+
+    def finishFight(self):
+        """
+            FIGHT_END: the battle is lost if the player died. Otherwise the health potion is 
+            rolled (20% chance, even when nothing can be looted) and, unless the player ran or 
+            this was the last enemy, anything the enemy dropped is offered as loot.
+        """
+        if self.player.health <= 0:
+            self.phase = OVER
+            self.result = "Game Over!"
+            return
+        enemy = self.enemies[self.index]
+        healthPotion = self.potion if self.rng.randrange(0, 10) > 7 else None
+        loot = [item for item in (enemy.weapon, enemy.armor, healthPotion) if item is not None]
+        if loot and not(self.lastEnemy()) and not(self.ran):
+            self.loot = loot
+            self.phase = LOOT
+        else:
+            self.nextFight()
+
+    def nextFight(self):
+        """
+            LOOT (once the player has chosen) or FIGHT_END: moves on to the next enemy, or wins 
+            the battle after the last one.
+        """
+        self.loot = None
+        self.index += 1
+        if self.index < len(self.enemies):
+            self.phase = FIGHT_START
+        else:
+            self.phase = OVER
+            self.result = "Victory!"
+
+def battle(player, potion, enemies, rng = None):
+    """
+        It randomizes enemy order using randomizeEnemyOrder(). It then loops through those enemies, 
+        determining who goes first based on agility stats. So long as the player has not run and both 
+        the player and the enemy are still alive (health above 0), they will continue to battle. 
+        With each loop, on the player's turn, the player is given four choices, each rendered from 
+        PLAYER_OPTIONS. Checking stats or inventory does not take the player's turn but attempting to 
+        attack, use a health potion, or run away will. The enemy will always use their turn to attack. 
+        If the enemy dies, the player moves on to the next. If the player dies, it's game over. After 
+        the enemy dies, it will drop any weapons and armor it's carrying and has a chance to drop a health 
+        potion. Should the player defeat all the enemies, they win. The enemy order and loot are 
+        rolled with rng, which defaults to the player's. The battle itself is a Battle, stepped here 
+        one action at a time.
+    """
+    return playBattle(Battle(player, potion, enemies, rng))
+
+def playBattle(state):
+    """
+        Plays a Battle from whatever phase it is in (a new battle or one restored from a 
+        snapshot) to the end, asking the player for each choice, and returns the result.
+    """
+    player = state.player
+    timer = profiler
+    while state.phase != OVER:
+        if timer is not None:
+            phase = state.phase
+            started = timer.clock()
+        # On the players turn, checking stats or inventory does not take the turn, so the 
+        # player chooses again until they act.
+        if state.phase == PLAYER_TURN:
+            acted = False
+            while not(acted):
+                showOptions(player)
+                choice = askNumber("\nEnter a number: ")
+                log("\nEnter a number: {}", choice)
+                acted = playerChoice(state, choice)
+        # The enemy has something to loot.
+        elif state.phase == LOOT:
+            showLoot(state)
+            itemIndex = askNumber("\nEnter a number: ")
+            log("\nEnter a number: {}", itemIndex)
+            takeLoot(state, itemIndex)
+        else:
+            playPhase(state)
+        if timer is not None:
+            timer.record(PHASE_NAMES[phase], started)
+    return state.result
+
+#------------------------------ Steps ------------------------------
+# The steps of playBattle() between the player's choices, shared with the server's sessions, 
+# which ask for each choice themselves.
+
+def playPhase(state):
+    """
+        Plays a phase that needs no choice (an enemy appearing, the enemy's turn or the end of 
+        a fight) and shows what happened.
+    """
+    enemy = state.enemy()
+    player = state.player
+    if state.phase == FIGHT_START:
+        enemy.description()
+        state.startFight()
+    # It's the enemy's turn.
+    elif state.phase == ENEMY_TURN:
+        # Same logic as player attack, but for the enemy respectively.
+        [damage, modifier, blocked] = state.enemyAttack()
+        say("The {} attacked {} for {} points of damage.", enemy.name, player.name, damage)
+        say("{} points of damage were blocked.", blocked)
+        say("{} took {} points of damage and their health is now {}.", player.name, modifier, player.health)
+        event(ATTACK, 0, enemy.name, player.name, damage)
+        event(BLOCK, 1, player.name, enemy.name, blocked, modifier, player.health)
+        say(SEPARATOR)
+    elif state.phase == FIGHT_END:
+        state.finishFight()
+        if player.health <= 0:
+            event(DEATH, 1, player.name, enemy.name)
+        elif enemy.health <= 0:
+            event(DEATH, 0, enemy.name, player.name)
+
+def showOptions(player):
+    """
+        PLAYER_TURN: shows the options the player can choose from, each rendered from 
+        PLAYER_OPTIONS.
+    """
+    say("What would {} like to do?\n", player.name)
+    # Display each option from PLAYER_OPTIONS.
+    for key in PLAYER_OPTIONS:
+        say("{} {}", key, PLAYER_OPTIONS.get(key))
+
+def playerChoice(state, choice):
+    """
+        PLAYER_TURN: carries out the option the player chose. Returns True if it took the 
+        player's turn, or False if the player only checked their stats or inventory.
+    """
+    player = state.player
+    enemy = state.enemy()
+    say(SEPARATOR)
+    # If the player chooses a check option, display relevant information and allow 
+    # them to choose again since checking does not take a turn. 
+    if choice == 3:
+        player.getStats()
+        return False
+    elif choice == 4:
+        player.getInventory()
+        return False
+    # If the player chooses to attack... 
+    if choice == 0:
+        [damage, modifier, blocked] = state.playerAttack()
+        # Display results.
+        say("{} attacked the {} for {} points of damage.", player.name, enemy.name, damage)
+        say("{} points of damage were blocked.", blocked)
+        say("The {} took {} points of damage and its health is now {}.", enemy.name, modifier, enemy.health)
+        event(ATTACK, 1, player.name, enemy.name, damage)
+        event(BLOCK, 0, enemy.name, player.name, blocked, modifier, enemy.health)
+        say(SEPARATOR)
+    # Otherwise, if the player chooses to use a health potion, allow them to attempt to do so.
+    elif choice == 1:
+        player.useHealthPotion(state.potion)
+        state.endTurn()
+    # Else the player chooses to run, which is only allowed before the last enemy.
+    else:
+        player.run(state.index, len(state.enemies))
+        state.endTurn(not(state.lastEnemy()))
+    return True
+
+def showLoot(state):
+    """
+        LOOT: shows what the enemy dropped, numbered for the player to choose from.
+    """
+    say("The {} dropped:\n", state.enemy().name)
+    # List each lootable item based on its type (weapon, armor, or potion).
+    for selectionIndex, item in enumerate(state.loot):
+        if item.kind == 'W':
+            say("{} Weapon - {}, Damage: {}, Weight: {}", selectionIndex, item.name.capitalize(), item.stat, item.weight)
+        elif item.kind == 'A':
+            say("{} Armor - {}, Defense: {}, Weight: {}", selectionIndex, item.name.capitalize(), item.stat, item.weight)
+        else:
+            say("{} Health potion - Quantity: 1, Weight: {}", selectionIndex, item.weight)
+
+def takeLoot(state, itemIndex):
+    """
+        LOOT: adds the item the player chose to their inventory (asking before replacing their 
+        gear) and moves on to the next enemy.
+    """
+    loot = state.loot
+    # Add the player's chosen item to their inventory.
+    state.player.addItem(loot[itemIndex] if 0 <= itemIndex < len(loot) else None)
+    say(SEPARATOR)
+    state.nextFight()
+
+def setProfiler(newProfiler):
+    """
+        Sets the Profiler (see profiling.py) the time spent in each phase of a battle is 
+        recorded in (None to stop profiling) and returns the previous one.
+    """
+    global profiler
+    previous = profiler
+    profiler = newProfiler
+    return previous
+
+# Battles are only timed once a profiler is set with setProfiler().
+profiler = None
@@ -0,0 +1,160 @@
+"""
+    The game's input and output. Every message goes through say() (or log() for the player's
+    responses, which only the battle log keeps) to the attached sinks: the console and, while
+    one is set, the battle log. The player's responses are read through askNumber() and
+    askYesNo() from input() or any source set with setInput(), and typed events are sent to
+    the event stream set with setEvents(). Nothing is opened on import: the log, the event
+    stream and the trace stay unset until a game or tool sets them.
+"""
+
+# The line shown between sections of the game.
+SEPARATOR = "-" * 70
+
+#------------------------------ Messages ------------------------------
+
+def say(template, *args):
+    """
+        Sends a message to every sink (the console and the battle log unless they have been 
+        detached). The message is the template formatted with args (as str.format() would), 
+        formatted once and only if some sink is attached; a template without args is sent as 
+        it is.
+    """
+    if sinks:
+        text = template.format(*args) if args else template
+        for sink in sinks:
+            sink(text)
+
+def log(template, *args):
+    """
+        Sends a message only to the sinks that keep the player's responses (the battle log), 
+        such as a number the console already showed as it was typed. It is formatted like say().
+    """
+    if responseSinks:
+        text = template.format(*args) if args else template
+        for sink in responseSinks:
+            sink(text)
+
+def consoleSink(text):
+    """
+        The console sink: prints a message.
+    """
+    print(text)
+
+def attachSink(sink, responses = False):
+    """
+        Attaches a sink (a function taking the text of a message) so it receives every message, 
+        and the player's responses too if responses is True.
+    """
+    sinks.append(sink)
+    if responses:
+        responseSinks.append(sink)
+
+def detachSink(sink):
+    """
+        Detaches a sink so no more messages are sent (or formatted) for it.
+    """
+    for attached in (sinks, responseSinks):
+        if sink in attached:
+            attached.remove(sink)
+
+def setSinks(messages, responses):
+    """
+        Replaces the lists of sinks every message (messages) and every response (responses) 
+        are sent to and returns the previous pair. The server sends each step of a game to 
+        the session playing it this way.
+    """
+    global sinks, responseSinks
+    previous = (sinks, responseSinks)
+    sinks = messages
+    responseSinks = responses
+    return previous
+
+def setLog(newLog):
+    """
+        Sets the log records are sent to and returns the previous one. The log can be a 
+        BattleLog shared by many games, one per game, or a NullLog to disable logging. 
+        While a log is set, main() uses it instead of opening battle-log.txt. The log is 
+        attached as a sink of every message and response (a NullLog is not attached at all).
+    """
+    # Imported here so the log's writer thread support is only loaded once a log is used.
+    from battlelog import NullLog
+    global battleLog
+    previous = battleLog
+    if previous is not None:
+        detachSink(previous.write)
+    battleLog = newLog
+    if newLog is not None and not(isinstance(newLog, NullLog)):
+        attachSink(newLog.write, True)
+    return previous
+
+def event(kind, side, actor, target = "", value = 0, extra = 0, health = 0):
+    """
+        Sends a typed event (see events.py) to the event stream if one has been set with 
+        setEvents(). side is 1 if the actor is the player.
+    """
+    if eventStream is not None:
+        eventStream.emit(kind, side, actor, target, value, extra, health)
+
+def setEvents(stream):
+    """
+        Sets the EventStream battle events are sent to (None to stop recording events) and 
+        returns the previous one.
+    """
+    global eventStream
+    previous = eventStream
+    eventStream = stream
+    return previous
+
+def askNumber(prompt):
+    """
+        Asks the player for a number and returns it, recording it in the trace if one has 
+        been set with setTrace().
+    """
+    choice = int(readInput(prompt))
+    if traceWriter is not None:
+        traceWriter.choose(choice)
+    return choice
+
+def askYesNo(prompt):
+    """
+        Asks the player a yes or no question and returns their response, recording it in the 
+        trace (1 for 'y', 0 otherwise) if one has been set with setTrace().
+    """
+    response = readInput(prompt)
+    if traceWriter is not None:
+        traceWriter.choose(1 if response == 'y' else 0)
+    return response
+
+def setInput(source):
+    """
+        Sets the function the player's responses are read from (input() by default, or 
+        the answers of a trace being replayed) and returns the previous one.
+    """
+    global readInput
+    previous = readInput
+    readInput = source
+    return previous
+
+def setTrace(trace):
+    """
+        Sets the TraceWriter (see replay.py) the seed and choices of every game are recorded 
+        in (None to stop recording) and returns the previous one.
+    """
+    global traceWriter
+    previous = traceWriter
+    traceWriter = trace
+    return previous
+
+#------------------------------ State ------------------------------
+# The log is only opened once a game is started so importing the module has no side effects.
+battleLog = None
+# Where messages are sent: the console, plus the log once one is set.
+sinks = [consoleSink]
+# The sinks that also receive the player's responses.
+responseSinks = []
+# Battle events are only recorded once a stream is set with setEvents().
+eventStream = None
+# The player's responses are typed into the console unless another source is set with setInput().
+readInput = input
+# Choices are only recorded once a trace is set with setTrace().
+traceWriter = None
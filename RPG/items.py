@@ -0,0 +1,157 @@
+"""
+    Reading the items and enemy templates, and generating enemies with their gear: one of each
+    template for a game, or whole waves drawn by spawn weight. The item catalog and the
+    templates are only read when first asked for, and read again only when their files change.
+    When the item catalog is reloaded, characters holding items whose stats changed derive
+    their stats again.
+"""
+
+import random
+
+from catalog import ItemGroup, loadCatalog, reloadHooks
+from encounters import EnemyTemplate, loadTemplates
+from rng import GameRandom
+from RPG.models import Character, Enemy, invalidateGear
+
+#------------------------------ Supplementary Functions ------------------------------
+
+def gearReloaded(catalog, changed):
+    """
+        Called when the item catalog is reloaded: if any item changed, every character derives 
+        its stats from its gear again the next time they are read.
+    """
+    if changed:
+        invalidateGear()
+
+reloadHooks.append(gearReloaded)
+
+def readItems(path = "Items.txt"):
+    """
+        Grabs the items from the input file (Items.txt) through the item catalog, which parses 
+        and checks the file only when it has changed. It returns the items as a nested array 
+        (weapons, armor, and potions), the same lists each time: a changed file is reloaded 
+        into them and into the items they hold.
+    """
+    return loadCatalog(path).itemList
+
+def randomizeEnemyOrder(enemies, rng = None):
+    """
+        Randomizes the enemy order by walking through a copy of the enemies and swapping each 
+        position with a random one at or after it (a Fisher-Yates shuffle, so a wave of thousands 
+        of enemies is shuffled in linear time). It returns an array of enemies in random order. 
+        Indexes are drawn from rng (the random module by default).
+    """
+    if rng is None:
+        rng = random
+    enemyOrder = list(enemies)
+    size = len(enemyOrder)
+    # Loop through each position, picking which of the remaining enemies goes there.
+    for index in range(size):
+        other = index + rng.randrange(0, size - index)
+        enemyOrder[index], enemyOrder[other] = enemyOrder[other], enemyOrder[index]
+    # Return new enemy order as an array.
+    return enemyOrder
+
+
+def generateGear(gear, rng = None):
+    """
+        Grabs a piece of equipment from gear (an array) randomly using rng (the random module 
+        by default), weighted by the items' drop weights when gear is an ItemGroup from the catalog. 
+    """
+    if rng is None:
+        rng = random
+    if isinstance(gear, ItemGroup):
+        return gear.draw(rng)
+    index = rng.randrange(0, len(gear))
+    return gear[index]
+
+# Relative odds of an enemy carrying a weapon and armor, only a weapon, only armor, or nothing.
+GEAR_ODDS = (1, 1, 1, 1)
+
+def gearOutcome(roll, gearOdds):
+    """
+        Walks the odds until the roll (from 0 up to their sum) falls within one of the outcomes 
+        and returns that outcome: 0 for a weapon and armor, 1 for only a weapon, 2 for only armor 
+        and 3 for nothing.
+    """
+    outcome = 0
+    while roll >= gearOdds[outcome]:
+        roll -= gearOdds[outcome]
+        outcome += 1
+    return outcome
+
+def generateEnemies(itemList, enemyNames = ("goblin", "skeleton", "troll"), gearOdds = None, rng = None):
+    """
+        Creates an enemy for each name (three enemies arbitrarily, can add more to adjust game 
+        balance). Each enemy is generated with no items, one item (weapon or armor), or two items 
+        (weapon and armor) drawn randomly from the possible items stored in itemList, with the 
+        chance of each outcome given by gearOdds (GEAR_ODDS by default). Names may also be enemy 
+        templates (from readEnemies()), whose own stat ranges and gear odds are used where they set 
+        them. Every roll, including the enemies' stats, is made with rng (the random module by 
+        default). It returns the enemies as an array.
+    """
+    if gearOdds is None:
+        gearOdds = GEAR_ODDS
+    if rng is None:
+        rng = random
+    enemies = []
+    for enemyName in enemyNames:
+        healthRange = statRange = None
+        odds = gearOdds
+        if isinstance(enemyName, EnemyTemplate):
+            healthRange = enemyName.healthRange
+            statRange = enemyName.statRange
+            if enemyName.gearOdds is not None:
+                odds = enemyName.gearOdds
+            enemyName = enemyName.name
+        outcome = gearOutcome(rng.randrange(0, sum(odds)), odds)
+        weapon = generateGear(itemList[0], rng) if outcome <= 1 else None
+        armor = generateGear(itemList[1], rng) if outcome == 0 or outcome == 2 else None
+        enemies.append(Enemy(enemyName, weapon, armor, rng, healthRange, statRange))
+    return enemies
+
+def readEnemies(path = "Enemies.txt"):
+    """
+        Grabs the enemy templates from the input file (Enemies.txt), parsing the file only when it 
+        has changed. It returns them as a Roster, which generateEnemies() accepts in place of names.
+    """
+    return loadTemplates(path)
+
+def generateWave(itemList, roster, size, gearOdds = None, rng = None):
+    """
+        Creates a wave of size enemies for long dungeon runs, drawing each enemy's template from 
+        roster by spawn weight. The templates, gear outcomes and stats of the whole wave are drawn 
+        in bulk from rng (a GameRandom, seeded from the operating system by default) rather than 
+        enemy by enemy, so waves of thousands of enemies are cheap to build. gearOdds (GEAR_ODDS 
+        by default) applies to templates without their own. It returns the enemies as an array.
+    """
+    if gearOdds is None:
+        gearOdds = GEAR_ODDS
+    if rng is None:
+        rng = GameRandom()
+    templates = roster.draw(rng, size)
+    rolls = rng.values(size)
+    stats = rng.values(size * 4)
+    defaultHealth = Character.HEALTH_RANGE
+    defaultStats = Character.STAT_RANGE
+    weapons, armors = itemList[0], itemList[1]
+    enemies = []
+    for index, template in enumerate(templates):
+        odds = template.gearOdds or gearOdds
+        outcome = gearOutcome(sum(odds) * rolls[index] >> 32, odds)
+        low, high = template.healthRange or defaultHealth
+        statLow, statHigh = template.statRange or defaultStats
+        width = statHigh - statLow
+        position = index * 4
+        enemy = Enemy.__new__(Enemy)
+        enemy.name = template.name
+        enemy.rng = rng
+        enemy.health = low + ((high - low) * stats[position] >> 32)
+        enemy.baseAttack = statLow + (width * stats[position + 1] >> 32)
+        enemy.baseDefense = statLow + (width * stats[position + 2] >> 32)
+        enemy.agility = statLow + (width * stats[position + 3] >> 32)
+        enemy.weapon = generateGear(weapons, rng) if outcome <= 1 else None
+        enemy.armor = generateGear(armors, rng) if outcome == 0 or outcome == 2 else None
+        enemy.invalidateStats()
+        enemies.append(enemy)
+    return enemies
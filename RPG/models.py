@@ -0,0 +1,503 @@
+"""
+    The characters of the game: the player's Inventory, and Character with its Player and
+    Enemy subclasses, which roll their stats and damage with their own rng.
+
+    A character keeps the attack and defense it was generated with (baseAttack and
+    baseDefense) apart from what its gear adds. The effective attack, defense and weight are
+    derived from both and cached until the character's gear changes, or until
+    invalidateGear() is called after item stats change (a catalog reload), which makes every
+    character's cache stale at once so each recomputes its stats the next time they are read.
+"""
+
+import random
+
+from events import HEAL, LOOT, FLEE, ACQUIRED, REPLACED, KEPT, TOO_HEAVY
+from RPG.console import SEPARATOR, say, log, event, askYesNo
+
+# Bumped by invalidateGear(). A character's cached stats are only valid for the version they were derived at.
+gearVersion = 0
+# The version of a cache that must be derived again.
+STALE = -1
+# Asked (with the player's name and current gear) before replacing a weapon or armor.
+REPLACE_PROMPT = "\nWould {} like to replace their {}? (y/n): "
+
+def invalidateGear():
+    """
+        Marks the cached stats of every character stale, for when the stats or weights of
+        items already in use have changed. It costs the same however many characters there
+        are: each derives its stats again only when they are next read.
+    """
+    global gearVersion
+    gearVersion += 1
+
+def gearStats(weapon, armor):
+    """
+        Returns the (attack, defense, weight) a weapon and armor (either may be None) add.
+    """
+    attack = defense = weight = 0
+    if weapon is not None:
+        attack = weapon.stat
+        weight = weapon.weight
+    if armor is not None:
+        defense = armor.stat
+        weight += armor.weight
+    return attack, defense, weight
+
+#------------------------------ Classes ------------------------------
+
+class Inventory:
+    """
+        The player's gear: at most one weapon and one armor plus any number of potions. The 
+        weight, attack and defense the gear adds are read from the items held, so they are 
+        always those of the items as they are now.
+    """
+    __slots__ = ("weapon", "armor", "potions")
+
+    def __init__(self):
+        """
+            Creates an empty inventory.
+        """
+        self.weapon = None
+        self.armor = None
+        self.potions = []
+
+    @property
+    def attack(self):
+        """
+            The attack the weapon adds.
+        """
+        return self.weapon.stat if self.weapon is not None else 0
+
+    @property
+    def defense(self):
+        """
+            The defense the armor adds.
+        """
+        return self.armor.stat if self.armor is not None else 0
+
+    @property
+    def weight(self):
+        """
+            The weight of the weapon and armor. Potions do not count towards the weight.
+        """
+        return gearStats(self.weapon, self.armor)[2]
+
+    def add(self, item):
+        """
+            Adds an item to its slot (replacing nothing: the slot must be empty).
+        """
+        if item.kind == 'W':
+            self.weapon = item
+        elif item.kind == 'A':
+            self.armor = item
+        else:
+            self.potions.append(item)
+
+    def remove(self, kind):
+        """
+            Removes and returns the weapon ('W') or armor ('A').
+        """
+        if kind == 'W':
+            item = self.weapon
+            self.weapon = None
+        else:
+            item = self.armor
+            self.armor = None
+        return item
+
+    def slot(self, kind):
+        """
+            Returns the weapon ('W') or armor ('A') held, or None.
+        """
+        return self.weapon if kind == 'W' else self.armor
+
+class Character:
+    """ 
+        Super class designed to provide general stats 
+        (name, health, attack, defence, and agility) and 
+        methods for taking and receiving damage to its subclasses. Every roll is made 
+        with the character's rng, so a game seeded through its rng can be replayed exactly.
+        Attack and defense are derived from the base stats and the gear (see gear()) and 
+        cached; invalidateStats() must be called whenever the gear changes.
+    """
+    __slots__ = ("name", "health", "baseAttack", "baseDefense", "agility", "rng",
+                 "cachedAttack", "cachedDefense", "cachedWeight", "statVersion")
+
+    # Ranges (as randrange() bounds) the stats are generated within. Can be adjusted for game balance.
+    HEALTH_RANGE = (80, 121)
+    STAT_RANGE = (5, 13)
+
+    def __init__(self, name, rng = None, healthRange = None, statRange = None):
+        """ 
+            Creates a character model with a given name and health, 
+            attack, defense, and agility generated randomly within a 
+            range (80-120 for health and 5-12 for the others, unless healthRange or statRange 
+            is given). rng is anything with a randrange() method (a GameRandom); the random 
+            module is used if none is given.
+        """
+        if healthRange is None:
+            healthRange = self.HEALTH_RANGE
+        if statRange is None:
+            statRange = self.STAT_RANGE
+        self.name = name
+        self.rng = rng if rng is not None else random
+        self.health = self.rng.randrange(*healthRange)
+        self.baseAttack = self.rng.randrange(*statRange)
+        self.baseDefense = self.rng.randrange(*statRange)
+        self.agility = self.rng.randrange(*statRange)
+        self.statVersion = STALE
+
+    @property
+    def attack(self):
+        """
+            The attack with gear, cached until the gear changes.
+        """
+        if self.statVersion != gearVersion:
+            self.updateStats()
+        return self.cachedAttack
+
+    @property
+    def defense(self):
+        """
+            The defense with gear, cached until the gear changes.
+        """
+        if self.statVersion != gearVersion:
+            self.updateStats()
+        return self.cachedDefense
+
+    @property
+    def weight(self):
+        """
+            The weight of the gear, cached until the gear changes.
+        """
+        if self.statVersion != gearVersion:
+            self.updateStats()
+        return self.cachedWeight
+
+    def gear(self):
+        """
+            Returns the weapon and armor the character has (either may be None). A plain 
+            Character has none.
+        """
+        return None, None
+
+    def updateStats(self):
+        """
+            Derives the attack, defense and weight from the base stats and the gear as it is now.
+        """
+        attack, defense, weight = gearStats(*self.gear())
+        self.cachedAttack = self.baseAttack + attack
+        self.cachedDefense = self.baseDefense + defense
+        self.cachedWeight = weight
+        self.statVersion = gearVersion
+
+    def invalidateStats(self):
+        """
+            Marks the cached stats stale after the gear changed, so they are derived again the 
+            next time they are read.
+        """
+        self.statVersion = STALE
+
+    def damageGen(self):
+        """ 
+            Generates a raw damage value based on the player's or enemy's 
+            attack stat (depending on the object its called on) and a random 
+            modifier between 1/2 and 2. It returns the raw damage. 
+        """
+        return int(self.attack * (self.rng.randrange(5,21) / 10))
+
+    def takeDamage(self, value):
+        """" 
+            Generates the amount of damage taken by accounting for the 
+            player's or enemy's defense stat (depending on the object it's called on) 
+            and a random modifier between 1/2 and 2. It returns the change in health
+            and the amound blocked (modifier and dfense respectively).
+        """
+        defense = int(self.defense // 2 * (self.rng.randrange(5,21) / 10))
+        modifier = value - defense
+        # If the modifier is not negative, update the object's health.
+        if modifier > 0: 
+            self.health -= modifier
+            if self.health < 0:
+                self.health = 0
+            return [modifier, defense]
+        # Else leave the health unchanged and return the amount blocked.
+        else:
+            return [0, defense]
+
+class Player(Character):
+    """ 
+        Inherits randomly generated states from character and adds max health, 
+        weight limit, weight, and inventory as additional player-specific fields. 
+        It contains methods to return the player's stats and inventory, add and 
+        replace items, use health potions and run.
+    """
+    __slots__ = ("MAX_HEALTH", "inventory")
+
+    # Arbitrary: can be adjusted for game balance.
+    WEIGHT_LIMIT = 10
+
+    def __init__(self, name, rng = None):
+        """ 
+            Creates a player object grabbing base stats from character and sets 
+            the max health based on the character's original generated health. The weight 
+            limit is 10 (WEIGHT_LIMIT) though this is arbitrary and could be changed. It 
+            sets the inventory to empty (and so the current weight to 0) as upon creation, 
+            the player has no gear.
+        """
+        super().__init__(name, rng)
+        self.MAX_HEALTH = self.health
+        self.inventory = Inventory()
+
+    def gear(self):
+        """
+            Returns the weapon and armor in the player's inventory.
+        """
+        inventory = self.inventory
+        return inventory.weapon, inventory.armor
+    
+    def getStats(self):
+        """ 
+            Prints the player's stats to the console and logs them to the output file. 
+        """
+        say("{}'s stats:\n", self.name)
+        say("Health: {}/{}", self.health, self.MAX_HEALTH)
+        say("Attack: {}", self.attack)
+        say("Defense: {}", self.defense)
+        say("Agility: {}", self.agility)
+        say("Weight: {}/{}", self.weight, self.WEIGHT_LIMIT)
+        say(SEPARATOR)
+    
+    def getInventory(self):
+        """ 
+            Prints the player's inventory to the console and logs it to the output file.
+        """
+        say("{}'s inventory:\n", self.name)
+        # If the player has a weapon, display its name, damage, and weight, respectively. 
+        weapon = self.inventory.weapon
+        if weapon is not None:
+            say("Weapon - {}, Damage: {}, Weight: {}", weapon.name.capitalize(), weapon.stat, weapon.weight)
+        else:
+            say("Weapon - None")
+        # Same logic as above comment but for armor respectively. 
+        armor = self.inventory.armor
+        if armor is not None:
+            say("Armor - {}, Defense: {}, Weight: {}", armor.name.capitalize(), armor.stat, armor.weight)
+        else:
+            say("Armor - None")
+        # Same logic as above comment but for potions respectively.
+        potions = self.inventory.potions
+        if len(potions) >= 1:
+            say("Health potion(s) - Quantity: {}, Recovery: {}, Weight: {}", len(potions), potions[0].stat, potions[0].weight)
+        else:
+            say("Health potion(s) - None")
+        say(SEPARATOR)
+    
+    def replaceItem(self, item):
+        """ 
+            Given an item, it adjusts weight and attack or defense, respectively, 
+            depending on if the given item is a weapon or armor. The old weapon or 
+            armor is removed, and the new item is added.
+        """
+        # Remove attack (for a weapon) or defense (for armor) and weight based on the current item and remove it from the inventory.
+        self.unequip(item.kind)
+        self.addItem(item, True) 
+    
+    def addItem(self, item, oldItem = False, replace = None):
+        """ 
+            Given an item and a print status boolean (oldItem), it determines if an item 
+            should be added based on the player's current item (if applicable) and the 
+            weight of the new item (see takeItem()). If successful, it modifies the attack, 
+            defense, and inventory as necessary and notifies the user if successful or 
+            otherwise. replace(current, item) decides whether the current gear is swapped 
+            for item; by default the player is asked.
+        """
+        current = self.replaceable(item)
+        responses = []
+        if replace is None:
+            def replace(current, item):
+                responses.append(askYesNo(REPLACE_PROMPT.format(self.name, current.name)))
+                return responses[-1] == 'y'
+        outcome = self.takeItem(item, replace)
+        # Boolean to avoid printing a replacement text and this aquired text when replaceItem() is called.
+        if outcome == ACQUIRED:
+            if not(oldItem):
+                say(SEPARATOR)
+                say("{} aquired a(n) {}.", self.name, item.name)
+                event(LOOT, 1, self.name, item.name, item.stat, ACQUIRED)
+        elif outcome == REPLACED:
+            say(SEPARATOR)
+            say("{} replaced their {} with a(n) {}.", self.name, current.name, item.name)
+            event(LOOT, 1, self.name, item.name, item.stat, REPLACED)
+        elif outcome == KEPT:
+            event(LOOT, 1, self.name, item.name, item.stat, KEPT)
+        # Otherwise, the player tried to add an item they had no way to carry and are notified.
+        elif item.kind == 'W' or item.kind == 'A':
+            say("\n{} is carrying too much to store a(n) {}.", self.name, item.name)
+            event(LOOT, 1, self.name, item.name, item.stat, TOO_HEAVY)
+        else:
+            say(SEPARATOR)
+            say("{} is carrying too much to store a(n) {}.", self.name, item.name)
+            event(LOOT, 1, self.name, item.name, item.stat, TOO_HEAVY)
+        if responses:
+            log(REPLACE_PROMPT + "{}", self.name, current.name, responses[-1])
+
+    def takeItem(self, item, replace):
+        """
+            Adds item to the inventory by the rules of addItem() without any output and returns 
+            the outcome (ACQUIRED, REPLACED, KEPT or TOO_HEAVY). replace(current, item) is only 
+            called when the player has gear of item's kind and could carry item in its place, 
+            and returns True to swap it for item.
+        """
+        # If the item is a weapon or armor...
+        if item.kind == 'W' or item.kind == 'A':
+            current = self.inventory.slot(item.kind)
+            # If the player has no item of this kind and the new item does not exceed the weight limit, 
+            # add it to the inventory and adjust attack or defense and weight based on the new item. 
+            if current is None and self.weight + item.weight <= self.WEIGHT_LIMIT:
+                self.equip(item)
+                return ACQUIRED
+            # Otherwise, if the player has an item of this kind and the new item would not exceed the weight limit 
+            # (accounting for the weight of the item that might be replaced), the current item is swapped if 
+            # replace() chooses to.
+            if current is not None and self.weight - current.weight + item.weight <= self.WEIGHT_LIMIT:
+                if not(replace(current, item)):
+                    return KEPT
+                self.unequip(item.kind)
+                self.equip(item)
+                return REPLACED
+        # Otherwise, if the item is a potion and adding it does not exceed the weight limit add the item
+        # to the player's inventory.
+        elif item.kind == 'P' and self.weight + item.weight <= self.WEIGHT_LIMIT:
+            self.equip(item)
+            return ACQUIRED
+        return TOO_HEAVY
+    
+    def replaceable(self, item):
+        """
+            Returns the weapon or armor addItem() would offer to swap for item (the player 
+            has one of its kind and could carry item in its place), or None if it would not ask.
+        """
+        if item.kind == 'W' or item.kind == 'A':
+            current = self.inventory.slot(item.kind)
+            if current is not None and self.weight - current.weight + item.weight <= self.WEIGHT_LIMIT:
+                return current
+        return None
+
+    def equip(self, item):
+        """
+            Adds an item to the inventory without any output. Weapons add attack and weight, 
+            armor adds defense and weight, and potions are stored as they are (potions do not 
+            count towards the weight).
+        """
+        self.inventory.add(item)
+        if item.kind != 'P':
+            self.statVersion = STALE
+
+    def unequip(self, kind):
+        """
+            Removes and returns the weapon ('W') or armor ('A') from the inventory, taking 
+            away the attack or defense and weight it provided, without any output.
+        """
+        self.statVersion = STALE
+        return self.inventory.remove(kind)
+
+    def dropInventory(self):
+        """
+            Clears the inventory, leaving the player with their base stats and no weight, 
+            without any output.
+        """
+        self.inventory = Inventory()
+        self.statVersion = STALE
+
+    def drinkPotion(self, potion):
+        """
+            Consumes a potion from the inventory and restores health by the potion's recovery 
+            value (no health over MAX_HEALTH is allowed), without any output.
+        """
+        # Adds the player's current health with the value the potion heals for.
+        newHealth = self.health + potion.stat
+        # If newHealth does not exceed max health, the health is just updated.
+        if newHealth <= self.MAX_HEALTH:
+            self.health = newHealth
+        # Else it is set to MAX_HEALTH to prevent the player from overhealing.
+        else:
+            self.health = self.MAX_HEALTH
+        # Potion is removed.
+        self.inventory.potions.pop(0)
+
+    def hasPotion(self):
+        """
+            Checks if the user has any potions and returns a boolean. 
+        """
+        return len(self.inventory.potions) > 0
+
+    def useHealthPotion(self, potion):
+        """
+            If the player has a potion, it is consumed (removed from the inventory), 
+            and health is restored up to the designated amount in Items.txt 
+            (no health over MAX_HEALTH is allowed). Otherwise, the user is notified 
+            they have no potions to use. 
+        """
+        if self.hasPotion():
+            self.drinkPotion(potion)
+            say("{} healed {} points.", self.name, potion.stat)
+            event(HEAL, 1, self.name, "", potion.stat, len(self.inventory.potions), self.health)
+            say(SEPARATOR)
+        else:
+            say("{} doesn't have any potions to use.", self.name)
+            event(HEAL, 1, self.name, "", 0, 0, self.health)
+            say(SEPARATOR)
+
+    def run(self, index, size):
+        """
+            If the player is not facing the last enemy, the inventory is cleared, leaving 
+            the player with their base attack and defense and no weight. 
+        """
+        # If the player is not facing the last enemy...
+        if index != size - 1:
+            self.dropInventory()
+
+            say("{} ran away, but their inventory was lost in the scuffle.", self.name)
+            event(FLEE, 1, self.name, "", 1)
+            say(SEPARATOR)
+        else:
+            say("{} can't run from the final enemy.", self.name)
+            event(FLEE, 1, self.name, "", 0)
+            say(SEPARATOR)
+    
+class Enemy(Character):
+    """ Inherits randomly generated states from character and adds a weapon and 
+        armor attribute instead of an inventory, modifying attributes accordingly. 
+        It also has a method to describe the enemy and its gear."""
+    __slots__ = ("weapon", "armor")
+
+    def __init__(self, name, weapon, armor, rng = None, healthRange = None, statRange = None):
+        """
+            Creates an enemy object grabbing base stats from character (within healthRange and 
+            statRange if given) and sets the weapon and armor as designed (randomly generated by 
+            generateGear()), which add to its attack and defense.
+        """
+        super().__init__(name, rng, healthRange, statRange)
+        self.weapon = weapon
+        self.armor = armor
+
+    def gear(self):
+        """
+            Returns the enemy's weapon and armor.
+        """
+        return self.weapon, self.armor
+    
+    def description(self):
+        """
+            Displays a description of the enemy based on their gear to indicate their relative strength to the player. 
+        """
+        if not(self.armor) and not(self.weapon):
+            say("A(n) {} with {} health has appeared!", self.name, self.health)
+        elif not(self.armor):
+            say("A(n) {} with {} health and a(n) {} has appeared!", self.name, self.health, self.weapon.name)
+        elif not(self.weapon):
+            say("A(n) {} with {} health and a(n) {} has appeared!", self.name, self.health, self.armor.name)
+        else:
+            say("A(n) {} with {} health, a(n) {}, and a(n) {} has appeared!", self.name, self.health, self.weapon.name, self.armor.name)
+        say(SEPARATOR)
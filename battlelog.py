@@ -0,0 +1,176 @@
+"""
+    Buffered writers for the battle log. Records are collected in memory and written to the
+    file in batches by a background thread (or by the caller when asynchronous is off), so a
+    game does not pay for a separate file write on every line. The log file can be capped
+    in size, rotating older contents into numbered backups. SessionLog keeps one log per
+    game session without holding the file open, and NullLog disables logging altogether for
+    headless runs.
+"""
+
+import atexit
+import os
+import threading
+from collections import deque
+
+class BattleLog:
+    """
+        Writes records (strings) to a log file in batches. A batch is written once batchSize
+        records are waiting or every flushInterval seconds, whichever comes first. If maxBytes
+        is set, the file is rotated once it grows past that size: battle-log.txt becomes
+        battle-log.txt.1 and so on up to backups files (with no backups the file is simply
+        started over).
+    """
+    def __init__(self, path = "battle-log.txt", mode = "w", maxBytes = None, backups = 3,
+                 batchSize = 256, flushInterval = 0.5, asynchronous = True):
+        """
+            Opens the log file at path (mode "w" starts a new log, "a" adds to a shared one)
+            and starts the background writer if asynchronous is True.
+        """
+        self.path = path
+        self.maxBytes = maxBytes
+        self.backups = backups
+        self.batchSize = batchSize
+        self.flushInterval = flushInterval
+        self.file = open(path, mode)
+        # Records waiting to be written. Appending and popping from a deque is thread-safe.
+        self.pending = deque()
+        # Held while records are taken from pending and written so batches stay in order.
+        self.lock = threading.Lock()
+        self.closed = False
+        self.wake = threading.Event()
+        self.thread = None
+        if asynchronous:
+            self.thread = threading.Thread(target = self.run, name = "battle-log", daemon = True)
+            self.thread.start()
+        # Anything still waiting is written if the program exits without closing the log.
+        atexit.register(self.close)
+
+    def write(self, record):
+        """
+            Adds a record to the log. It is written with the next batch.
+        """
+        self.pending.append(record)
+        if len(self.pending) >= self.batchSize:
+            if self.thread is not None:
+                self.wake.set()
+            else:
+                self.drain()
+
+    def run(self):
+        """
+            The background writer: writes a batch whenever it is woken or flushInterval
+            passes, until the log is closed.
+        """
+        while not(self.closed):
+            self.wake.wait(self.flushInterval)
+            self.wake.clear()
+            self.drain()
+
+    def drain(self):
+        """
+            Writes every waiting record to the file as one batch, rotating it if it is too big.
+        """
+        with self.lock:
+            if self.file.closed:
+                return
+            batch = []
+            while self.pending:
+                batch.append(self.pending.popleft())
+            if not(batch):
+                return
+            self.file.write("\n".join(batch) + "\n")
+            if self.maxBytes is not None and self.file.tell() >= self.maxBytes:
+                self.rotate()
+
+    def rotate(self):
+        """
+            Moves the current file into the numbered backups (dropping the oldest) and starts
+            a new one. Called with the lock held.
+        """
+        self.file.close()
+        if self.backups > 0:
+            for number in range(self.backups - 1, 0, -1):
+                older = f"{self.path}.{number}"
+                if os.path.exists(older):
+                    os.replace(older, f"{self.path}.{number + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self.file = open(self.path, "w")
+
+    def flush(self):
+        """
+            Writes every waiting record and flushes the file.
+        """
+        self.drain()
+        with self.lock:
+            if not(self.file.closed):
+                self.file.flush()
+
+    def close(self):
+        """
+            Stops the background writer, writes every waiting record and closes the file.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self.thread is not None:
+            self.wake.set()
+            self.thread.join()
+        self.drain()
+        with self.lock:
+            self.file.close()
+        atexit.unregister(self.close)
+
+class SessionLog:
+    """
+        Writes records to a log file in batches without keeping the file open in between, so
+        a process can keep a separate log for each of thousands of sessions without running
+        out of file handles. Each batch of batchSize records is appended to the file in one
+        write; the rest are written on flush() or close().
+    """
+    def __init__(self, path, batchSize = 256):
+        """
+            Starts a new log at path (any existing file is replaced once the first batch is written).
+        """
+        self.path = path
+        self.batchSize = batchSize
+        self.pending = []
+        self.started = False
+
+    def write(self, record):
+        """
+            Adds a record to the log. It is written with the next batch.
+        """
+        self.pending.append(record)
+        if len(self.pending) >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        """
+            Appends every waiting record to the file.
+        """
+        if not(self.pending) and self.started:
+            return
+        with open(self.path, "a" if self.started else "w") as outfile:
+            if self.pending:
+                outfile.write("\n".join(self.pending) + "\n")
+        self.started = True
+        self.pending.clear()
+
+    def close(self):
+        """
+            Writes every waiting record.
+        """
+        self.flush()
+
+class NullLog:
+    """
+        A log that discards every record, for headless runs.
+    """
+    def write(self, record):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
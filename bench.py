@@ -0,0 +1,306 @@
+"""
+    Benchmarks the hot paths of the game: reading items, creating characters, damage rolls,
+    adding and replacing items, shuffling enemies, rendering stats and inventory, logging
+    and whole battles. Console output goes to os.devnull, the player's responses are
+    scripted through setInput() and every roll comes from a seeded GameRandom, so each run
+    does the same work. Each benchmark reports operations per second and the memory one
+    operation allocates (measured with tracemalloc in a separate pass so it does not slow
+    the timing).
+
+    Results can be saved as a JSON baseline and later runs compared against it, flagging
+    any benchmark that got slower (or allocates more) by more than a threshold:
+        python bench.py --save bench-baseline.json
+        python bench.py --compare bench-baseline.json [--threshold 0.1]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import RPG
+from RPG import Character, Player, readItems, readEnemies, generateEnemies, generateWave, randomizeEnemyOrder, battle
+from battlelog import BattleLog, NullLog
+from rng import GameRandom
+
+#------------------------------ Benchmarks ------------------------------
+
+# Benchmarks by name. Each is a function that sets up its data and returns the operation to
+# time (a function with no arguments), plus a function to call afterwards (or None).
+BENCHMARKS = {}
+
+def benchmark(name):
+    """
+        Registers a benchmark setup function under name.
+    """
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+def scripted(answer):
+    """
+        Returns an input() replacement that gives every prompt answer(prompt).
+    """
+    def respond(prompt = ""):
+        return answer(prompt)
+    return respond
+
+@benchmark("readItems")
+def benchReadItems():
+    return readItems, None
+
+@benchmark("character")
+def benchCharacter():
+    rng = GameRandom(0)
+    return (lambda: Character("goblin", rng)), None
+
+@benchmark("damage")
+def benchDamage():
+    rng = GameRandom(0)
+    player = Player("Hero", rng)
+    enemy = generateEnemies(readItems(), rng = rng)[0]
+    def operation():
+        enemy.health = 100
+        enemy.takeDamage(player.damageGen())
+    return operation, None
+
+@benchmark("addItem")
+def benchAddItem():
+    itemList = readItems()
+    player = Player("Hero", GameRandom(0))
+    weapon = itemList[0][0]
+    # Pick up a weapon into the empty slot, then put it down again.
+    def operation():
+        player.addItem(weapon)
+        player.unequip('W')
+    return operation, None
+
+@benchmark("replaceItem")
+def benchReplaceItem():
+    itemList = readItems()
+    player = Player("Hero", GameRandom(0))
+    first, second = itemList[0][0], itemList[0][1]
+    player.equip(first)
+    # Swap back and forth between two weapons, answering yes to every replacement.
+    previous = RPG.setInput(scripted(lambda prompt: 'y'))
+    def operation():
+        player.addItem(second if player.inventory.weapon is first else first)
+    return operation, lambda: RPG.setInput(previous)
+
+@benchmark("shuffle3")
+def benchShuffle3():
+    rng = GameRandom(0)
+    enemies = generateEnemies(readItems(), rng = rng)
+    return (lambda: randomizeEnemyOrder(enemies, rng)), None
+
+@benchmark("shuffle1000")
+def benchShuffle1000():
+    rng = GameRandom(0)
+    enemies = generateWave(readItems(), readEnemies(), 1000, rng = rng)
+    return (lambda: randomizeEnemyOrder(enemies, rng)), None
+
+@benchmark("getStats")
+def benchGetStats():
+    return Player("Hero", GameRandom(0)).getStats, None
+
+@benchmark("getInventory")
+def benchGetInventory():
+    itemList = readItems()
+    player = Player("Hero", GameRandom(0))
+    for item in (itemList[0][0], itemList[1][0], itemList[2][0]):
+        player.equip(item)
+    return player.getInventory, None
+
+@benchmark("log")
+def benchLog():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "battle-log.txt")
+    battleLog = BattleLog(path)
+    previous = RPG.setLog(battleLog)
+    record = "Hero attacked the goblin for 12 damage."
+    def finish():
+        RPG.setLog(previous)
+        battleLog.close()
+        os.remove(path)
+        os.rmdir(directory)
+    return (lambda: RPG.log(record)), finish
+
+@benchmark("battle")
+def benchBattle():
+    itemList = readItems()
+    roster = readEnemies()
+    rng = GameRandom(0)
+    seeds = iter(range(1 << 62))
+    # Attack every turn, take the first loot offered and keep the gear already carried.
+    previous = RPG.setInput(scripted(lambda prompt: 'n' if "(y/n)" in prompt else '0'))
+    def operation():
+        rng.seed(next(seeds))
+        player = Player("Hero", rng)
+        player.equip(itemList[0][0])
+        battle(player, itemList[2][0], generateEnemies(itemList, roster, rng = rng), rng)
+    return operation, lambda: RPG.setInput(previous)
+
+@benchmark("battleHeadless")
+def benchBattleHeadless():
+    # The same battles with the console detached (and the log a NullLog), so no message is formatted.
+    operation, finish = benchBattle()
+    RPG.detachSink(RPG.consoleSink)
+    def restore():
+        RPG.attachSink(RPG.consoleSink)
+        finish()
+    return operation, restore
+
+#------------------------------ Measuring ------------------------------
+
+def timeOperation(operation, seconds, repeat = 3):
+    """
+        Calls operation in batches until each of repeat rounds has taken about seconds and
+        returns the best rate seen in operations per second.
+    """
+    # Find a batch size that takes a tenth of a round.
+    batch = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(batch):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds / 10:
+            break
+        batch *= 2
+    best = 0.0
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            for _ in range(batch):
+                operation()
+            calls += batch
+            elapsed = time.perf_counter() - start
+            if elapsed >= seconds:
+                break
+        best = max(best, calls / elapsed)
+    return best
+
+def measureAllocations(operation, calls = 200):
+    """
+        Returns the average number of bytes operation allocates at its peak over calls calls.
+    """
+    tracemalloc.start()
+    try:
+        operation()
+        total = 0
+        for _ in range(calls):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            operation()
+            total += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return total / calls
+
+def runBenchmarks(names = None, seconds = 0.2):
+    """
+        Runs the named benchmarks (every benchmark by default) and returns their results by
+        name: operations per second and bytes allocated per operation.
+    """
+    results = {}
+    previousLog = RPG.setLog(NullLog())
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for name in names or BENCHMARKS:
+                operation, finish = BENCHMARKS[name]()
+                try:
+                    rate = timeOperation(operation, seconds)
+                    allocated = measureAllocations(operation)
+                finally:
+                    if finish is not None:
+                        finish()
+                results[name] = {"opsPerSecond": rate, "bytesPerOp": allocated}
+    finally:
+        RPG.setLog(previousLog)
+    return results
+
+#------------------------------ Baselines ------------------------------
+
+def saveBaseline(path, results):
+    """
+        Writes results to a JSON baseline file along with the machine they were measured on.
+    """
+    baseline = {"python": platform.python_version(), "machine": platform.machine(),
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}
+    with open(path, "w") as outfile:
+        json.dump(baseline, outfile, indent = 2, sort_keys = True)
+
+def loadBaseline(path):
+    """
+        Returns the results stored in a JSON baseline file.
+    """
+    with open(path) as infile:
+        return json.load(infile)["results"]
+
+def compare(results, baseline, threshold = 0.1):
+    """
+        Compares results with a baseline and returns a list of (name, what, old, new) for
+        every benchmark whose speed dropped, or whose allocations grew, by more than
+        threshold (a fraction). Benchmarks missing from either side are skipped.
+    """
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        if result["opsPerSecond"] < old["opsPerSecond"] * (1 - threshold):
+            regressions.append((name, "opsPerSecond", old["opsPerSecond"], result["opsPerSecond"]))
+        # Allow a few bytes of slack so tiny allocations do not flag on noise.
+        if result["bytesPerOp"] > old["bytesPerOp"] * (1 + threshold) + 16:
+            regressions.append((name, "bytesPerOp", old["bytesPerOp"], result["bytesPerOp"]))
+    return regressions
+
+#------------------------------ Main ------------------------------
+
+def main():
+    """
+        Runs the benchmarks from the command line, prints their results and optionally saves
+        them as a baseline or compares them with one (exiting with status 1 on a regression).
+    """
+    parser = argparse.ArgumentParser(description = "Benchmark the hot paths of the RPG.")
+    parser.add_argument("names", nargs = "*", help = f"benchmarks to run (default all: {', '.join(BENCHMARKS)})")
+    parser.add_argument("--time", type = float, default = 0.2, help = "seconds per timing round")
+    parser.add_argument("--save", help = "write the results to this JSON baseline")
+    parser.add_argument("--compare", help = "compare the results with this JSON baseline")
+    parser.add_argument("--threshold", type = float, default = 0.1, help = "fraction a benchmark may regress by")
+    args = parser.parse_args()
+
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"no benchmark called {name}")
+    baseline = loadBaseline(args.compare) if args.compare else None
+
+    results = runBenchmarks(args.names, args.time)
+    print(f"{'Benchmark':<14}{'ops/sec':>14}{'bytes/op':>12}")
+    for name, result in results.items():
+        line = f"{name:<14}{result['opsPerSecond']:>14,.0f}{result['bytesPerOp']:>12,.0f}"
+        if baseline is not None and name in baseline:
+            change = result["opsPerSecond"] / baseline[name]["opsPerSecond"] - 1
+            line += f"  {change:+.1%}"
+        print(line)
+
+    if args.save:
+        saveBaseline(args.save, results)
+        print(f"Saved baseline to {args.save}")
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for name, what, old, new in regressions:
+            print(f"Regression: {name} {what} {old:,.1f} -> {new:,.1f}")
+        print(f"Regressions: {len(regressions)} (threshold {args.threshold:.0%})")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
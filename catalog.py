@@ -0,0 +1,387 @@
+"""
+    The item catalog: Items.txt parsed once into Items, checked line by line, and indexed by
+    kind, name and stat. A loaded catalog is cached until the file's modification time, size
+    or contents change, and can optionally be stored in a precompiled binary cache next to
+    the file (path + ".cache") so large catalogs skip parsing altogether. Each kind of item
+    is an ItemGroup, which draws items at random in constant time weighted by their drop
+    weights (the alias method).
+
+    When the file of a loaded catalog changes, the catalog is reloaded in place rather than
+    replaced: only the lines that changed are parsed, edited items are updated in the Item
+    objects everyone already holds (inventories, enemies' gear, the item lists of running
+    games) and only the indexes of the kinds of item touched are rebuilt. The functions in
+    reloadHooks are then told which items changed.
+"""
+
+import os
+from bisect import bisect_left, bisect_right
+from itertools import compress
+from operator import ne
+
+KINDS = ('W', 'A', 'P')
+CACHE_VERSION = 1
+# Called as hook(catalog, changed) after a catalog is reloaded, with the items whose stats changed.
+reloadHooks = []
+
+#------------------------------ Items ------------------------------
+
+class Item:
+    """
+        A weapon ('W'), armor ('A') or potion ('P') read from Items.txt. Its stat (damage,
+        defense or recovery) and weight are parsed into integers once when it is read. The
+        drop weight sets how often it is drawn for enemies relative to other items of its kind.
+    """
+    __slots__ = ("kind", "name", "stat", "weight", "dropWeight")
+
+    def __init__(self, kind, name, stat, weight, dropWeight = 1):
+        """
+            Creates an item of the given kind with a name, stat, weight and drop weight.
+        """
+        self.kind = kind
+        self.name = name
+        self.stat = stat
+        self.weight = weight
+        self.dropWeight = dropWeight
+
+    def __repr__(self):
+        return f"Item({self.kind!r}, {self.name!r}, {self.stat}, {self.weight}, {self.dropWeight})"
+
+    def row(self):
+        """
+            Returns the item as a tuple of its fields, as parseItem() returns them.
+        """
+        return (self.kind, self.name, self.stat, self.weight, self.dropWeight)
+
+class ItemGroup(list):
+    """
+        A list of items of one kind that can draw an item at random in constant time,
+        weighted by each item's drop weight (using an alias table). When every drop weight is
+        the same, a draw is a single randrange(0, len(group)) exactly like an unweighted pick.
+        Call buildTable() after changing the list or the drop weights.
+    """
+    def __init__(self, items = ()):
+        """
+            Creates a group of the given items and builds its alias table.
+        """
+        super().__init__(items)
+        self.buildTable()
+
+    def buildTable(self):
+        """
+            Builds the alias table: each index keeps its own item with some probability and
+            otherwise hands the draw over to its alias.
+        """
+        size = len(self)
+        weights = [item.dropWeight for item in self]
+        self.uniform = len(set(weights)) <= 1
+        self.probability = [1.0] * size
+        self.alias = list(range(size))
+        if self.uniform:
+            return
+        total = sum(weights)
+        scaled = [weight * size / total for weight in weights]
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def draw(self, rng):
+        """
+            Returns a random item using rng (anything with randrange() and random(), such as
+            the random module).
+        """
+        index = rng.randrange(0, len(self))
+        if self.uniform or rng.random() < self.probability[index]:
+            return self[index]
+        return self[self.alias[index]]
+
+#------------------------------ Catalog ------------------------------
+
+class Catalog:
+    """
+        Every item of a catalog file with indexes by kind, by name and by stat.
+    """
+    def __init__(self, items, path = None, lines = None):
+        """
+            Creates a catalog of the given items and builds its indexes. lines are the lines
+            of the file the items were read from (stripped, without blank lines), which a
+            reload compares with the new file.
+        """
+        self.path = path
+        self.items = list(items)
+        self.lines = list(lines) if lines is not None else [", ".join(map(str, item.row())) for item in self.items]
+        # The number of reloads that changed anything.
+        self.version = 0
+        self.byKind = {kind: ItemGroup() for kind in KINDS}
+        self.byStat = {}
+        self.stats = {}
+        self.index(KINDS)
+        # Weapons, armor and potions, the way readItems() has always returned them.
+        self.itemList = [self.byKind['W'], self.byKind['A'], self.byKind['P']]
+
+    def index(self, kinds, names = True):
+        """
+            Builds the indexes of the given kinds of item, and the index by name if names is
+            True. The ItemGroups are refilled in place, so item lists handed out stay current.
+        """
+        for kind in kinds:
+            group = self.byKind[kind]
+            group[:] = [item for item in self.items if item.kind == kind]
+            group.buildTable()
+            # Items of each kind sorted by stat, with the stats alone for bisecting.
+            self.byStat[kind] = sorted(group, key = lambda item: item.stat)
+            self.stats[kind] = [item.stat for item in self.byStat[kind]]
+        if names:
+            # The first item with a name wins if names repeat.
+            self.byName = {}
+            for item in self.items:
+                self.byName.setdefault(item.name, item)
+
+    def reload(self, text):
+        """
+            Brings the catalog up to date with the new text of its file, parsing only the
+            lines that changed. An edited item (one with the same kind and name) is updated in
+            place, so everything holding it sees its new stats; new items are added, and items
+            no longer in the file are dropped from the catalog (anything holding them keeps
+            them as they were). If a changed line is malformed, a ValueError is raised and the
+            catalog is left as it was. Returns the items whose stats changed.
+        """
+        lines = [line for line in map(str.strip, text.splitlines()) if line]
+        if len(lines) == len(self.lines):
+            # Lines edited where they stand are found without a Python loop over the file.
+            positions = list(compress(range(len(lines)), map(ne, lines, self.lines)))
+            rows = [parseLine(text, lines, position) for position in positions]
+            items = [self.items[position] for position in positions]
+            if all(row[:2] == (item.kind, item.name) for item, row in zip(items, rows)):
+                self.lines = lines
+                return self.edit(items, rows)
+        return self.rebuild(text, lines)
+
+    def edit(self, items, rows):
+        """
+            Gives items the stats of their new rows, moving them within the indexes by stat
+            (and rebuilding the alias table of a kind only if a drop weight changed). Returns
+            the items whose stats changed.
+        """
+        changed = []
+        # Kinds whose drop weights changed, whose alias tables are rebuilt once at the end.
+        reweighted = set()
+        for item, row in zip(items, rows):
+            stat, weight, dropWeight = (row + (1,))[2:5]
+            if (item.stat, item.weight, item.dropWeight) == (stat, weight, dropWeight):
+                continue
+            if item.stat != stat:
+                byStat = self.byStat[item.kind]
+                stats = self.stats[item.kind]
+                position = bisect_left(stats, item.stat)
+                while byStat[position] is not item:
+                    position += 1
+                del byStat[position], stats[position]
+                position = bisect_right(stats, stat)
+                byStat.insert(position, item)
+                stats.insert(position, stat)
+            if item.dropWeight != dropWeight:
+                item.dropWeight = dropWeight
+                reweighted.add(item.kind)
+            item.stat, item.weight = stat, weight
+            changed.append(item)
+        for kind in reweighted:
+            self.byKind[kind].buildTable()
+        if changed:
+            self.reloaded(changed)
+        return changed
+
+    def rebuild(self, text, lines):
+        """
+            Reloads the catalog from lines that were added, removed or moved: every line is
+            matched with the item it was read into last time, the lines that do not match are
+            parsed, and the indexes of the kinds of item touched are built again. Returns the
+            items whose stats changed.
+        """
+        # The items of the lines read last time, which unchanged lines take back in order.
+        unchanged = {}
+        for line, item in zip(self.lines, self.items):
+            unchanged.setdefault(line, []).append(item)
+        items = []
+        parsed = []
+        for position, line in enumerate(lines):
+            same = unchanged.get(line)
+            if same:
+                items.append(same.pop(0))
+            else:
+                parsed.append((position, parseLine(text, lines, position)))
+                items.append(None)
+        # Every line parsed, so nothing changes unless the whole file is valid.
+        gone = {}
+        for group in unchanged.values():
+            for item in group:
+                gone.setdefault((item.kind, item.name), []).append(item)
+        edited = []
+        rows = []
+        kinds = set()
+        names = False
+        for position, row in parsed:
+            matches = gone.get(row[:2])
+            if matches:
+                item = matches.pop(0)
+                edited.append(item)
+                rows.append(row)
+            else:
+                item = Item(*row)
+                names = True
+            items[position] = item
+            kinds.add(item.kind)
+        for matches in gone.values():
+            if matches:
+                names = True
+                kinds.update(item.kind for item in matches)
+        # Lines that only moved change the order items are drawn in.
+        if not(kinds) and items != self.items:
+            kinds.update(KINDS)
+        changed = []
+        for item, row in zip(edited, rows):
+            stat, weight, dropWeight = (row + (1,))[2:5]
+            if (item.stat, item.weight, item.dropWeight) != (stat, weight, dropWeight):
+                item.stat, item.weight, item.dropWeight = stat, weight, dropWeight
+                changed.append(item)
+        self.items = items
+        self.lines = lines
+        if kinds:
+            self.index(kinds, names)
+            self.reloaded(changed)
+        return changed
+
+    def reloaded(self, changed):
+        """
+            Counts a reload that changed the catalog and tells the reload hooks.
+        """
+        self.version += 1
+        for hook in reloadHooks:
+            hook(self, changed)
+
+    def find(self, name):
+        """
+            Returns the item with the given name or None.
+        """
+        return self.byName.get(name)
+
+    def withStat(self, kind, low, high):
+        """
+            Returns the items of a kind whose stat is between low and high (inclusive),
+            sorted by stat.
+        """
+        stats = self.stats[kind]
+        return self.byStat[kind][bisect_left(stats, low):bisect_right(stats, high)]
+
+    def __len__(self):
+        return len(self.items)
+
+def parseItem(line, number):
+    """
+        Parses one line of a catalog ("kind, name, stat, weight" with an optional drop weight)
+        into a tuple, raising a ValueError that names the line if it is malformed.
+    """
+    parts = line.strip().split(", ")
+    if len(parts) not in (4, 5):
+        raise ValueError(f"line {number}: expected 'kind, name, stat, weight' but got {line.strip()!r}")
+    if parts[0] not in KINDS:
+        raise ValueError(f"line {number}: unknown item kind {parts[0]!r} (expected W, A or P)")
+    try:
+        numbers = [int(part) for part in parts[2:]]
+    except ValueError:
+        raise ValueError(f"line {number}: stat, weight and drop weight must be integers in {line.strip()!r}") from None
+    if numbers[1] < 0 or (len(numbers) == 3 and numbers[2] <= 0):
+        raise ValueError(f"line {number}: weight must not be negative and drop weight must be positive")
+    return (parts[0], parts[1], *numbers)
+
+def parseLine(text, lines, position):
+    """
+        Parses lines[position], the line of text at that position once blank lines are
+        skipped, naming the line's number in text if it is malformed.
+    """
+    try:
+        return parseItem(lines[position], position + 1)
+    except ValueError:
+        number = [number for number, line in enumerate(text.splitlines(), 1) if line.strip()][position]
+        return parseItem(lines[position], number)
+
+def parseCatalog(text):
+    """
+        Parses the text of a catalog into item tuples, skipping blank lines.
+    """
+    return [parseItem(line, number) for number, line in enumerate(text.splitlines(), 1) if line.strip()]
+
+#------------------------------ Loading ------------------------------
+
+# Loaded catalogs by path, with the (modification time, size, hash) they were loaded from.
+catalogCache = {}
+
+def loadCatalog(path = "Items.txt", binaryCache = False):
+    """
+        Returns the catalog in path, parsing it only if it changed since it was last loaded
+        (a catalog already loaded is reloaded in place, see Catalog.reload()). If binaryCache
+        is True, the parsed items are also kept in path + ".cache" and read back from there
+        while the file's contents stay the same.
+    """
+    info = os.stat(path)
+    cached = catalogCache.get(path)
+    if cached is not None and cached[0][:2] == (info.st_mtime_ns, info.st_size):
+        return cached[1]
+
+    # Only needed once a file is read, so importing the catalog stays cheap.
+    import hashlib
+    with open(path, "rb") as infile:
+        source = infile.read()
+    digest = hashlib.sha256(source).hexdigest()
+    # The file was touched but its contents are the same.
+    if cached is not None and cached[0][2] == digest:
+        catalogCache[path] = ((info.st_mtime_ns, info.st_size, digest), cached[1])
+        return cached[1]
+
+    text = source.decode()
+    if cached is not None:
+        catalog = cached[1]
+        catalog.reload(text)
+        if binaryCache:
+            writeBinaryCache(path, digest, [item.row() for item in catalog.items])
+    else:
+        rows = readBinaryCache(path, digest) if binaryCache else None
+        if rows is None:
+            rows = parseCatalog(text)
+            if binaryCache:
+                writeBinaryCache(path, digest, rows)
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        catalog = Catalog([Item(*row) for row in rows], path, lines)
+    catalogCache[path] = ((info.st_mtime_ns, info.st_size, digest), catalog)
+    return catalog
+
+def readBinaryCache(path, digest):
+    """
+        Returns the item tuples from the binary cache of path, or None if there is no cache
+        or it was built from different contents.
+    """
+    import pickle
+    try:
+        with open(path + ".cache", "rb") as infile:
+            version, cachedDigest, rows = pickle.load(infile)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return None
+    if version != CACHE_VERSION or cachedDigest != digest:
+        return None
+    return rows
+
+def writeBinaryCache(path, digest, rows):
+    """
+        Stores the item tuples of path in its binary cache.
+    """
+    import pickle
+    with open(path + ".cache", "wb") as outfile:
+        pickle.dump((CACHE_VERSION, digest, rows), outfile, protocol = pickle.HIGHEST_PROTOCOL)
@@ -0,0 +1,131 @@
+"""
+    Enemy templates read from Enemies.txt, so the enemies a game is fought against are data
+    instead of code. Each line describes one kind of enemy:
+
+        name, spawn weight, health range, stat range, gear odds
+
+    Only the name is required. The spawn weight (1 by default) sets how often the enemy
+    appears in a wave relative to the others. Ranges are written low-high as randrange()
+    bounds (Character.HEALTH_RANGE and STAT_RANGE by default) and the gear odds are the
+    relative odds of carrying a weapon and armor, only a weapon, only armor, or nothing,
+    written a/b/c/d (RPG.items.GEAR_ODDS by default). Blank lines and lines starting with # are
+    skipped. A Roster holds the templates of a file and draws them by spawn weight.
+"""
+
+import os
+from bisect import bisect_right
+
+class EnemyTemplate:
+    """
+        One kind of enemy. Ranges and gear odds left as None fall back to the game's defaults
+        when an enemy is generated.
+    """
+    __slots__ = ("name", "weight", "healthRange", "statRange", "gearOdds")
+
+    def __init__(self, name, weight = 1, healthRange = None, statRange = None, gearOdds = None):
+        self.name = name
+        self.weight = weight
+        self.healthRange = healthRange
+        self.statRange = statRange
+        self.gearOdds = gearOdds
+
+    def __repr__(self):
+        return f"EnemyTemplate({self.name!r}, {self.weight}, {self.healthRange}, {self.statRange}, {self.gearOdds})"
+
+class Roster(list):
+    """
+        A list of enemy templates that can draw many templates at once, weighted by their
+        spawn weights.
+    """
+    def __init__(self, templates = ()):
+        """
+            Creates a roster of the given templates.
+        """
+        super().__init__(templates)
+        self.buildTable()
+
+    def buildTable(self):
+        """
+            Builds the running totals of the spawn weights used to draw templates. Call it
+            after changing the list or the weights.
+        """
+        self.cumulative = []
+        total = 0
+        for template in self:
+            total += template.weight
+            self.cumulative.append(total)
+        self.total = total
+
+    def draw(self, rng, count):
+        """
+            Returns count templates drawn by spawn weight with rng (a GameRandom), all from
+            one bulk draw of random values.
+        """
+        total = self.total
+        cumulative = self.cumulative
+        return [self[bisect_right(cumulative, total * value >> 32)] for value in rng.values(count)]
+
+def parseRange(text, number):
+    """
+        Parses a range written low-high into a tuple of randrange() bounds.
+    """
+    try:
+        low, high = (int(part) for part in text.split("-"))
+    except ValueError:
+        raise ValueError(f"line {number}: expected a range like 80-121 but got {text!r}") from None
+    if high <= low:
+        raise ValueError(f"line {number}: the range {text!r} is empty")
+    return (low, high)
+
+def parseTemplate(line, number):
+    """
+        Parses one line of an enemy file into an EnemyTemplate, raising a ValueError that
+        names the line if it is malformed.
+    """
+    parts = line.strip().split(", ")
+    if not(1 <= len(parts) <= 5) or not(parts[0]):
+        raise ValueError(f"line {number}: expected 'name, spawn weight, health, stats, gear odds' but got {line.strip()!r}")
+    template = EnemyTemplate(parts[0])
+    if len(parts) > 1:
+        try:
+            template.weight = int(parts[1])
+        except ValueError:
+            raise ValueError(f"line {number}: the spawn weight must be an integer in {line.strip()!r}") from None
+        if template.weight <= 0:
+            raise ValueError(f"line {number}: the spawn weight must be positive")
+    if len(parts) > 2:
+        template.healthRange = parseRange(parts[2], number)
+    if len(parts) > 3:
+        template.statRange = parseRange(parts[3], number)
+    if len(parts) > 4:
+        try:
+            odds = tuple(int(part) for part in parts[4].split("/"))
+        except ValueError:
+            raise ValueError(f"line {number}: gear odds must be four integers like 1/1/1/1 in {line.strip()!r}") from None
+        if len(odds) != 4 or min(odds) < 0 or sum(odds) == 0:
+            raise ValueError(f"line {number}: gear odds must be four integers like 1/1/1/1 that are not all 0")
+        template.gearOdds = odds
+    return template
+
+def parseTemplates(text):
+    """
+        Parses the text of an enemy file into a Roster.
+    """
+    return Roster(parseTemplate(line, number) for number, line in enumerate(text.splitlines(), 1)
+                  if line.strip() and not(line.lstrip().startswith("#")))
+
+# Loaded rosters by path, with the (modification time, size) they were loaded from.
+rosterCache = {}
+
+def loadTemplates(path = "Enemies.txt"):
+    """
+        Returns the Roster in path, parsing it only if it changed since it was last loaded.
+    """
+    info = os.stat(path)
+    cached = rosterCache.get(path)
+    if cached is not None and cached[0] == (info.st_mtime_ns, info.st_size):
+        return cached[1]
+    with open(path) as infile:
+        roster = parseTemplates(infile.read())
+    rosterCache[path] = ((info.st_mtime_ns, info.st_size), roster)
+    return roster
@@ -0,0 +1,228 @@
+"""
+    A compact binary stream of battle events (attack, block, heal, loot, flee and death) so
+    games can be analysed without parsing the prose of battle-log.txt. Every event is a
+    fixed-width 16 byte record appended after a 16 byte header, so the file can be appended
+    to, memory-mapped and loaded in bulk (as a NumPy structured array when NumPy is
+    installed). Names of characters and items are stored once in a text file next to the
+    stream (path + ".names") and events refer to them by 16-bit number, so a stream holds at
+    most MAX_NAMES different names. The prose log is only rendered from the stream when asked for.
+
+    Record fields: game, kind, side (1 if the actor is the player), actor, target (name
+    numbers), value, extra and health, used by each kind as follows.
+        ATTACK - actor attacked target: value is the raw damage.
+        BLOCK - actor (the defender) blocked target's attack: value is the amount blocked,
+                extra the damage taken and health the defender's health afterwards.
+        HEAL - actor drank a potion: value is the recovery (0 if they had none), extra the
+               potions left and health the actor's health afterwards.
+        LOOT - actor was offered item target: value is its stat and extra the outcome
+               (ACQUIRED, REPLACED, KEPT or TOO_HEAVY).
+        FLEE - actor tried to run: value is 1 if they got away, 0 if not.
+        DEATH - actor was killed by target.
+"""
+
+import mmap
+import os
+import struct
+import sys
+
+ATTACK, BLOCK, HEAL, LOOT, FLEE, DEATH = range(1, 7)
+KINDS = {ATTACK: "attack", BLOCK: "block", HEAL: "heal", LOOT: "loot", FLEE: "flee", DEATH: "death"}
+# Outcomes of a LOOT event.
+ACQUIRED, REPLACED, KEPT, TOO_HEAVY = range(4)
+
+MAGIC = b"RPGEVT01"
+HEADER = MAGIC + bytes(8)
+RECORD = struct.Struct("<IBBHHhhh")
+# The same layout as RECORD for loading records with NumPy.
+FIELDS = [("game", "<u4"), ("kind", "u1"), ("side", "u1"), ("actor", "<u2"), ("target", "<u2"),
+          ("value", "<i2"), ("extra", "<i2"), ("health", "<i2")]
+# Names are numbered in 16 bits, so a stream holds at most this many.
+MAX_NAMES = 1 << 16
+
+#------------------------------ Writing ------------------------------
+
+class EventStream:
+    """
+        Appends events to a stream file, packing them into a buffer that is written once it
+        holds bufferSize bytes (and on flush() or close()).
+    """
+    def __init__(self, path = "battle-events.bin", bufferSize = 1 << 16):
+        """
+            Opens the stream at path, creating it if needed or appending to it otherwise. The
+            game number continues after the last game already in the stream. A record left
+            partly written (by a crash) is cut off so new records stay aligned.
+        """
+        self.path = path
+        self.bufferSize = bufferSize
+        self.buffer = bytearray()
+        self.names = readNames(path) if os.path.exists(path) else []
+        self.nameIds = {name: index for index, name in enumerate(self.names)}
+        self.namesFile = open(path + ".names", "a")
+        self.file = open(path, "ab")
+        size = self.file.tell()
+        if size < len(HEADER):
+            self.file.truncate(0)
+            self.file.write(HEADER)
+        elif (size - len(HEADER)) % RECORD.size:
+            self.file.truncate(size - (size - len(HEADER)) % RECORD.size)
+            self.file.seek(0, os.SEEK_END)
+        # Events are recorded under game, and the next game started is nextGame.
+        self.game = self.nextGame = lastGame(path) + 1 if self.file.tell() > len(HEADER) else 0
+
+    def nameId(self, name):
+        """
+            Returns the number of a name, adding it to the names file if it is new. It raises
+            ValueError if the name is new and the stream already holds MAX_NAMES names.
+        """
+        nameId = self.nameIds.get(name)
+        if nameId is None:
+            if len(self.names) >= MAX_NAMES:
+                raise ValueError(f"{self.path} already holds the most names a stream can ({MAX_NAMES})")
+            nameId = len(self.names)
+            self.names.append(name)
+            self.nameIds[name] = nameId
+            self.namesFile.write(name + "\n")
+        return nameId
+
+    def startGame(self, game = None):
+        """
+            Starts a new game: events are recorded under the given game number, or the next one.
+        """
+        self.game = self.nextGame if game is None else game
+        self.nextGame = self.game + 1
+
+    def emit(self, kind, side, actor, target = "", value = 0, extra = 0, health = 0):
+        """
+            Adds an event. actor and target are names (strings).
+        """
+        self.buffer += RECORD.pack(self.game, kind, side, self.nameId(actor), self.nameId(target), value, extra, health)
+        if len(self.buffer) >= self.bufferSize:
+            self.flush()
+
+    def flush(self):
+        """
+            Writes the buffered events and the new names to disk.
+        """
+        # Names first so every event on disk can be rendered.
+        self.namesFile.flush()
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer.clear()
+
+    def close(self):
+        """
+            Writes the buffered events and closes the stream.
+        """
+        self.flush()
+        self.file.close()
+        self.namesFile.close()
+
+#------------------------------ Reading ------------------------------
+
+def readNames(path):
+    """
+        Returns the names of a stream as a list (an event's actor or target is an index into it).
+    """
+    if not(os.path.exists(path + ".names")):
+        return []
+    with open(path + ".names") as infile:
+        return [line.rstrip("\n") for line in infile]
+
+def lastGame(path):
+    """
+        Returns the game number of the last event in a stream (-1 if it is empty).
+    """
+    size = os.path.getsize(path)
+    if size <= len(HEADER):
+        return -1
+    with open(path, "rb") as infile:
+        infile.seek(len(HEADER) + (size - len(HEADER)) // RECORD.size * RECORD.size - RECORD.size)
+        return RECORD.unpack(infile.read(RECORD.size))[0]
+
+def readEvents(path):
+    """
+        Yields every event of a stream as a tuple (game, kind, side, actor, target, value,
+        extra, health) straight from the memory-mapped file.
+    """
+    with open(path, "rb") as infile:
+        if os.path.getsize(path) <= len(HEADER):
+            return
+        with mmap.mmap(infile.fileno(), 0, access = mmap.ACCESS_READ) as view:
+            if view[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not an event stream")
+            end = len(HEADER) + (len(view) - len(HEADER)) // RECORD.size * RECORD.size
+            yield from RECORD.iter_unpack(memoryview(view)[len(HEADER):end])
+
+def loadEvents(path):
+    """
+        Memory-maps every event of a stream as a NumPy structured array with the fields of
+        FIELDS (requires NumPy). Nothing is parsed or copied until it is used.
+    """
+    import numpy as np
+    count = (os.path.getsize(path) - len(HEADER)) // RECORD.size
+    if count <= 0:
+        return np.zeros(0, dtype = FIELDS)
+    return np.memmap(path, dtype = FIELDS, mode = "r", offset = len(HEADER), shape = (count,))
+
+#------------------------------ Rendering ------------------------------
+
+def renderEvent(event, names):
+    """
+        Returns the prose lines for an event, worded like the battle log.
+    """
+    game, kind, side, actor, target, value, extra, health = event
+    actor = names[actor] if side else "The " + names[actor]
+    # The other character is the enemy when the actor is the player and the other way around.
+    other = "the " + names[target] if side else names[target]
+    if kind == ATTACK:
+        return [f"{actor} attacked {other} for {value} points of damage."]
+    if kind == BLOCK:
+        pronoun = "their" if side else "its"
+        return [f"{value} points of damage were blocked.",
+                f"{actor} took {extra} points of damage and {pronoun} health is now {health}."]
+    if kind == HEAL:
+        if value == 0:
+            return [f"{actor} doesn't have any potions to use."]
+        return [f"{actor} healed {value} points."]
+    if kind == LOOT:
+        item = names[target]
+        if extra == ACQUIRED:
+            return [f"{actor} aquired a(n) {item}."]
+        if extra == REPLACED:
+            return [f"{actor} replaced their gear with a(n) {item}."]
+        if extra == KEPT:
+            return [f"{actor} kept their gear instead of a(n) {item}."]
+        return [f"{actor} is carrying too much to store a(n) {item}."]
+    if kind == FLEE:
+        if value:
+            return [f"{actor} ran away, but their inventory was lost in the scuffle."]
+        return [f"{actor} can't run from the final enemy."]
+    if kind == DEATH:
+        return [f"{actor} was killed by {other}."]
+    return [f"Unknown event {kind}."]
+
+def render(path, game = None):
+    """
+        Yields the prose log of a stream (or of one game in it) line by line.
+    """
+    names = readNames(path)
+    current = None
+    for event in readEvents(path):
+        if game is not None and event[0] != game:
+            continue
+        if event[0] != current:
+            current = event[0]
+            yield f"---------------------------- Game {current} ----------------------------"
+        yield from renderEvent(event, names)
+
+def main():
+    """
+        Prints the prose log of a stream: python events.py battle-events.bin [game]
+    """
+    path = sys.argv[1] if len(sys.argv) > 1 else "battle-events.bin"
+    game = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    for line in render(path, game):
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+    Resolves many independent player-versus-enemy fights at once with NumPy for Monte Carlo
+    balance sweeps. The fights follow the rules of battle() for a player who always attacks:
+    the character with the higher agility goes first (the player wins ties), turns alternate,
+    damage is the attack times a random modifier between 1/2 and 2 (Character.damageGen()),
+    the amount blocked is half the defense times the same kind of modifier
+    (Character.takeDamage()), and health never drops below 0.
+"""
+
+import numpy as np
+
+from RPG import readItems
+
+#------------------------------ Fights ------------------------------
+
+class FightOutcomes:
+    """
+        Per-fight result arrays: whether the player won, the number of turns taken and the
+        health the player and the enemy were left with.
+    """
+    def __init__(self, playerWon, turns, playerHealth, enemyHealth):
+        self.playerWon = playerWon
+        self.turns = turns
+        self.playerHealth = playerHealth
+        self.enemyHealth = enemyHealth
+
+    def winRate(self):
+        """
+            Returns the fraction of fights won by the player.
+        """
+        return float(self.playerWon.mean()) if len(self.playerWon) else 0.0
+
+def roll(rng, size):
+    """
+        Draws random modifiers between 1/2 and 2 the same way as randrange(5, 21) / 10.
+    """
+    return rng.integers(5, 21, size) / 10
+
+def resolveFights(playerHealth, playerAttack, playerDefense, playerAgility,
+                  enemyHealth, enemyAttack, enemyDefense, enemyAgility, rng = None, maxTurns = 10000):
+    """
+        Given equally long arrays (or scalars) of player and enemy stats, fights every
+        player against its enemy until one of them reaches 0 health and returns the
+        FightOutcomes (for a single fight if every stat is a scalar). Fights are stepped
+        together one turn at a time and finished fights are dropped from the working
+        arrays. rng is a numpy Generator (or a seed).
+    """
+    rng = np.random.default_rng(rng)
+    arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(stat, dtype = np.int64)) for stat in
+        (playerHealth, playerAttack, playerDefense, playerAgility, enemyHealth, enemyAttack, enemyDefense, enemyAgility)])
+    pHealth, pAttack, pDefense, pAgility, eHealth, eAttack, eDefense, eAgility = arrays
+    size = len(pHealth)
+    # Final results, scattered back into place as fights finish.
+    finalPlayer = pHealth.copy()
+    finalEnemy = eHealth.copy()
+    turns = np.zeros(size, dtype = np.int64)
+
+    # Half the defense is what gets multiplied by the block modifier.
+    pBlock = pDefense // 2
+    eBlock = eDefense // 2
+    playerTurn = pAgility >= eAgility
+    index = np.arange(size)
+    working = [index, pHealth.copy(), eHealth.copy(), pAttack, eAttack, pBlock, eBlock, playerTurn]
+    # Fights that start with a character at 0 health are already over.
+    active = (pHealth > 0) & (eHealth > 0)
+    if not(active.all()):
+        working = [array[active] for array in working]
+
+    turn = 0
+    while len(working[0]) > 0 and turn < maxTurns:
+        index, pHealth, eHealth, pAttack, eAttack, pBlock, eBlock, playerTurn = working
+        turn += 1
+        count = len(index)
+        # Raw damage and the amount blocked, truncated like int() in damageGen() and takeDamage().
+        damage = (np.where(playerTurn, pAttack, eAttack) * roll(rng, count)).astype(np.int64)
+        blocked = (np.where(playerTurn, eBlock, pBlock) * roll(rng, count)).astype(np.int64)
+        modifier = np.maximum(damage - blocked, 0)
+        # Only the defender's health goes down (clamped at 0).
+        np.subtract(eHealth, modifier, out = eHealth, where = playerTurn)
+        np.subtract(pHealth, modifier, out = pHealth, where = ~playerTurn)
+        np.maximum(eHealth, 0, out = eHealth)
+        np.maximum(pHealth, 0, out = pHealth)
+        np.logical_not(playerTurn, out = playerTurn)
+
+        done = (pHealth == 0) | (eHealth == 0)
+        if done.any():
+            finished = index[done]
+            finalPlayer[finished] = pHealth[done]
+            finalEnemy[finished] = eHealth[done]
+            turns[finished] = turn
+            working = [array[~done] for array in working]
+
+    # Fights cut off by maxTurns keep the health they had at that point.
+    index, pHealth, eHealth = working[:3]
+    finalPlayer[index] = pHealth
+    finalEnemy[index] = eHealth
+    turns[index] = turn
+
+    return FightOutcomes(finalEnemy == 0, turns, finalPlayer, finalEnemy)
+
+def randomStats(rng, size):
+    """
+        Generates size sets of health, attack, defense and agility within the same ranges as
+        Character.__init__() (80-120 for health and 5-12 for the others).
+    """
+    return (rng.integers(80, 121, size), rng.integers(5, 13, size),
+            rng.integers(5, 13, size), rng.integers(5, 13, size))
+
+#------------------------------ Sweeps ------------------------------
+
+def loadouts(itemList, weightLimit = None):
+    """
+        Returns every (weapon, armor) pairing from itemList, including having no weapon or
+        no armor. If weightLimit is given, pairings heavier than it are left out.
+    """
+    pairs = []
+    for weapon in [None] + itemList[0]:
+        for armor in [None] + itemList[1]:
+            weight = (weapon.weight if weapon else 0) + (armor.weight if armor else 0)
+            if weightLimit is None or weight <= weightLimit:
+                pairs.append((weapon, armor))
+    return pairs
+
+def sweepGear(fightsPerPairing = 100000, seed = 0, itemList = None, weightLimit = 10):
+    """
+        Fights every player loadout that fits within weightLimit against every enemy gear
+        pairing, fightsPerPairing times each with freshly generated base stats. It returns
+        one row per pairing: (player weapon, player armor, enemy weapon, enemy armor,
+        win rate, average turns) with item names or None.
+    """
+    if itemList is None:
+        itemList = readItems()
+    rng = np.random.default_rng(seed)
+    rows = []
+    for playerWeapon, playerArmor in loadouts(itemList, weightLimit):
+        for enemyWeapon, enemyArmor in loadouts(itemList):
+            pHealth, pAttack, pDefense, pAgility = randomStats(rng, fightsPerPairing)
+            eHealth, eAttack, eDefense, eAgility = randomStats(rng, fightsPerPairing)
+            outcomes = resolveFights(
+                pHealth, pAttack + bonus(playerWeapon), pDefense + bonus(playerArmor), pAgility,
+                eHealth, eAttack + bonus(enemyWeapon), eDefense + bonus(enemyArmor), eAgility, rng)
+            rows.append((name(playerWeapon), name(playerArmor), name(enemyWeapon), name(enemyArmor),
+                         outcomes.winRate(), float(outcomes.turns.mean())))
+    return rows
+
+def bonus(item):
+    """
+        Returns the attack or defense an item adds (0 for no item).
+    """
+    return item.stat if item else 0
+
+def name(item):
+    """
+        Returns an item's name or None for no item.
+    """
+    return item.name if item else None
@@ -0,0 +1,409 @@
+"""
+    Finds the choices that give a player the best chance of winning a battle: which drop to
+    take from the loot menu, whether to replace gear, and when to drink a health potion or
+    run. The battle is searched as a game tree over the player's state (which enemy is being
+    fought, the weapon and armor carried, the potions left and both characters' health),
+    with every roll weighted by its exact probability (see solver.py). Each position of the
+    tree is evaluated once: the values of every position sharing a compact key (enemy,
+    weapon, armor, potions) are solved together as one table and kept in a transposition
+    table, and loot choices leading to gear that is no better than another choice are
+    pruned before their subtrees are ever solved.
+
+    The plan knows the whole battle (every enemy and the order they come in), so its win
+    probability is the most any player could expect. Ties are broken in favour of attacking,
+    taking the first item offered and keeping the gear already carried.
+"""
+
+import argparse
+import copy
+import json
+import time
+
+from RPG import Battle, Player, readItems, readEnemies, generateEnemies, FIGHT_START, PLAYER_TURN, ENEMY_TURN, FIGHT_END, OVER
+from simulator import Policy, GreedyPolicy, storeItem
+from solver import damageDistribution
+from rng import GameRandom
+
+# The player's actions (the numbers typed on the console).
+ATTACK, DRINK, RUN = range(3)
+# The chance an enemy drops a health potion: randrange(0, 10) > 7.
+POTION_CHANCE = 0.2
+
+#------------------------------ Plans ------------------------------
+
+class FightPlan:
+    """
+        The solved values of one fight for every player health and enemy health: the chance
+        of winning the battle from there with the player to move (first) and the enemy to
+        move (second), and the best action on the player's turn. Each is indexed
+        [player health][enemy health].
+    """
+    __slots__ = ("playerMoves", "enemyMoves", "actions")
+
+    def __init__(self, playerMoves, enemyMoves, actions):
+        self.playerMoves = playerMoves
+        self.enemyMoves = enemyMoves
+        self.actions = actions
+
+class Planner:
+    """
+        Plans a battle for a player (as they are when it starts) against enemies in the order
+        they will be fought. potion is the health potion enemies can drop. Gear is kept in
+        keys as an index into gear (0 for nothing).
+    """
+    def __init__(self, player, enemies, potion):
+        """
+            Creates a planner. Nothing is solved until a value or decision is asked for.
+        """
+        self.enemies = [(enemy.health, enemy.attack, enemy.defense, enemy.agility,
+                         [item for item in (enemy.weapon, enemy.armor) if item is not None]) for enemy in enemies]
+        self.potion = potion
+        self.maxHealth = player.MAX_HEALTH
+        self.weightLimit = player.WEIGHT_LIMIT
+        inventory = player.inventory
+        self.attack = player.baseAttack
+        self.defense = player.baseDefense
+        self.agility = player.agility
+        self.gear = [None]
+        self.gearIndexes = {None: 0}
+        for item in [inventory.weapon, inventory.armor] + [item for enemy in self.enemies for item in enemy[4]]:
+            self.gearId(item)
+        self.start = (0, self.gearId(inventory.weapon), self.gearId(inventory.armor), len(inventory.potions))
+        self.health = player.health
+        # The transposition table: a FightPlan for every (enemy, weapon, armor, potions) solved.
+        self.plans = {}
+        self.pruned = 0
+
+    def gearId(self, item):
+        """
+            Returns the number gear is kept as in keys, numbering new gear as it is seen.
+        """
+        if item not in self.gearIndexes:
+            self.gearIndexes[item] = len(self.gear)
+            self.gear.append(item)
+        return self.gearIndexes[item]
+
+    def stat(self, gear):
+        return self.gear[gear].stat if gear else 0
+
+    def weight(self, gear):
+        return self.gear[gear].weight if gear else 0
+
+    #------------------------------ Values ------------------------------
+
+    def winProbability(self):
+        """
+            Returns the chance of winning the battle from its start when playing the plan.
+        """
+        return self.value(*self.start, self.health)
+
+    def value(self, index, weapon, armor, potions, health):
+        """
+            Returns the chance of winning from the start of fight index with the given gear,
+            potions and health.
+        """
+        if index == len(self.enemies):
+            return 1.0
+        plan = self.plan(index, weapon, armor, potions)
+        enemyHealth = self.enemies[index][0]
+        if self.agility >= self.enemies[index][3]:
+            return plan.playerMoves[health][enemyHealth]
+        return plan.enemyMoves[health][enemyHealth]
+
+    def plan(self, index, weapon, armor, potions):
+        """
+            Returns the FightPlan for a key, solving it the first time it is asked for.
+        """
+        key = (index, weapon, armor, potions)
+        plan = self.plans.get(key)
+        if plan is None:
+            plan = self.plans[key] = self.solve(*key)
+        return plan
+
+    def solve(self, index, weapon, armor, potions):
+        """
+            Solves a fight for every player health and enemy health, bottom up from the lowest.
+
+            On the player's turn (A) an attack that does no damage hands the turn to the enemy
+            (B) at the same health and vice versa, so with a0 and b0 the chances of no damage
+            and Sa and Sb the sums over hits that do damage, attacking is worth
+            (Sa + a0 * Sb) / (1 - a0 * b0) as in solver.py. Drinking and running lead to
+            positions that are already solved, so A is the best of the three and B = Sb + b0 * A.
+        """
+        enemyHealth, enemyAttack, enemyDefense, enemyAgility, drops = self.enemies[index]
+        a0, toEnemy = damageDistribution(self.attack + self.stat(weapon), enemyDefense)
+        b0, toPlayer = damageDistribution(enemyAttack, self.defense + self.stat(armor))
+        denominator = 1 - a0 * b0
+        maxHealth = self.maxHealth
+        last = index == len(self.enemies) - 1
+        lower = self.plan(index, weapon, armor, potions - 1).enemyMoves if potions else None
+        recovery = self.potion.stat
+        playerMoves = [[0.0] * (enemyHealth + 1) for _ in range(maxHealth + 1)]
+        enemyMoves = [[0.0] * (enemyHealth + 1) for _ in range(maxHealth + 1)]
+        actions = [bytearray(enemyHealth + 1) for _ in range(maxHealth + 1)]
+
+        for health in range(1, maxHealth + 1):
+            playerRow = playerMoves[health]
+            enemyRow = enemyMoves[health]
+            actionRow = actions[health]
+            # The enemy is dead: the fight is won and the battle goes on from here.
+            playerRow[0] = enemyRow[0] = self.afterFight(index, weapon, armor, potions, health)
+            # Running away leaves the gear and potions behind (not allowed before the last enemy).
+            running = -1.0 if last else self.value(index + 1, 0, 0, 0, health)
+            healed = min(health + recovery, maxHealth)
+            for remaining in range(1, enemyHealth + 1):
+                sa = 0.0
+                for damage, chance in toEnemy:
+                    sa += chance * enemyRow[remaining - damage if damage < remaining else 0]
+                sb = 0.0
+                for damage, chance in toPlayer:
+                    sb += chance * playerMoves[health - damage if damage < health else 0][remaining]
+                # Drinking at full health only wastes the turn and the potion, so it is pruned.
+                best = running
+                action = RUN
+                if lower is not None and health < maxHealth and lower[healed][remaining] > best:
+                    best = lower[healed][remaining]
+                    action = DRINK
+                attacking = (sa + a0 * sb) / denominator if denominator else 0.0
+                if attacking >= best:
+                    best = attacking
+                    action = ATTACK
+                playerRow[remaining] = best
+                enemyRow[remaining] = sb + b0 * best
+                actionRow[remaining] = action
+        return FightPlan(playerMoves, enemyMoves, actions)
+
+    #------------------------------ Loot ------------------------------
+
+    def afterFight(self, index, weapon, armor, potions, health):
+        """
+            Returns the chance of winning once fight index is won: the loot (if any is
+            offered) is taken the best way and the battle moves on.
+        """
+        if index == len(self.enemies) - 1:
+            return 1.0
+        drops = self.enemies[index][4]
+        value = 0.0
+        for chance, loot in ((1 - POTION_CHANCE, drops), (POTION_CHANCE, drops + [self.potion])):
+            if loot:
+                value += chance * self.bestLoot(index, weapon, armor, potions, health, loot)[0]
+            else:
+                value += chance * self.value(index + 1, weapon, armor, potions, health)
+        return value
+
+    def lootOutcomes(self, weapon, armor, potions, loot):
+        """
+            Returns every way of taking loot as (choice, replace, (weapon, armor, potions)),
+            following the rules of Player.addItem().
+        """
+        weight = self.weight(weapon) + self.weight(armor)
+        unchanged = (weapon, armor, potions)
+        outcomes = []
+        for choice, item in enumerate(loot):
+            if item.kind == 'P':
+                fits = weight + item.weight <= self.weightLimit
+                outcomes.append((choice, False, (weapon, armor, potions + 1) if fits else unchanged))
+                continue
+            current = weapon if item.kind == 'W' else armor
+            gear = self.gearId(item)
+            changed = (gear, armor, potions) if item.kind == 'W' else (weapon, gear, potions)
+            if not(current):
+                # An empty slot is always filled if the item is light enough.
+                outcomes.append((choice, False, changed if weight + item.weight <= self.weightLimit else unchanged))
+            elif weight - self.weight(current) + item.weight <= self.weightLimit:
+                outcomes.append((choice, False, unchanged))
+                outcomes.append((choice, True, changed))
+            else:
+                outcomes.append((choice, False, unchanged))
+        return outcomes
+
+    def dominates(self, first, second):
+        """
+            Returns True if gear and potions first are at least as good as second: each slot
+            at least as strong and no heavier, and at least as many potions. Winning is never
+            less likely with more attack, defense or potions, and less weight never stops
+            anything being picked up later.
+        """
+        return all(self.stat(a) >= self.stat(b) and self.weight(a) <= self.weight(b)
+                   for a, b in ((first[0], second[0]), (first[1], second[1]))) and first[2] >= second[2]
+
+    def bestLoot(self, index, weapon, armor, potions, health, loot):
+        """
+            Returns (chance of winning, choice, replace) for the best way to take loot after
+            fight index. Outcomes dominated by another are skipped without being solved.
+        """
+        outcomes = []
+        for outcome in self.lootOutcomes(weapon, armor, potions, loot):
+            if any(outcome[2] == other[2] for other in outcomes):
+                continue
+            outcomes.append(outcome)
+        kept = [outcome for outcome in outcomes
+                if not(any(other[2] != outcome[2] and self.dominates(other[2], outcome[2]) for other in outcomes))]
+        self.pruned += len(outcomes) - len(kept)
+        best = None
+        for choice, replace, state in kept:
+            value = self.value(index + 1, *state, health)
+            if best is None or value > best[0]:
+                best = (value, choice, replace)
+        return best
+
+    #------------------------------ Decisions ------------------------------
+
+    def key(self, player, index):
+        """
+            Returns the key of a player's state during fight index.
+        """
+        inventory = player.inventory
+        return (index, self.gearId(inventory.weapon), self.gearId(inventory.armor), len(inventory.potions))
+
+    def action(self, player, enemy, index):
+        """
+            Returns the best action (ATTACK, DRINK or RUN) for the player's turn.
+        """
+        return self.plan(*self.key(player, index)).actions[player.health][enemy.health]
+
+    def loot(self, player, index, loot):
+        """
+            Returns (choice, replace): the index of the item to take from loot dropped in fight
+            index and whether to answer yes if asked to replace gear.
+        """
+        _, choice, replace = self.bestLoot(*self.key(player, index), player.health, loot)
+        return choice, replace
+
+    def policy(self):
+        """
+            Returns the plan solved so far for every key, to be saved as JSON: the key's enemy,
+            gear and potions, and for each player health a row of the best action against each
+            enemy health from 1 up ('a' attack, 'd' drink a potion, 'r' run).
+        """
+        letters = "adr"
+        plans = []
+        for (index, weapon, armor, potions), plan in sorted(self.plans.items()):
+            plans.append({"enemy": index, "weapon": self.gear[weapon].name if weapon else None,
+                          "armor": self.gear[armor].name if armor else None, "potions": potions,
+                          "actions": ["".join(letters[action] for action in row[1:]) for row in plan.actions[1:]]})
+        return plans
+
+class PlannedPolicy(Policy):
+    """
+        Makes the planner's choices through the simulator's Policy interface. Loot is planned
+        for the fight the last action was chosen in, since a fight can only be won by attacking.
+    """
+    def __init__(self, planner):
+        super().__init__()
+        self.planner = planner
+        self.index = 0
+        self.replace = False
+
+    def chooseAction(self, player, enemy, index, size):
+        self.index = index
+        return self.planner.action(player, enemy, index)
+
+    def chooseLoot(self, player, loot):
+        choice, self.replace = self.planner.loot(player, self.index, loot)
+        return choice
+
+    def chooseReplace(self, player, oldItem, newItem):
+        return self.replace
+
+#------------------------------ Playing ------------------------------
+
+def playBattleWith(battle, policy):
+    """
+        Plays a Battle headlessly to the end with a policy (from simulator.py) making every
+        choice and returns True if it was won.
+    """
+    player = battle.player
+    while battle.phase != OVER:
+        enemy = battle.enemy()
+        if battle.phase == FIGHT_START:
+            battle.startFight()
+        elif battle.phase == PLAYER_TURN:
+            choice = policy.chooseAction(player, enemy, battle.index, len(battle.enemies))
+            if choice == ATTACK:
+                battle.playerAttack()
+            elif choice == DRINK:
+                if player.hasPotion():
+                    player.drinkPotion(battle.potion)
+                battle.endTurn()
+            else:
+                if not(battle.lastEnemy()):
+                    player.dropInventory()
+                battle.endTurn(not(battle.lastEnemy()))
+        elif battle.phase == ENEMY_TURN:
+            battle.enemyAttack()
+        elif battle.phase == FIGHT_END:
+            battle.finishFight()
+        else:
+            storeItem(player, battle.loot[policy.chooseLoot(player, battle.loot)], policy)
+            battle.nextFight()
+    return battle.result == "Victory!"
+
+def copyBattle(player, potion, enemies, rng):
+    """
+        Returns a new Battle against copies of enemies in the order given, for a copy of
+        player, rolling with rng.
+    """
+    hero = copy.copy(player)
+    hero.inventory = copy.copy(player.inventory)
+    hero.inventory.potions = list(player.inventory.potions)
+    hero.rng = rng
+    fighters = []
+    for enemy in enemies:
+        fighter = copy.copy(enemy)
+        fighter.rng = rng
+        fighters.append(fighter)
+    battle = Battle(hero, potion, [], rng)
+    battle.enemies = fighters
+    battle.phase = FIGHT_START
+    battle.result = None
+    return battle
+
+#------------------------------ Main ------------------------------
+
+def main():
+    """
+        Plans the battle of one game from the command line (generated from a seed the way
+        main() generates it), then checks the plan by playing it many times and compares it
+        with the simulator's policies.
+    """
+    parser = argparse.ArgumentParser(description = "Find the choices that maximize the chance of winning a battle.")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the game to plan")
+    parser.add_argument("--start", type = int, default = 0, help = "index of the starting item")
+    parser.add_argument("--games", type = int, default = 20000, help = "games to play to check the plan")
+    parser.add_argument("--dump", help = "write the plan for every state solved to this JSON file")
+    args = parser.parse_args()
+
+    itemList = readItems()
+    rng = GameRandom(args.seed)
+    player = Player("Hero", rng)
+    items = itemList[0] + itemList[1] + itemList[2]
+    storeItem(player, items[args.start], Policy())
+    potion = itemList[2][0]
+    enemies = Battle(player, potion, generateEnemies(itemList, readEnemies(), rng = rng), rng).enemies
+
+    start = time.perf_counter()
+    planner = Planner(player, enemies, potion)
+    probability = planner.winProbability()
+    elapsed = time.perf_counter() - start
+    print(f"Hero: health {player.health}, attack {player.attack}, defense {player.defense}, agility {player.agility}, "
+          f"starting with a(n) {items[args.start].name}")
+    for enemy in enemies:
+        gear = ", ".join(item.name for item in (enemy.weapon, enemy.armor) if item is not None) or "no gear"
+        print(f"  {enemy.name}: health {enemy.health}, attack {enemy.attack}, defense {enemy.defense}, "
+              f"agility {enemy.agility} ({gear})")
+    print(f"Planned win probability: {probability:.6f}")
+    print(f"Fights solved: {len(planner.plans)}, loot outcomes pruned: {planner.pruned}, elapsed: {elapsed:.2f}s")
+    if args.dump:
+        with open(args.dump, "w") as outfile:
+            json.dump(planner.policy(), outfile, indent = 1)
+
+    if args.games:
+        for label, policy in (("Plan", PlannedPolicy(planner)), ("Greedy", GreedyPolicy()), ("Attack", Policy())):
+            wins = 0
+            for game in range(args.games):
+                wins += playBattleWith(copyBattle(player, potion, enemies, GameRandom(game)), policy)
+            print(f"{label + ':':<8} {wins / args.games:.4f} win rate over {args.games:,} games")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+    Opt-in timing of where a game spends its time. A Profiler gathers timers (how long each
+    call of something took) and counters. It times the phases of battles once it is set with
+    RPG.setProfiler() (or passed to simulator.playGame()), and the methods of the game's
+    classes and the functions of its modules once they are instrumented with instrument(),
+    which swaps them for timed wrappers until restore() puts the originals back. Nothing is
+    wrapped and the battle loops only check for a profiler when profiling is off, so it costs
+    next to nothing then.
+
+    Times are inclusive: a phase includes the methods called during it. The aggregates
+    (calls, total, mean, p50 and p99 per timer) can be exported as a JSON report or as a
+    dump in the format cProfile writes, readable with pstats or any viewer that reads it.
+"""
+
+import functools
+import json
+import marshal
+import os
+import time
+from array import array
+
+class Profiler:
+    """
+        Collects the duration of every timed call (in nanoseconds) by name, plus counters.
+    """
+    # The clock timings are taken with.
+    clock = staticmethod(time.perf_counter_ns)
+
+    def __init__(self):
+        """
+            Creates an empty profiler.
+        """
+        self.timings = {}
+        self.counters = {}
+        # (owner, attribute, original) for everything instrumented, to restore it later.
+        self.patched = []
+        # Where each timer's code lives, for the cProfile-style dump.
+        self.locations = {}
+
+    def record(self, name, started):
+        """
+            Records a call of name that started at started (a value of clock()).
+        """
+        elapsed = time.perf_counter_ns() - started
+        try:
+            self.timings[name].append(elapsed)
+        except KeyError:
+            self.timings[name] = array("q", [elapsed])
+
+    def count(self, name, amount = 1):
+        """
+            Adds amount to the counter name.
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def wrap(self, name, function):
+        """
+            Returns a wrapper of function that records each call's duration under name.
+        """
+        record = self.record
+        clock = time.perf_counter_ns
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            started = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, started)
+        code = getattr(function, "__code__", None)
+        if code is not None:
+            self.locations[name] = (code.co_filename, code.co_firstlineno, code.co_name)
+        return timed
+
+    def instrument(self, owner, names = None):
+        """
+            Times the methods of a class or the functions of a module (owner), either those
+            listed in names or every public function defined in it. Timers are named
+            Owner.name. A module's functions are timed wherever they are looked up through
+            the module, which includes calls from inside it but not from modules that
+            imported them by name.
+        """
+        label = owner.__name__
+        # Only functions defined in the module (or the class's module) itself are timed.
+        home = owner.__module__ if isinstance(owner, type) else label
+        # A module run as a script is still labelled by its file name.
+        if label == "__main__":
+            label = os.path.splitext(os.path.basename(owner.__file__))[0]
+        if names is None:
+            names = [name for name, value in vars(owner).items()
+                     if not(name.startswith("_")) and hasattr(value, "__code__") and value.__module__ == home]
+        for name in names:
+            original = vars(owner)[name]
+            self.patched.append((owner, name, original))
+            setattr(owner, name, self.wrap(f"{label}.{name}", original))
+
+    def restore(self):
+        """
+            Puts back everything instrument() replaced.
+        """
+        while self.patched:
+            owner, name, original = self.patched.pop()
+            setattr(owner, name, original)
+
+    def reset(self):
+        """
+            Drops the timings and counters gathered so far.
+        """
+        self.timings.clear()
+        self.counters.clear()
+
+    def summary(self):
+        """
+            Returns the aggregates of every timer by name (calls, and total, mean, p50 and p99
+            in seconds) along with the counters.
+        """
+        timers = {}
+        for name, durations in self.timings.items():
+            ordered = sorted(durations)
+            calls = len(ordered)
+            total = sum(ordered)
+            timers[name] = {"calls": calls, "total": total / 1e9, "mean": total / calls / 1e9,
+                            "p50": ordered[(calls - 1) // 2] / 1e9, "p99": ordered[(calls - 1) * 99 // 100] / 1e9}
+        return {"timers": timers, "counters": dict(self.counters)}
+
+    def writeReport(self, path):
+        """
+            Writes summary() to path as JSON.
+        """
+        with open(path, "w") as outfile:
+            json.dump(self.summary(), outfile, indent = 2, sort_keys = True)
+
+    def dumpStats(self, path):
+        """
+            Writes the timers to path in the format cProfile's dump_stats() writes, so they
+            can be read with pstats.Stats(path). Timers without code of their own (such as
+            battle phases) are listed like built-ins.
+        """
+        stats = {}
+        for name, durations in self.timings.items():
+            total = sum(durations) / 1e9
+            location = self.locations.get(name, ("~", 0, name))
+            stats[location] = (len(durations), len(durations), total, total, {})
+        with open(path, "wb") as outfile:
+            marshal.dump(stats, outfile)
+
+    def table(self, limit = 20):
+        """
+            Returns the timers with the most total time as lines of text.
+        """
+        timers = self.summary()["timers"]
+        lines = [f"{'Timer':<32}{'calls':>12}{'total s':>10}{'p50 us':>12}{'p99 us':>12}"]
+        for name, timer in sorted(timers.items(), key = lambda entry: -entry[1]["total"])[:limit]:
+            lines.append(f"{name:<32}{timer['calls']:>12,}{timer['total']:>10.3f}"
+                         f"{timer['p50'] * 1e6:>12.2f}{timer['p99'] * 1e6:>12.2f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<32}{value:>12,}")
+        return lines
+
+def instrumentGame(profiler, modules = ()):
+    """
+        Times the methods of the game's classes (Inventory, Character, Player, Enemy, Battle
+        and GameRandom) and the functions of the RPG package's modules, plus the functions of
+        any other modules given. Modules that imported one of those functions by name (from
+        RPG.console import say) get the timed version too, so every call site is counted.
+    """
+    import RPG
+    from RPG import cli, combat, console, items, models
+    from rng import GameRandom
+    for owner in (RPG.Inventory, RPG.Character, RPG.Player, RPG.Enemy, RPG.Battle, GameRandom, console, items, combat,
+                  *modules):
+        profiler.instrument(owner)
+    timed = {id(original): getattr(owner, name) for owner, name, original in profiler.patched
+             if not(isinstance(owner, type))}
+    for module in (RPG, cli, combat, console, items, models, *modules):
+        for name, value in list(vars(module).items()):
+            wrapper = timed.get(id(value))
+            if wrapper is not None:
+                profiler.patched.append((module, name, value))
+                setattr(module, name, wrapper)
@@ -0,0 +1,353 @@
+"""
+    Records games as compact input traces and replays them. A trace holds a game's seed, the
+    hero's name and every choice typed into the console (the starting item, each action, each
+    loot index and each replace answer as 1 for yes and 0 for no), followed by how the game
+    ended. Since every roll comes from the game's GameRandom, the seed and the choices are
+    enough to play the game again: headlessly through the simulator at full speed, for
+    regression checks over many traces, or on the console to reproduce a bug report.
+
+    A trace file starts with an 8 byte magic string followed by one record per game, made of
+    variable-length integers (7 bits per byte, zigzag encoded so negative numbers stay
+    small): seed, name length, name (UTF-8), outcome, health, length of the choices in bytes
+    and the choices themselves. Most choices fit in a single byte.
+"""
+
+import argparse
+import atexit
+import os
+import time
+
+import RPG
+from simulator import Policy, playGame
+from RPG import readItems
+from rng import GameRandom
+
+MAGIC = b"RPGTRC01"
+# How a traced game ended: lost, won, or stopped part way (the game raised an error).
+LOST, WON, UNFINISHED = range(3)
+OUTCOMES = {LOST: "lost", WON: "won", UNFINISHED: "unfinished"}
+
+#------------------------------ Encoding ------------------------------
+
+def encode(value, buffer):
+    """
+        Appends an integer to buffer (a bytearray) as a zigzag variable-length integer.
+    """
+    value = (value << 1) ^ -1 if value < 0 else value << 1
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def decode(data, position):
+    """
+        Reads a zigzag variable-length integer from data at position and returns it with the
+        position after it.
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    return (value >> 1) ^ -(value & 1), position
+
+def decodeAll(data):
+    """
+        Returns every integer in data (a run of encoded integers) as a list.
+    """
+    # Every value below 64 (and above -65) is a single byte under 0x80.
+    if data.isascii():
+        return [(byte >> 1) ^ -(byte & 1) for byte in data]
+    values = []
+    position = 0
+    while position < len(data):
+        value, position = decode(data, position)
+        values.append(value)
+    return values
+
+#------------------------------ Traces ------------------------------
+
+class GameTrace:
+    """
+        One recorded game: its seed, the hero's name, every choice made in order and how
+        it ended (LOST, WON or UNFINISHED, with the player's health at the end).
+    """
+    def __init__(self, seed, name, choices = None, outcome = UNFINISHED, health = 0):
+        self.seed = seed
+        self.name = name
+        self.choices = choices if choices is not None else []
+        self.outcome = outcome
+        self.health = health
+
+    def __repr__(self):
+        return f"GameTrace(seed={self.seed}, name={self.name!r}, choices={len(self.choices)}, outcome={OUTCOMES[self.outcome]}, health={self.health})"
+
+class TraceWriter:
+    """
+        Appends traced games to a trace file. A game is encoded when it ends and written once
+        bufferSize bytes are waiting (and on flush() or close()). A game still running when
+        the writer is closed (or the program exits) is written as UNFINISHED.
+    """
+    def __init__(self, path = "battle-trace.bin", bufferSize = 1 << 16):
+        """
+            Opens the trace file at path, creating it if needed or appending to it otherwise.
+        """
+        self.path = path
+        self.bufferSize = bufferSize
+        self.buffer = bytearray()
+        self.game = None
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        atexit.register(self.close)
+
+    def startGame(self, seed, name):
+        """
+            Starts recording a game played from seed by a hero called name.
+        """
+        self.finish(UNFINISHED)
+        self.game = GameTrace(seed, name)
+
+    def choose(self, choice):
+        """
+            Records a choice (an integer) of the current game.
+        """
+        if self.game is not None:
+            self.game.choices.append(choice)
+
+    def endGame(self, victory, health = 0):
+        """
+            Ends the current game, won or lost, with the player's health at the end.
+        """
+        self.finish(WON if victory else LOST, health)
+
+    def finish(self, outcome, health = 0):
+        """
+            Ends the current game (if any) with an outcome and encodes it.
+        """
+        game = self.game
+        if game is None:
+            return
+        self.game = None
+        game.outcome = outcome
+        game.health = health
+        self.add(game)
+
+    def add(self, game):
+        """
+            Encodes a whole GameTrace into the buffer.
+        """
+        buffer = self.buffer
+        encode(game.seed, buffer)
+        name = game.name.encode()
+        encode(len(name), buffer)
+        buffer += name
+        encode(game.outcome, buffer)
+        encode(game.health, buffer)
+        choices = bytearray()
+        for choice in game.choices:
+            encode(choice, choices)
+        encode(len(choices), buffer)
+        buffer += choices
+        if len(buffer) >= self.bufferSize:
+            self.flush()
+
+    def flush(self):
+        """
+            Writes the encoded games to disk.
+        """
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer.clear()
+
+    def close(self):
+        """
+            Writes any game in progress as UNFINISHED along with the encoded games and closes the file.
+        """
+        if self.file.closed:
+            return
+        atexit.unregister(self.close)
+        self.finish(UNFINISHED)
+        self.flush()
+        self.file.close()
+
+def readTraces(path = "battle-trace.bin"):
+    """
+        Yields every GameTrace in a trace file.
+    """
+    with open(path, "rb") as infile:
+        data = infile.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a trace file")
+    position = len(MAGIC)
+    while position < len(data):
+        seed, position = decode(data, position)
+        length, position = decode(data, position)
+        name = data[position:position + length].decode()
+        position += length
+        outcome, position = decode(data, position)
+        health, position = decode(data, position)
+        length, position = decode(data, position)
+        choices = decodeAll(data[position:position + length])
+        position += length
+        yield GameTrace(seed, name, choices, outcome, health)
+
+#------------------------------ Replaying ------------------------------
+
+class TraceEnded(Exception):
+    """
+        Raised when a replayed game asks for more choices than its trace recorded.
+    """
+
+class TracePolicy(Policy):
+    """
+        Makes the choices recorded in a trace, in order. Checking stats or inventory (3 and 4)
+        never changed the game so those choices are skipped. Every choice is checked before it
+        is used: an index the console game would have failed on (one that picks no item)
+        raises a ValueError, just as the recorded game stopped there.
+    """
+    def __init__(self, trace):
+        super().__init__()
+        self.choices = trace.choices
+        self.position = 0
+
+    def next(self):
+        """
+            Returns the next recorded choice.
+        """
+        if self.position == len(self.choices):
+            raise TraceEnded(f"the trace ran out of choices after {self.position}")
+        choice = self.choices[self.position]
+        self.position += 1
+        return choice
+
+    def index(self, size):
+        """
+            Returns the next recorded choice as an index into a list of size items.
+        """
+        choice = self.next()
+        if not(0 <= choice < size):
+            raise ValueError(f"choice {choice} is not one of the {size} options")
+        return choice
+
+    def chooseStartingItem(self, player, items):
+        return self.index(len(items))
+
+    def chooseAction(self, player, enemy, index, size):
+        choice = self.next()
+        while choice == 3 or choice == 4:
+            choice = self.next()
+        return choice
+
+    def chooseLoot(self, player, loot):
+        return self.index(len(loot))
+
+    def chooseReplace(self, player, oldItem, newItem):
+        return self.next() == 1
+
+    def finished(self):
+        """
+            Returns True if every recorded choice has been made.
+        """
+        return self.position == len(self.choices)
+
+def replayGame(trace, itemList, rng = None):
+    """
+        Replays a trace headlessly and returns (outcome, health) as the replay ended. A
+        replay that raises, or does not use up every choice, is UNFINISHED. rng (a
+        GameRandom) is reseeded and reused if given.
+    """
+    policy = TracePolicy(trace)
+    try:
+        result = playGame(trace.seed, itemList, policy, trace.name, rng = rng)
+    except (TraceEnded, ValueError):
+        return UNFINISHED, 0
+    # Choices left over after the game was decided (other than checks) mean it went differently.
+    while not(policy.finished()) and policy.choices[policy.position] in (3, 4):
+        policy.position += 1
+    if not(policy.finished()):
+        return UNFINISHED, 0
+    return (WON if result.victory else LOST), result.health
+
+def replayAll(path = "battle-trace.bin", itemList = None):
+    """
+        Replays every trace in a trace file and returns (games replayed, traces whose replay
+        ended differently from the recording).
+    """
+    if itemList is None:
+        itemList = readItems()
+    games = 0
+    mismatches = []
+    rng = GameRandom()
+    for trace in readTraces(path):
+        games += 1
+        outcome, health = replayGame(trace, itemList, rng)
+        if outcome != trace.outcome or (outcome != UNFINISHED and health != trace.health):
+            mismatches.append(trace)
+    return games, mismatches
+
+def answers(trace):
+    """
+        Returns an input() replacement that types the hero's name and then the choices of a
+        trace into the console game.
+    """
+    responses = iter(trace.choices)
+    named = []
+    def answer(prompt = ""):
+        if not(named):
+            named.append(True)
+            return trace.name
+        choice = next(responses, None)
+        if choice is None:
+            raise TraceEnded("the trace ran out of choices")
+        if "(y/n)" in prompt:
+            return 'y' if choice == 1 else 'n'
+        return str(choice)
+    return answer
+
+def replayConsole(trace):
+    """
+        Replays a trace through main() with its full console output and battle log, to see
+        exactly what the player saw.
+    """
+    previous = RPG.setInput(answers(trace))
+    try:
+        RPG.main(trace.seed)
+    finally:
+        RPG.setInput(previous)
+
+#------------------------------ Main ------------------------------
+
+def main():
+    """
+        Replays a trace file from the command line: every game headlessly (reporting any
+        that end differently), or one game on the console with --game.
+    """
+    parser = argparse.ArgumentParser(description = "Replay recorded games of the RPG.")
+    parser.add_argument("path", nargs = "?", default = "battle-trace.bin", help = "trace file")
+    parser.add_argument("--game", type = int, help = "replay only this game (numbered from 0) on the console")
+    args = parser.parse_args()
+
+    if not(os.path.exists(args.path)):
+        parser.error(f"no trace file at {args.path}")
+    if args.game is not None:
+        for number, trace in enumerate(readTraces(args.path)):
+            if number == args.game:
+                replayConsole(trace)
+                return
+        parser.error(f"{args.path} has no game {args.game}")
+
+    start = time.perf_counter()
+    games, mismatches = replayAll(args.path)
+    elapsed = time.perf_counter() - start
+    for trace in mismatches[:20]:
+        print(f"Mismatch: {trace}")
+    print(f"Games: {games}, Mismatches: {len(mismatches)}")
+    print(f"Elapsed: {elapsed:.2f}s ({games / elapsed if elapsed else 0:,.0f} games per second)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+    A store of simulation results with one fixed-width 32 byte record per fight, so
+    campaigns of hundreds of millions of fights never hold them in Python lists. Records are
+    written straight into a memory-mapped file, which grows a block of records at a time,
+    and running totals (games and fights won, lost and fled, turns and health left) are kept
+    up to date as they arrive.
+
+    Records only count once they are committed: every commitEvery games (and on close()) the
+    records are flushed to disk first and then the header, which holds the number of records
+    and games committed, the seed of the next game and the totals. A sweep that crashes
+    loses at most the games since the last commit, and reopening the store carries on from
+    the last committed record (simulator.py picks up at the next seed). Names of enemies and
+    items are stored once in a text file next to the store (path + ".names") as in events.py.
+
+    Record fields: seed (of the game), fight (its position in the battle), maxHealth, attack,
+    defense and agility (the player's at the start of the fight), enemy, weapon and armor
+    (name numbers of the enemy and its gear, 0 for none), outcome (WON, LOST or FLED), turns,
+    health (the player's afterwards) and enemyHealth. Seeds are stored unsigned, so any seed
+    from 0 up to 2**64 can be recorded.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from events import readNames
+
+# How a fight ended for the player.
+WON, LOST, FLED = range(3)
+OUTCOMES = {WON: "won", LOST: "lost", FLED: "fled"}
+
+MAGIC = b"RPGRES01"
+# The header: magic, records, games, next seed, games won, fights won, lost and fled, turns and health left.
+HEADER = struct.Struct("<8sqqQ6q")
+# The turns histogram follows the header (the last bucket counts every longer fight) and the records start at DATA.
+HISTOGRAM = 128
+TURN_BUCKETS = 64
+DATA = 1024
+RECORD = struct.Struct("<QHhhhhHHHBxHhh")
+# The same layout as RECORD for viewing records with NumPy.
+FIELDS = [("seed", "<u8"), ("fight", "<u2"), ("maxHealth", "<i2"), ("attack", "<i2"), ("defense", "<i2"),
+          ("agility", "<i2"), ("enemy", "<u2"), ("weapon", "<u2"), ("armor", "<u2"), ("outcome", "u1"),
+          ("pad", "u1"), ("turns", "<u2"), ("health", "<i2"), ("enemyHealth", "<i2")]
+
+class ResultStore:
+    """
+        Appends fight records to a memory-mapped store file and keeps its totals.
+    """
+    def __init__(self, path = "results.bin", commitEvery = 10000, growBy = 1 << 16):
+        """
+            Opens the store at path, creating it if needed. An existing store continues after
+            its last committed record; anything written after that is overwritten.
+        """
+        self.path = path
+        self.commitEvery = commitEvery
+        self.growBy = growBy
+        self.names = readNames(path) or [""]
+        self.nameIds = {name: index for index, name in enumerate(self.names)}
+        self.savedNames = len(self.names) if os.path.exists(path + ".names") else 0
+        self.file = open(path, "r+b" if os.path.exists(path) else "w+b")
+        size = os.fstat(self.file.fileno()).st_size
+        if size == 0:
+            self.file.truncate(DATA + growBy * RECORD.size)
+            size = DATA + growBy * RECORD.size
+        self.map = mmap.mmap(self.file.fileno(), size)
+        magic, *header = HEADER.unpack_from(self.map)
+        if magic == bytes(len(MAGIC)):
+            self.map[:len(MAGIC)] = MAGIC
+        elif magic != MAGIC:
+            self.map.close()
+            self.file.close()
+            raise ValueError(f"{path} is not a results store")
+        [self.records, self.games, self.nextSeed, self.gamesWon, won, lost, fled, self.turns, self.healthLeft] = header
+        self.outcomes = [won, lost, fled]
+        self.turnCounts = array("q", self.map[HISTOGRAM:HISTOGRAM + TURN_BUCKETS * 8])
+        self.capacity = (size - DATA) // RECORD.size
+        self.uncommitted = 0
+        # The records up to the end of the last game ended.
+        self.ended = self.records
+
+    def nameId(self, name):
+        """
+            Returns the number of a name, numbering it if it is new (0 is nothing).
+        """
+        nameId = self.nameIds.get(name)
+        if nameId is None:
+            nameId = len(self.names)
+            self.names.append(name)
+            self.nameIds[name] = nameId
+        return nameId
+
+    def grow(self):
+        """
+            Makes room for growBy more records. The file is mapped again rather than resized
+            so views handed out by view() stay valid (over the records they were made with).
+        """
+        self.capacity += self.growBy
+        self.file.truncate(DATA + self.capacity * RECORD.size)
+        self.map = mmap.mmap(self.file.fileno(), DATA + self.capacity * RECORD.size)
+
+    def add(self, seed, fight, player, enemy, outcome, turns, stats = None):
+        """
+            Adds the record of a fight that has ended. player and enemy are the characters
+            afterwards; stats are the player's (maxHealth, attack, defense, agility) at the
+            start of the fight if they may have changed since (the player's now by default).
+        """
+        if self.records == self.capacity:
+            self.grow()
+        if stats is None:
+            stats = (player.MAX_HEALTH, player.attack, player.defense, player.agility)
+        weapon = enemy.weapon
+        armor = enemy.armor
+        RECORD.pack_into(self.map, DATA + self.records * RECORD.size, seed, fight, *stats, self.nameId(enemy.name),
+                         self.nameId(weapon.name) if weapon is not None else 0,
+                         self.nameId(armor.name) if armor is not None else 0,
+                         outcome, turns, player.health, enemy.health)
+        self.records += 1
+        self.outcomes[outcome] += 1
+        self.turns += turns
+        self.turnCounts[turns if turns < TURN_BUCKETS else TURN_BUCKETS - 1] += 1
+        if outcome == WON:
+            self.healthLeft += player.health
+
+    def endGame(self, seed, victory):
+        """
+            Ends the game played from seed, committing every commitEvery games.
+        """
+        self.games += 1
+        self.gamesWon += victory
+        self.nextSeed = seed + 1
+        self.ended = self.records
+        self.uncommitted += 1
+        if self.uncommitted >= self.commitEvery:
+            self.commit()
+
+    def commit(self):
+        """
+            Makes every record and game added so far durable: the names and records are
+            written to disk before the header that counts them.
+        """
+        if len(self.names) > self.savedNames:
+            with open(self.path + ".names", "a") as outfile:
+                outfile.writelines(name + "\n" for name in self.names[self.savedNames:])
+            self.savedNames = len(self.names)
+        self.map.flush()
+        HEADER.pack_into(self.map, 0, MAGIC, self.records, self.games, self.nextSeed, self.gamesWon,
+                         *self.outcomes, self.turns, self.healthLeft)
+        self.map[HISTOGRAM:HISTOGRAM + TURN_BUCKETS * 8] = self.turnCounts.tobytes()
+        # The header's page (a file trimmed by close() can be smaller than a page).
+        self.map.flush(0, min(mmap.PAGESIZE, len(self.map)))
+        self.uncommitted = 0
+
+    def rollback(self):
+        """
+            Drops the records of a game that was not ended (it stopped part way), taking them
+            back out of the totals.
+        """
+        for record in RECORD.iter_unpack(self.map[DATA + self.ended * RECORD.size:DATA + self.records * RECORD.size]):
+            outcome, turns, health = record[9], record[10], record[11]
+            self.outcomes[outcome] -= 1
+            self.turns -= turns
+            self.turnCounts[turns if turns < TURN_BUCKETS else TURN_BUCKETS - 1] -= 1
+            if outcome == WON:
+                self.healthLeft -= health
+        self.records = self.ended
+
+    def close(self):
+        """
+            Commits and closes the store, trimming the file to the records it holds. The
+            records of a game that was not ended are dropped, so it is played again on resuming.
+        """
+        self.rollback()
+        self.commit()
+        self.map.close()
+        self.file.truncate(DATA + self.records * RECORD.size)
+        self.file.close()
+
+    #------------------------------ Totals ------------------------------
+
+    def winRate(self):
+        """
+            Returns the fraction of games won.
+        """
+        return self.gamesWon / self.games if self.games else 0.0
+
+    def averageTurns(self):
+        """
+            Returns the average number of turns per fight.
+        """
+        return self.turns / self.records if self.records else 0.0
+
+    def summary(self):
+        """
+            Returns the totals as a dictionary.
+        """
+        won = self.outcomes[WON]
+        return {
+            "games": self.games,
+            "wins": self.gamesWon,
+            "winRate": self.winRate(),
+            "fights": self.records,
+            "fightsWon": won,
+            "fightsLost": self.outcomes[LOST],
+            "fightsFled": self.outcomes[FLED],
+            "averageTurns": self.averageTurns(),
+            "averageHealthLeft": self.healthLeft / won if won else 0.0,
+            "turnsPerFight": {turns: count for turns, count in enumerate(self.turnCounts) if count},
+            "nextSeed": self.nextSeed,
+        }
+
+    def view(self):
+        """
+            Returns the records added so far as a NumPy structured array with the fields of
+            FIELDS (requires NumPy), a view of the memory-mapped file rather than a copy. It
+            must be dropped before the store is closed.
+        """
+        import numpy as np
+        return np.frombuffer(self.map, dtype = FIELDS, count = self.records, offset = DATA)
+
+#------------------------------ Reading ------------------------------
+
+def readHeader(path):
+    """
+        Returns the committed totals of a store as (records, games, next seed, games won,
+        fights won, lost and fled, turns, health left).
+    """
+    with open(path, "rb") as infile:
+        magic, *header = HEADER.unpack(infile.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a results store")
+    return header
+
+def readResults(path):
+    """
+        Yields every committed record of a store as a tuple in the order of FIELDS (without
+        the padding) straight from the memory-mapped file.
+    """
+    records = readHeader(path)[0]
+    if records == 0:
+        return
+    with open(path, "rb") as infile, mmap.mmap(infile.fileno(), 0, access = mmap.ACCESS_READ) as view:
+        yield from RECORD.iter_unpack(memoryview(view)[DATA:DATA + records * RECORD.size])
+
+def loadResults(path):
+    """
+        Memory-maps every committed record of a store as a read-only NumPy structured array
+        with the fields of FIELDS (requires NumPy). Nothing is parsed or copied until it is used.
+    """
+    import numpy as np
+    records = readHeader(path)[0]
+    if records == 0:
+        return np.zeros(0, dtype = FIELDS)
+    return np.memmap(path, dtype = FIELDS, mode = "r", offset = DATA, shape = (records,))
+
+def main():
+    """
+        Prints the totals of a store and, with NumPy, the win rate of fights against each
+        enemy gear: python results.py results.bin
+    """
+    path = sys.argv[1] if len(sys.argv) > 1 else "results.bin"
+    records, games, nextSeed, gamesWon, won, lost, fled, turns, healthLeft = readHeader(path)
+    print(f"Games: {games}, Wins: {gamesWon}, Win rate: {gamesWon / games if games else 0.0:.4f}, Next seed: {nextSeed}")
+    print(f"Fights: {records}, Won: {won}, Lost: {lost}, Fled: {fled}, "
+          f"Average turns: {turns / records if records else 0.0:.2f}")
+    try:
+        import numpy as np
+    except ImportError:
+        return
+    names = readNames(path)
+    fights = loadResults(path)
+    gear = fights["weapon"].astype(np.int64) << 16 | fights["armor"]
+    combinations, index, counts = np.unique(gear, return_inverse = True, return_counts = True)
+    wins = np.bincount(index, weights = fights["outcome"] == WON, minlength = len(combinations))
+    print(f"{'Weapon':<16}{'Armor':<16}{'Fights':>12}{'Win rate':>10}")
+    for combination, count, won in zip(combinations.tolist(), counts.tolist(), wins.tolist()):
+        print(f"{names[combination >> 16] or '-':<16}{names[combination & 0xFFFF] or '-':<16}{count:>12,}{won / count:>10.4f}")
+
+if __name__ == "__main__":
+    main()
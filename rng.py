@@ -0,0 +1,150 @@
+"""
+    The random number generator games are played with. Each game gets its own GameRandom,
+    seeded per game, which is passed into the characters and functions that roll dice
+    instead of everything sharing the global random module. Random numbers are drawn from
+    the underlying generator in blocks of raw 32-bit values, so most calls only read the
+    next value from a buffer.
+"""
+
+import os
+import random
+import sys
+from array import array
+
+# An array type code with 32-bit items, and whether they need swapping to read the bytes as little-endian.
+TYPECODE = "I" if array("I").itemsize == 4 else "L"
+SWAP = sys.byteorder == "big"
+
+class GameRandom:
+    """
+        A seedable generator with the randrange() and random() methods the game uses. Values
+        are pre-drawn blockSize at a time as 32-bit integers. randrange(start, stop) maps a
+        value onto the range by multiplying and shifting, which is reproducible and fast; the
+        bias this introduces is at most (stop - start) / 2**32, far below anything a game
+        could notice. Ranges must be no wider than 2**32 and must not be empty.
+    """
+    def __init__(self, seed = None, blockSize = 64):
+        """
+            Creates a generator from seed (any value random.seed() accepts; None picks a
+            seed from the operating system).
+        """
+        self.blockSize = blockSize
+        self.generator = None
+        self.seed(seed)
+
+    def seed(self, seed = None):
+        """
+            Restarts the generator from seed, dropping any pre-drawn values.
+        """
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), "little")
+        self.seedValue = seed
+        if self.generator is None:
+            self.generator = random.Random(seed)
+        else:
+            self.generator.seed(seed)
+        self.block = array(TYPECODE)
+        self.position = 0
+        # Blocks drawn since seeding, so the state can be saved as (seed, blocks, position).
+        self.blocks = 0
+
+    def refill(self):
+        """
+            Draws the next block of values.
+        """
+        self.block = array(TYPECODE, self.generator.randbytes(self.blockSize * 4))
+        if SWAP:
+            self.block.byteswap()
+        self.blocks += 1
+        self.position = 0
+
+    def next(self):
+        """
+            Returns the next raw 32-bit value.
+        """
+        try:
+            value = self.block[self.position]
+        except IndexError:
+            self.refill()
+            value = self.block[0]
+        self.position += 1
+        return value
+
+    def randrange(self, start, stop):
+        """
+            Returns a random integer from start up to (not including) stop. Like random's,
+            it raises ValueError if the range is empty.
+        """
+        if stop <= start:
+            raise ValueError(f"empty range for randrange() ({start}, {stop})")
+        try:
+            value = self.block[self.position]
+        except IndexError:
+            self.refill()
+            value = self.block[0]
+        self.position += 1
+        return start + ((stop - start) * value >> 32)
+
+    def values(self, count):
+        """
+            Returns the next count raw 32-bit values as an array, the same values count calls
+            to next() would return. Whole blocks are drawn from the underlying generator at once.
+        """
+        values = self.block[self.position:self.position + count]
+        self.position += len(values)
+        remaining = count - len(values)
+        if remaining <= 0:
+            return values
+        whole = (remaining - 1) // self.blockSize
+        if whole:
+            more = array(TYPECODE, self.generator.randbytes(whole * self.blockSize * 4))
+            if SWAP:
+                more.byteswap()
+            values += more
+            self.blocks += whole
+            remaining -= len(more)
+        self.refill()
+        values += self.block[:remaining]
+        self.position = remaining
+        return values
+
+    def randranges(self, start, stop, count):
+        """
+            Returns a list of count random integers from start up to (not including) stop,
+            the same integers count calls to randrange() would return. It raises ValueError
+            if the range is empty.
+        """
+        width = stop - start
+        if width <= 0:
+            raise ValueError(f"empty range for randranges() ({start}, {stop})")
+        return [start + (width * value >> 32) for value in self.values(count)]
+
+    def random(self):
+        """
+            Returns a random float from 0 up to (not including) 1.
+        """
+        return self.next() / 4294967296
+
+    def getstate(self):
+        """
+            Returns the generator's state, compact enough to store in a snapshot: the seed,
+            the number of blocks drawn and how far into the last block it is.
+        """
+        return (self.seedValue, self.blocks, self.position, self.blockSize)
+
+    def setstate(self, state):
+        """
+            Restores a state returned by getstate() by skipping ahead to the block it was in,
+            reseeding first unless the generator is already at or before that block of the
+            same seed.
+        """
+        seed, blocks, position, blockSize = state
+        if seed != self.seedValue or blocks < self.blocks or blockSize != self.blockSize:
+            self.blockSize = blockSize
+            self.seed(seed)
+        if blocks > self.blocks + 1:
+            self.generator.randbytes((blocks - self.blocks - 1) * blockSize * 4)
+            self.blocks = blocks - 1
+        if blocks > self.blocks:
+            self.refill()
+        self.position = position
@@ -0,0 +1,528 @@
+"""
+    Hosts many games at once in one process with asyncio. Every connected player gets a
+    Session, a coroutine that plays main()'s steps and a Battle with the game's own code (so
+    a session with a given seed plays the same game as main(seed), in the same words) but
+    awaits each response instead of blocking on input(). Each step runs with the console's
+    output routed to the session (see Session.step()), and while a session waits for its
+    player, the others keep running. Each session has its own GameRandom and its own log,
+    and the sessions' events and choices can be recorded in a shared event stream and trace.
+
+    Players connect over a local socket (one game per connection) or through stdin, where
+    lines are multiplexed as "<session> <text>" in both directions. Every line sent to a
+    player is a full line; lines asking for a response start with PROMPT. The time between
+    receiving a response and sending the next prompt is recorded as the turn latency.
+
+    While serving, Items.txt is checked every few seconds and reloaded in place when it
+    changes, so balance changes reach the gear of every running session without a restart.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from array import array
+
+from battlelog import SessionLog, NullLog
+from catalog import loadCatalog
+from events import EventStream
+from replay import GameTrace, TraceWriter, LOST, WON, UNFINISHED
+from RPG import (SEPARATOR, OVER, PLAYER_TURN, LOOT, REPLACE_PROMPT, Battle, Player, readItems, readEnemies,
+                 generateEnemies, showStartingItems, showOptions, playerChoice, showLoot, takeLoot, playPhase,
+                 setSinks, setEvents, setTrace, setInput)
+from rng import GameRandom
+
+# Starts every line that asks the player for a response.
+PROMPT = "? "
+# Sent through stdin's multiplexer once a session is over.
+CLOSED = "!closed"
+
+#------------------------------ Connections ------------------------------
+
+class StreamConnection:
+    """
+        A player connected over a socket: responses are read from reader a line at a time
+        and lines are written to writer.
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def send(self, text):
+        self.writer.write((text + "\n").encode())
+
+    async def receive(self):
+        """
+            Returns the next response, or None once the player has disconnected.
+        """
+        line = await self.reader.readline()
+        if not(line):
+            return None
+        return line.decode(errors = "replace").rstrip("\r\n")
+
+    async def drain(self):
+        await self.writer.drain()
+
+    def close(self):
+        self.writer.close()
+
+class MultiplexedConnection:
+    """
+        One session of the stdin multiplexer: responses are queued by the multiplexer and
+        lines are written to stdout prefixed with the session's name.
+    """
+    def __init__(self, name, output):
+        self.name = name
+        self.output = output
+        self.responses = asyncio.Queue()
+
+    def send(self, text):
+        # Every line of the text gets the prefix so the sessions can be told apart.
+        for line in text.split("\n"):
+            self.output.write(f"{self.name} {line}\n")
+
+    async def receive(self):
+        return await self.responses.get()
+
+    async def drain(self):
+        self.output.flush()
+
+    def close(self):
+        self.send(CLOSED)
+        self.output.flush()
+
+#------------------------------ Sessions ------------------------------
+
+class Session:
+    """
+        One game played over a connection. The game's own steps (those of main() and
+        playBattle()) are run one at a time with the console's output routed to the session:
+        messages are sent to the player and written to the session's log (a SessionLog, or a
+        NullLog), and events and choices are kept for the event stream and trace if given,
+        which each game is added to in one piece when it ends. Invalid
+        numbers are asked for again instead of ending the game.
+    """
+    def __init__(self, connection, itemList, seed = None, log = None, latencies = None, events = None, trace = None):
+        """
+            Creates a session playing from seed (random if None). The latency of every turn
+            is appended to latencies (an array of seconds) if given. The game's events are
+            recorded in events (an EventStream) and its seed and choices in trace (a
+            TraceWriter) if given.
+        """
+        self.connection = connection
+        self.itemList = itemList
+        self.rng = GameRandom(seed)
+        self.log = log if log is not None else NullLog()
+        self.latencies = latencies
+        self.events = events
+        self.trace = trace
+        # The sinks of the game's messages and of the player's responses while a step runs.
+        self.sinks = [self.say]
+        self.responseSinks = [self.log.write]
+        # The game's events until it ends (when they are added to the stream as one game),
+        # and its GameTrace once the game has begun.
+        self.gameEvents = []
+        self.game = None
+        # When the last response arrived, so the time to the next prompt can be measured.
+        self.answered = None
+
+    def say(self, text):
+        """
+            Sends a line to the player and writes it to the log.
+        """
+        self.connection.send(text)
+        self.log.write(text)
+
+    def emit(self, *event):
+        """
+            Keeps an event (the arguments of EventStream.emit()) of the session's game while
+            its events are being recorded.
+        """
+        if self.events is not None:
+            self.gameEvents.append(event)
+
+    def choose(self, choice):
+        """
+            Records a choice (an integer) in the session's trace while it is being traced.
+        """
+        if self.game is not None:
+            self.game.choices.append(choice)
+
+    def step(self, function, *args, answer = None):
+        """
+            Runs one step of the game that does not wait for the player (function called with
+            args) and returns its result. While it runs, the console's messages, responses,
+            events and choices are sent to this session (which is set as the console's event
+            stream and trace); other sessions only run between steps. answer is the response given if the step asks the player a question (the
+            session asks it beforehand).
+        """
+        route = setSinks(self.sinks, self.responseSinks)
+        events = setEvents(self)
+        trace = setTrace(self)
+        source = setInput(lambda prompt = "": answer)
+        try:
+            return function(*args)
+        finally:
+            setInput(source)
+            setTrace(trace)
+            setEvents(events)
+            setSinks(*route)
+
+    async def ask(self, prompt):
+        """
+            Sends a prompt and returns the player's response. Raises EOFError if the
+            player disconnects.
+        """
+        # Blank lines before a prompt are sent as lines of their own.
+        while prompt.startswith("\n"):
+            self.connection.send("")
+            prompt = prompt[1:]
+        self.connection.send(PROMPT + prompt)
+        if self.answered is not None and self.latencies is not None:
+            self.latencies.append(time.perf_counter() - self.answered)
+        await self.connection.drain()
+        response = await self.connection.receive()
+        if response is None:
+            raise EOFError("the player disconnected")
+        self.answered = time.perf_counter()
+        return response
+
+    async def askNumber(self, prompt, size = None):
+        """
+            Asks for a number (below size if given) until the response is one, then logs it
+            and records it in the trace.
+        """
+        while True:
+            response = await self.ask(prompt)
+            try:
+                number = int(response)
+            except ValueError:
+                self.connection.send("Please enter a number.")
+                continue
+            if size is None or 0 <= number < size:
+                self.log.write(prompt + str(number))
+                self.choose(number)
+                return number
+            self.connection.send(f"Please enter a number from 0 to {size - 1}.")
+
+    async def askReplace(self, player, item):
+        """
+            Asks whether the player wants to swap their gear for item if Player.addItem()
+            would ask (see Player.replaceable()) and returns the response, or None if it
+            would not.
+        """
+        current = player.replaceable(item)
+        if current is None:
+            return None
+        return await self.ask(REPLACE_PROMPT.format(player.name, current.name))
+
+    async def play(self):
+        """
+            Plays the game from start to finish (the steps of main()) and returns the result.
+        """
+        self.say(SEPARATOR)
+        name = await self.ask("Enter a name for your hero: ")
+        self.log.write("Hero: " + name)
+        if self.trace is not None:
+            self.game = GameTrace(self.rng.seedValue, name)
+        player = Player(name, self.rng)
+        self.say(SEPARATOR)
+
+        itemList = self.itemList
+        items = self.step(showStartingItems, itemList)
+        itemIndex = await self.askNumber("\nEnter a number: ", len(items))
+        item = items[itemIndex]
+        self.step(player.addItem, item, answer = await self.askReplace(player, item))
+        self.say(SEPARATOR)
+        self.step(player.getStats)
+        self.step(player.getInventory)
+
+        enemies = generateEnemies(itemList, readEnemies(), rng = self.rng)
+        potion = itemList[2][0]
+        result = await self.battle(Battle(player, potion, enemies, self.rng))
+        self.endGame(WON if result == "Victory!" else LOST, player.health)
+        self.say(result)
+        self.say(SEPARATOR)
+        return result
+
+    async def battle(self, battle):
+        """
+            Plays a Battle to the end (the steps of playBattle()), asking the player for each
+            choice, and returns "Victory!" or "Game Over!".
+        """
+        player = battle.player
+        while battle.phase != OVER:
+            # Checking stats or inventory does not take the turn, so the player chooses again until they act.
+            if battle.phase == PLAYER_TURN:
+                acted = False
+                while not(acted):
+                    self.step(showOptions, player)
+                    choice = await self.askNumber("\nEnter a number: ")
+                    acted = self.step(playerChoice, battle, choice)
+            elif battle.phase == LOOT:
+                self.step(showLoot, battle)
+                itemIndex = await self.askNumber("\nEnter a number: ", len(battle.loot))
+                answer = await self.askReplace(player, battle.loot[itemIndex])
+                self.step(takeLoot, battle, itemIndex, answer = answer)
+            else:
+                self.step(playPhase, battle)
+        return battle.result
+
+    def endGame(self, outcome, health = 0):
+        """
+            Adds the game's events to the event stream as one game, and its trace (if it is
+            being traced) to the trace file with an outcome.
+        """
+        if self.gameEvents:
+            self.events.startGame()
+            for event in self.gameEvents:
+                self.events.emit(*event)
+            self.gameEvents.clear()
+        game = self.game
+        if game is None:
+            return
+        self.game = None
+        game.outcome = outcome
+        game.health = health
+        self.trace.add(game)
+
+    async def run(self):
+        """
+            Plays the session and closes its connection and log, whether the game finished
+            or the player left part way (whose game is recorded as UNFINISHED).
+        """
+        try:
+            return await self.play()
+        except (EOFError, ConnectionError):
+            return None
+        finally:
+            self.endGame(UNFINISHED)
+            self.log.close()
+            self.connection.close()
+
+#------------------------------ Server ------------------------------
+
+class GameServer:
+    """
+        Starts sessions for connecting players. Session n is seeded with seed + n if a seed
+        is given (otherwise randomly) and logs to logDirectory/session-n.txt if a log
+        directory is given. The turn latencies of every session are gathered in latencies.
+        Unless itemList is given, the items are read from itemsPath, which is checked for
+        changes every reloadInterval seconds while serving (never if it is 0). Every
+        session's events are recorded in events (an EventStream) and its choices in trace (a
+        TraceWriter) if given.
+    """
+    def __init__(self, itemList = None, seed = None, logDirectory = None, itemsPath = "Items.txt", reloadInterval = 2.0,
+                 events = None, trace = None):
+        self.itemsPath = itemsPath
+        self.reloadInterval = reloadInterval if itemList is None else 0
+        self.itemList = itemList if itemList is not None else readItems(itemsPath)
+        self.seed = seed
+        self.logDirectory = logDirectory
+        self.events = events
+        self.trace = trace
+        if logDirectory is not None:
+            os.makedirs(logDirectory, exist_ok = True)
+        self.sessions = 0
+        self.active = 0
+        self.finished = 0
+        self.latencies = array("d")
+
+    def startSession(self, connection):
+        """
+            Creates the next session on a connection.
+        """
+        number = self.sessions
+        self.sessions += 1
+        seed = self.seed + number if self.seed is not None else None
+        log = SessionLog(os.path.join(self.logDirectory, f"session-{number}.txt")) if self.logDirectory is not None else None
+        return Session(connection, self.itemList, seed, log, self.latencies, self.events, self.trace)
+
+    async def runSession(self, connection):
+        """
+            Plays a session on a connection to the end.
+        """
+        session = self.startSession(connection)
+        self.active += 1
+        try:
+            await session.run()
+        finally:
+            self.active -= 1
+            self.finished += 1
+
+    async def watchItems(self):
+        """
+            Reloads the items whenever their file changes, until cancelled. Sessions share the
+            catalog's item lists and items, so the new stats reach every game in play. A file
+            that fails to load is reported and the items are left as they were.
+        """
+        version = loadCatalog(self.itemsPath).version
+        failed = None
+        while True:
+            await asyncio.sleep(self.reloadInterval)
+            try:
+                catalog = loadCatalog(self.itemsPath)
+            except (OSError, ValueError) as error:
+                if str(error) != failed:
+                    failed = str(error)
+                    print(f"Could not reload {self.itemsPath}: {error}", file = sys.stderr)
+                continue
+            failed = None
+            if catalog.version != version:
+                version = catalog.version
+                print(f"Reloaded {self.itemsPath} ({len(catalog)} items)", file = sys.stderr)
+
+    def startWatching(self):
+        """
+            Starts watching the item file if reloading is on and returns the task (or None).
+        """
+        if not(self.reloadInterval):
+            return None
+        return asyncio.create_task(self.watchItems())
+
+    async def handleStream(self, reader, writer):
+        await self.runSession(StreamConnection(reader, writer))
+
+    async def serve(self, host = "127.0.0.1", port = 8765, backlog = 1024):
+        """
+            Accepts players over a socket until cancelled.
+        """
+        server = await asyncio.start_server(self.handleStream, host, port, backlog = backlog)
+        watcher = self.startWatching()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+    async def serveMultiplexed(self, input = sys.stdin, output = sys.stdout):
+        """
+            Reads "<session> <response>" lines from input until it ends, starting a session
+            for every new session name, and writes "<session> <line>" lines to output.
+        """
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), input)
+        connections = {}
+        tasks = []
+        watcher = self.startWatching()
+        try:
+            while True:
+                line = await reader.readline()
+                if not(line):
+                    break
+                name, _, text = line.decode(errors = "replace").rstrip("\r\n").partition(" ")
+                connection = connections.get(name)
+                if connection is None:
+                    connection = connections[name] = MultiplexedConnection(name, output)
+                    tasks.append(asyncio.create_task(self.runSession(connection)))
+                connection.responses.put_nowait(text)
+            # Input ended: every session still waiting is disconnected.
+            for connection in connections.values():
+                connection.responses.put_nowait(None)
+            await asyncio.gather(*tasks)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+def latencySummary(latencies):
+    """
+        Returns the number of turns and the median, 99th percentile and maximum latency in
+        milliseconds as a line of text.
+    """
+    if not(latencies):
+        return "Turns: 0"
+    ordered = sorted(latencies)
+    def percentile(fraction):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+    return (f"Turns: {len(ordered)}, Latency: median {percentile(0.5):.2f}ms, "
+            f"99th percentile {percentile(0.99):.2f}ms, max {ordered[-1] * 1000:.2f}ms")
+
+#------------------------------ Load Test ------------------------------
+
+async def playClient(host, port, seed):
+    """
+        Connects to a server and plays one game, answering every prompt at random (mostly
+        attacking). Returns the number of prompts answered.
+    """
+    choices = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    answered = 0
+    while True:
+        line = await reader.readline()
+        if not(line):
+            break
+        text = line.decode()
+        if not(text.startswith(PROMPT)):
+            continue
+        if "name" in text:
+            response = f"Client{seed}"
+        elif "(y/n)" in text:
+            response = choices.choice("yn")
+        else:
+            response = str(choices.choice((0, 0, 0, 0, 1, 2)))
+        writer.write((response + "\n").encode())
+        answered += 1
+    writer.close()
+    return answered
+
+async def loadTest(clients, seed = 0, logDirectory = None, host = "127.0.0.1", port = 0):
+    """
+        Serves clients concurrent games from this process, each played by a simulated client
+        over a local socket, and returns the server with its latencies.
+    """
+    gameServer = GameServer(seed = seed, logDirectory = logDirectory)
+    # Every client connects at once, so the backlog must hold them all.
+    server = await asyncio.start_server(gameServer.handleStream, host, port, backlog = clients)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        await asyncio.gather(*(playClient(host, port, seed + client) for client in range(clients)))
+    return gameServer
+
+#------------------------------ Main ------------------------------
+
+def main():
+    """
+        Runs the server from the command line: over a socket (the default), over stdin with
+        --stdin, or as a load test with --clients.
+    """
+    parser = argparse.ArgumentParser(description = "Host many games of the RPG in one process.")
+    parser.add_argument("--host", default = "127.0.0.1", help = "address to listen on")
+    parser.add_argument("--port", type = int, default = 8765, help = "port to listen on")
+    parser.add_argument("--stdin", action = "store_true", help = "multiplex sessions over stdin and stdout")
+    parser.add_argument("--seed", type = int, help = "seed of the first session (random if not given)")
+    parser.add_argument("--log-dir", help = "directory to keep each session's log in")
+    parser.add_argument("--clients", type = int, help = "run a load test with this many simulated players")
+    parser.add_argument("--reload-interval", type = float, default = 2.0,
+                        help = "seconds between checks of Items.txt for changes (0 to never reload)")
+    parser.add_argument("--events", help = "event stream file to record every session's events in")
+    parser.add_argument("--trace", help = "trace file to record every session's choices in (see replay.py)")
+    args = parser.parse_args()
+
+    if args.clients is not None:
+        start = time.perf_counter()
+        gameServer = asyncio.run(loadTest(args.clients, args.seed or 0, args.log_dir))
+        elapsed = time.perf_counter() - start
+        print(f"Sessions: {gameServer.finished}, Elapsed: {elapsed:.2f}s")
+        print(latencySummary(gameServer.latencies))
+        return
+    events = EventStream(args.events) if args.events else None
+    trace = TraceWriter(args.trace) if args.trace else None
+    gameServer = GameServer(seed = args.seed, logDirectory = args.log_dir if args.log_dir else "sessions",
+                            reloadInterval = args.reload_interval, events = events, trace = trace)
+    try:
+        if args.stdin:
+            asyncio.run(gameServer.serveMultiplexed())
+        else:
+            asyncio.run(gameServer.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for output in (events, trace):
+            if output is not None:
+                output.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""
+    Plays the RPG without the console so that Items.txt can be balanced by simulation.
+    Every choice the player would type into input() is made by a policy instead, each
+    game is played from its own seed, and the results of many games are gathered into
+    win rates, turns per fight and damage distributions.
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+
+from RPG import (Battle, Player, readItems, readEnemies, generateEnemies, generateWave, FIGHT_START, PLAYER_TURN,
+                 ENEMY_TURN, FIGHT_END, OVER, PHASE_NAMES)
+from events import EventStream, ATTACK, BLOCK, HEAL, LOOT, FLEE, DEATH
+from results import ResultStore, WON, LOST, FLED
+from rng import GameRandom
+
+#------------------------------ Policies ------------------------------
+
+class Policy:
+    """
+        Makes the choices a player would otherwise type into the console. The base policy
+        starts with a fixed item, always attacks, loots the first item dropped and never
+        replaces its gear. Subclasses override the choices they want to change.
+    """
+    def __init__(self, startingItem = 0):
+        """
+            Creates a policy that picks the starting item at the given index (numbered the
+            same way main() lists them).
+        """
+        self.startingItem = startingItem
+
+    def startGame(self, seed):
+        """
+            Called with the game's seed before every game so policies with their own
+            randomness can stay reproducible.
+        """
+        pass
+
+    def chooseStartingItem(self, player, items):
+        """
+            Returns the index of the starting item from the list of every item.
+        """
+        return self.startingItem
+
+    def chooseAction(self, player, enemy, index, size):
+        """
+            Returns the action for the player's turn (0 attack, 1 use health potion, 2 run away)
+            given the enemy faced and its position (index) out of size enemies.
+        """
+        return 0
+
+    def chooseLoot(self, player, loot):
+        """
+            Returns the index of the item to take from the loot dropped by an enemy.
+        """
+        return 0
+
+    def chooseReplace(self, player, oldItem, newItem):
+        """
+            Returns True if the player should replace oldItem with newItem.
+        """
+        return False
+
+class GreedyPolicy(Policy):
+    """
+        Drinks a health potion when health falls below a threshold, loots the item with
+        the highest stat and replaces gear whenever the new item is stronger.
+    """
+    def __init__(self, startingItem = 0, threshold = 0.4):
+        """
+            Creates a greedy policy that heals below threshold (a fraction of MAX_HEALTH).
+        """
+        super().__init__(startingItem)
+        self.threshold = threshold
+
+    def chooseAction(self, player, enemy, index, size):
+        if player.hasPotion() and player.health < player.MAX_HEALTH * self.threshold:
+            return 1
+        return 0
+
+    def chooseLoot(self, player, loot):
+        best = 0
+        for index, item in enumerate(loot):
+            if item.stat > loot[best].stat:
+                best = index
+        return best
+
+    def chooseReplace(self, player, oldItem, newItem):
+        return newItem.stat > oldItem.stat
+
+class RandomPolicy(Policy):
+    """
+        Makes every choice at random (excluding checking stats or inventory) using its own
+        generator, reseeded from each game's seed.
+    """
+    def __init__(self, startingItem = None):
+        """
+            Creates a random policy. If startingItem is None the starting item is random too.
+        """
+        super().__init__(startingItem)
+        self.random = random.Random()
+
+    def startGame(self, seed):
+        self.random.seed(seed)
+
+    def chooseStartingItem(self, player, items):
+        if self.startingItem is None:
+            return self.random.randrange(0, len(items))
+        return self.startingItem
+
+    def chooseAction(self, player, enemy, index, size):
+        return self.random.randrange(0, 3)
+
+    def chooseLoot(self, player, loot):
+        return self.random.randrange(0, len(loot))
+
+    def chooseReplace(self, player, oldItem, newItem):
+        return self.random.randrange(0, 2) == 1
+
+class RecordingPolicy(Policy):
+    """
+        Makes the choices of another policy and records each one in a trace (a TraceWriter
+        from replay.py) the way the console game records typed choices.
+    """
+    def __init__(self, policy, trace):
+        super().__init__(policy.startingItem)
+        self.policy = policy
+        self.trace = trace
+
+    def startGame(self, seed):
+        self.policy.startGame(seed)
+
+    def chooseStartingItem(self, player, items):
+        choice = self.policy.chooseStartingItem(player, items)
+        self.trace.choose(choice)
+        return choice
+
+    def chooseAction(self, player, enemy, index, size):
+        choice = self.policy.chooseAction(player, enemy, index, size)
+        self.trace.choose(choice)
+        return choice
+
+    def chooseLoot(self, player, loot):
+        choice = self.policy.chooseLoot(player, loot)
+        self.trace.choose(choice)
+        return choice
+
+    def chooseReplace(self, player, oldItem, newItem):
+        replace = self.policy.chooseReplace(player, oldItem, newItem)
+        self.trace.choose(1 if replace else 0)
+        return replace
+
+#------------------------------ Results ------------------------------
+
+class GameResult:
+    """
+        The outcome of one game: its seed, whether the player won, the number of turns
+        of each fight and the damage of every hit dealt and taken by the player.
+    """
+    def __init__(self, seed):
+        self.seed = seed
+        self.victory = False
+        self.health = 0
+        self.fights = []
+        self.damageDealt = []
+        self.damageTaken = []
+
+class SimulationResults:
+    """
+        Gathers game results into win rates, turns per fight and damage distributions.
+    """
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.turnsPerFight = Counter()
+        self.damageDealt = Counter()
+        self.damageTaken = Counter()
+
+    def add(self, result):
+        """
+            Adds a game result to the totals.
+        """
+        self.games += 1
+        if result.victory:
+            self.wins += 1
+        self.turnsPerFight.update(result.fights)
+        self.damageDealt.update(result.damageDealt)
+        self.damageTaken.update(result.damageTaken)
+
+    def merge(self, other):
+        """
+            Adds the totals of another SimulationResults to these.
+        """
+        self.games += other.games
+        self.wins += other.wins
+        self.turnsPerFight.update(other.turnsPerFight)
+        self.damageDealt.update(other.damageDealt)
+        self.damageTaken.update(other.damageTaken)
+
+    def winRate(self):
+        """
+            Returns the fraction of games won.
+        """
+        return self.wins / self.games if self.games else 0.0
+
+    def averageTurns(self):
+        """
+            Returns the average number of turns per fight.
+        """
+        fights = sum(self.turnsPerFight.values())
+        if fights == 0:
+            return 0.0
+        return sum(turns * count for turns, count in self.turnsPerFight.items()) / fights
+
+    def summary(self):
+        """
+            Returns the results as a dictionary (distributions map a value to its count).
+        """
+        return {
+            "games": self.games,
+            "wins": self.wins,
+            "winRate": self.winRate(),
+            "averageTurns": self.averageTurns(),
+            "turnsPerFight": dict(sorted(self.turnsPerFight.items())),
+            "damageDealt": dict(sorted(self.damageDealt.items())),
+            "damageTaken": dict(sorted(self.damageTaken.items())),
+        }
+
+#------------------------------ Simulation ------------------------------
+
+def storeItem(player, item, policy, events = None):
+    """
+        Adds item to the player's inventory by the rules of Player.addItem() without any
+        output (see Player.takeItem()), asking the policy instead of the console whether an
+        item should be replaced. The outcome is sent to events (an EventStream) if given.
+    """
+    outcome = player.takeItem(item, lambda current, item: policy.chooseReplace(player, current, item))
+    if events is not None:
+        events.emit(LOOT, 1, player.name, item.name, item.stat, outcome)
+
+def playGame(seed, itemList, policy, name = "Hero", events = None, rng = None, trace = None, roster = None, waveSize = None,
+             profiler = None, store = None):
+    """
+        Plays one game from the given seed the way main() does, stepping the same Battle
+        battle() plays (so main(seed) plays the same game) with the policy making every
+        choice instead of the console. It returns a GameResult. rng (a GameRandom) is
+        reseeded and reused if given. If events (an EventStream) is given, the game's events
+        are recorded in it as a new game, and if trace (a TraceWriter) is given, the game's
+        seed and choices are recorded in it so the game can be replayed. The enemies are
+        generated from roster (the templates in Enemies.txt by default), one of each as in
+        main(), or as a wave of waveSize enemies drawn by spawn weight if waveSize is given.
+        If profiler (a Profiler) is given, the time spent in each phase of the battle is
+        recorded in it under the phase's name. If store (a ResultStore) is
+        given, a record of every fight is added to it and the game is ended in it.
+    """
+    if roster is None:
+        roster = readEnemies()
+    if rng is None:
+        rng = GameRandom(seed)
+    else:
+        rng.seed(seed)
+    if trace is not None:
+        trace.startGame(seed, name)
+        policy = RecordingPolicy(policy, trace)
+    policy.startGame(seed)
+    if events is not None:
+        events.startGame()
+    result = GameResult(seed)
+    dealt = result.damageDealt
+    taken = result.damageTaken
+
+    player = Player(name, rng)
+    items = itemList[0] + itemList[1] + itemList[2]
+    storeItem(player, items[policy.chooseStartingItem(player, items)], policy, events)
+    if waveSize is None:
+        enemies = generateEnemies(itemList, roster, rng = rng)
+    else:
+        enemies = generateWave(itemList, roster, waveSize, rng = rng)
+    potion = itemList[2][0]
+    if profiler is not None:
+        profiler.count("games")
+        profiler.count("enemies", len(enemies))
+
+    battle = Battle(player, potion, enemies, rng)
+    size = len(battle.enemies)
+    while battle.phase != OVER:
+        phase = battle.phase
+        if profiler is not None:
+            started = profiler.clock()
+        if phase == FIGHT_START:
+            enemy = battle.enemy()
+            index = battle.index
+            turns = 0
+            if store is not None:
+                stats = (player.MAX_HEALTH, player.attack, player.defense, player.agility)
+            battle.startFight()
+        elif phase == PLAYER_TURN:
+            turns += 1
+            choice = policy.chooseAction(player, enemy, index, size)
+            if choice == 0:
+                damage, modifier, blocked = battle.playerAttack()
+                dealt.append(modifier)
+                if events is not None:
+                    events.emit(ATTACK, 1, player.name, enemy.name, damage)
+                    events.emit(BLOCK, 0, enemy.name, player.name, blocked, modifier, enemy.health)
+            elif choice == 1:
+                if player.hasPotion():
+                    player.drinkPotion(potion)
+                    if events is not None:
+                        events.emit(HEAL, 1, player.name, "", potion.stat, len(player.inventory.potions), player.health)
+                elif events is not None:
+                    events.emit(HEAL, 1, player.name, "", 0, 0, player.health)
+                battle.endTurn()
+            # Any other choice is running away, which is only allowed before the last enemy.
+            else:
+                ran = not(battle.lastEnemy())
+                if ran:
+                    player.dropInventory()
+                if events is not None:
+                    events.emit(FLEE, 1, player.name, "", 1 if ran else 0)
+                battle.endTurn(ran)
+        elif phase == ENEMY_TURN:
+            turns += 1
+            damage, modifier, blocked = battle.enemyAttack()
+            taken.append(modifier)
+            if events is not None:
+                events.emit(ATTACK, 0, enemy.name, player.name, damage)
+                events.emit(BLOCK, 1, player.name, enemy.name, blocked, modifier, player.health)
+        elif phase == FIGHT_END:
+            result.fights.append(turns)
+            if store is not None:
+                store.add(seed, index, player, enemy, LOST if player.health <= 0 else FLED if battle.ran else WON, turns,
+                          stats)
+            if player.health <= 0:
+                if events is not None:
+                    events.emit(DEATH, 1, player.name, enemy.name)
+            elif enemy.health <= 0 and events is not None:
+                events.emit(DEATH, 0, enemy.name, player.name)
+            battle.finishFight()
+        else:
+            storeItem(player, battle.loot[policy.chooseLoot(player, battle.loot)], policy, events)
+            battle.nextFight()
+        if profiler is not None:
+            profiler.record(PHASE_NAMES[phase], started)
+
+    result.victory = battle.result == "Victory!"
+    result.health = player.health
+    if trace is not None:
+        trace.endGame(result.victory, player.health)
+    if store is not None:
+        store.endGame(seed, result.victory)
+    return result
+
+def runGames(count, policy = None, seed = 0, itemList = None, name = "Hero", events = None, trace = None,
+             roster = None, waveSize = None, profiler = None, store = None):
+    """
+        Plays count games with seeds seed, seed + 1, ... and returns their SimulationResults.
+        The items are read from Items.txt once unless itemList is given, every game's
+        events are recorded in events (an EventStream) if given, and every game's choices in
+        trace (a TraceWriter) if given. The enemies are generated from roster (read from
+        Enemies.txt once by default), as waves of waveSize enemies if waveSize is given.
+        Every game's turns and loot are timed in profiler (a Profiler) if given, and every
+        fight is recorded in store (a ResultStore) if given.
+    """
+    if policy is None:
+        policy = Policy()
+    if itemList is None:
+        itemList = readItems()
+    if roster is None:
+        roster = readEnemies()
+    results = SimulationResults()
+    rng = GameRandom()
+    for gameSeed in range(seed, seed + count):
+        results.add(playGame(gameSeed, itemList, policy, name, events, rng, trace, roster, waveSize, profiler, store))
+    return results
+
+#------------------------------ Main ------------------------------
+
+POLICIES = {"attack": Policy, "greedy": GreedyPolicy, "random": RandomPolicy}
+
+def main():
+    """
+        Runs a batch of games from the command line and prints a summary.
+    """
+    parser = argparse.ArgumentParser(description = "Simulate games of the RPG without the console.")
+    parser.add_argument("--games", type = int, default = 100000, help = "number of games to play")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the first game")
+    parser.add_argument("--start", type = int, default = 0, help = "index of the starting item")
+    parser.add_argument("--policy", choices = sorted(POLICIES), default = "attack", help = "player policy")
+    parser.add_argument("--events", help = "event stream file to record the games in")
+    parser.add_argument("--trace", help = "trace file to record the games' choices in (see replay.py)")
+    parser.add_argument("--enemies", default = "Enemies.txt", help = "enemy template file")
+    parser.add_argument("--wave", type = int, help = "fight a wave of this many enemies drawn by spawn weight")
+    parser.add_argument("--profile", help = "time the games' phases and methods and write a JSON report here")
+    parser.add_argument("--profile-stats", help = "also write the timings here in cProfile's format (for pstats)")
+    parser.add_argument("--store", help = "results store to record every fight in, resumed if it already has games")
+    args = parser.parse_args()
+    if args.store and not(0 <= args.seed and args.seed + args.games < 1 << 64):
+        parser.error("a results store records seeds from 0 to 2**64 - 1")
+
+    events = EventStream(args.events) if args.events else None
+    trace = None
+    if args.trace:
+        from replay import TraceWriter
+        trace = TraceWriter(args.trace)
+    profiler = None
+    if args.profile or args.profile_stats:
+        from profiling import Profiler, instrumentGame
+        profiler = Profiler()
+        instrumentGame(profiler, [sys.modules[__name__]])
+    store = None
+    games = args.games
+    seed = args.seed
+    if args.store:
+        store = ResultStore(args.store)
+        # Carry on after the last committed game of an interrupted run.
+        if store.games:
+            games = max(args.games - store.games, 0)
+            seed = store.nextSeed
+            print(f"Resuming {args.store} at game {store.games} (seed {seed})")
+    start = time.perf_counter()
+    try:
+        results = runGames(games, POLICIES[args.policy](args.start), seed, events = events, trace = trace,
+                           roster = readEnemies(args.enemies), waveSize = args.wave, profiler = profiler, store = store)
+    finally:
+        if store is not None:
+            store.close()
+    elapsed = time.perf_counter() - start
+    if events is not None:
+        events.close()
+    if trace is not None:
+        trace.close()
+    if profiler is not None:
+        profiler.restore()
+        if args.profile:
+            profiler.writeReport(args.profile)
+        if args.profile_stats:
+            profiler.dumpStats(args.profile_stats)
+        print("\n".join(profiler.table()))
+
+    print(f"Games: {results.games}, Wins: {results.wins}, Win rate: {results.winRate():.4f}")
+    print(f"Average turns per fight: {results.averageTurns():.2f}")
+    print(f"Elapsed: {elapsed:.2f}s ({results.games / elapsed * 60:,.0f} games per minute)")
+    if store is not None:
+        totals = store.summary()
+        print(f"Store: {totals['games']} games, {totals['fights']} fights, win rate {totals['winRate']:.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+    Saves a Battle as a compact snapshot and restores it, so a paused game can be parked on
+    disk or in a queue and resumed later (in another process or on another machine) without
+    keeping anything of it in memory. A snapshot holds the GameRandom's state, the phase of
+    the battle, the player's stats and inventory, the enemies still to be fought and any loot
+    on offer. Items are stored as their position in the item list (weapons, then armor, then
+    potions), so a snapshot must be restored with the same Items.txt it was saved with. Stats
+    are stored without the gear's bonuses, so a snapshot restored after the items were
+    reloaded picks up the items' new stats.
+
+    Layout (little-endian): HEADER, PLAYER followed by the player's potions and name, one
+    ENEMY followed by its name per remaining enemy, and the loot. Names are stored as a 2 byte
+    length and UTF-8 text, and items as 2 byte indexes (-1 for none). Seeds must be integers
+    below 2**64 in size; a negative seed is stored as its absolute value, which seeds the
+    same generator.
+"""
+
+import struct
+import sys
+import time
+
+from RPG import Battle, Player, Enemy, Inventory, LOOT, OVER, readItems, generateEnemies
+from rng import GameRandom
+
+VERSION = 2
+# version, phase, whose turn and whether the player ran (bits 0 and 1), remaining enemies,
+# loot offered, the potion enemies drop, then the GameRandom's seed, blocks, position and block size.
+HEADER = struct.Struct("<BBBBBhQIHH")
+# health, max health, base attack, base defense, agility, weapon, armor, number of potions
+PLAYER = struct.Struct("<hhhhhhhH")
+# health, base attack, base defense, agility, weapon, armor
+ENEMY = struct.Struct("<hhhhhh")
+NAME = struct.Struct("<H")
+ITEM = struct.Struct("<h")
+
+class Snapshots:
+    """
+        Saves and restores battles played with the items of itemList.
+    """
+    def __init__(self, itemList):
+        """
+            Numbers every item of itemList (the same order main() lists them in).
+        """
+        self.items = [item for group in itemList for item in group]
+        self.indexes = {item: index for index, item in enumerate(self.items)}
+
+    def index(self, item):
+        """
+            Returns the number of an item, or -1 for None.
+        """
+        return -1 if item is None else self.indexes[item]
+
+    def item(self, index):
+        """
+            Returns the item with a number, or None for -1.
+        """
+        return None if index < 0 else self.items[index]
+
+    def save(self, battle):
+        """
+            Returns a snapshot of a battle as bytes.
+        """
+        seed, blocks, position, blockSize = battle.rng.getstate()
+        enemies = battle.enemies[battle.index:]
+        loot = battle.loot if battle.phase == LOOT else ()
+        flags = (1 if battle.playerTurn else 0) | (2 if battle.ran else 0)
+        parts = [HEADER.pack(VERSION, battle.phase, flags, len(enemies), len(loot), self.index(battle.potion),
+                             abs(seed), blocks, position, blockSize)]
+
+        player = battle.player
+        inventory = player.inventory
+        parts.append(PLAYER.pack(player.health, player.MAX_HEALTH, player.baseAttack, player.baseDefense, player.agility,
+                                 self.index(inventory.weapon), self.index(inventory.armor), len(inventory.potions)))
+        parts.extend(ITEM.pack(self.indexes[potion]) for potion in inventory.potions)
+        name = player.name.encode()
+        parts.append(NAME.pack(len(name)))
+        parts.append(name)
+
+        for enemy in enemies:
+            parts.append(ENEMY.pack(enemy.health, enemy.baseAttack, enemy.baseDefense, enemy.agility,
+                                    self.index(enemy.weapon), self.index(enemy.armor)))
+            name = enemy.name.encode()
+            parts.append(NAME.pack(len(name)))
+            parts.append(name)
+
+        parts.extend(ITEM.pack(self.indexes[item]) for item in loot)
+        return b"".join(parts)
+
+    def restore(self, data, rng = None):
+        """
+            Returns the Battle saved in a snapshot, ready to be stepped from where it was
+            saved. rng (a GameRandom) is reused if given.
+        """
+        version, phase, flags, enemyCount, lootCount, potion, seed, blocks, position, blockSize = HEADER.unpack_from(data)
+        if version != VERSION:
+            raise ValueError(f"snapshot version {version} is not supported (expected {VERSION})")
+        if rng is None:
+            rng = GameRandom(seed, blockSize)
+        rng.setstate((seed, blocks, position, blockSize))
+        offset = HEADER.size
+
+        health, maxHealth, attack, defense, agility, weapon, armor, potions = PLAYER.unpack_from(data, offset)
+        offset += PLAYER.size
+        player = Player.__new__(Player)
+        player.health = health
+        player.MAX_HEALTH = maxHealth
+        player.agility = agility
+        player.rng = rng
+        inventory = Inventory()
+        for item in (self.item(weapon), self.item(armor)):
+            if item is not None:
+                inventory.add(item)
+        for _ in range(potions):
+            inventory.add(self.items[ITEM.unpack_from(data, offset)[0]])
+            offset += ITEM.size
+        player.inventory = inventory
+        player.baseAttack = attack
+        player.baseDefense = defense
+        player.invalidateStats()
+        player.name, offset = readName(data, offset)
+
+        enemies = []
+        for _ in range(enemyCount):
+            health, attack, defense, agility, weapon, armor = ENEMY.unpack_from(data, offset)
+            offset += ENEMY.size
+            enemy = Enemy.__new__(Enemy)
+            enemy.health = health
+            enemy.agility = agility
+            enemy.weapon = self.item(weapon)
+            enemy.armor = self.item(armor)
+            enemy.baseAttack = attack
+            enemy.baseDefense = defense
+            enemy.invalidateStats()
+            enemy.rng = rng
+            enemy.name, offset = readName(data, offset)
+            enemies.append(enemy)
+
+        loot = []
+        for _ in range(lootCount):
+            loot.append(self.items[ITEM.unpack_from(data, offset)[0]])
+            offset += ITEM.size
+
+        battle = Battle.__new__(Battle)
+        battle.player = player
+        battle.potion = self.item(potion)
+        battle.rng = rng
+        battle.enemies = enemies
+        battle.index = 0
+        battle.playerTurn = bool(flags & 1)
+        battle.ran = bool(flags & 2)
+        battle.phase = phase
+        battle.loot = loot if phase == LOOT else None
+        battle.result = None
+        if phase == OVER:
+            battle.result = "Victory!" if player.health > 0 else "Game Over!"
+        return battle
+
+def readName(data, offset):
+    """
+        Reads a name at offset and returns it with the offset after it.
+    """
+    length = NAME.unpack_from(data, offset)[0]
+    offset += NAME.size
+    return data[offset:offset + length].decode(), offset + length
+
+def main():
+    """
+        Measures the size of a snapshot and how long saving and restoring one takes:
+        python snapshot.py [count]
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    itemList = readItems()
+    snapshots = Snapshots(itemList)
+    rng = GameRandom(0)
+    player = Player("Hero", rng)
+    player.equip(itemList[0][0])
+    player.equip(itemList[2][0])
+    battle = Battle(player, itemList[2][0], generateEnemies(itemList, rng = rng))
+    battle.startFight()
+    data = snapshots.save(battle)
+
+    start = time.perf_counter()
+    for _ in range(count):
+        snapshots.save(battle)
+    saved = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(count):
+        snapshots.restore(data)
+    restored = time.perf_counter() - start
+    # Resuming with the generator the battle was parked with skips reseeding it.
+    reuse = GameRandom(0)
+    start = time.perf_counter()
+    for _ in range(count):
+        snapshots.restore(data, reuse)
+    reused = time.perf_counter() - start
+    print(f"Snapshot: {len(data)} bytes")
+    print(f"Save: {saved / count * 1e6:.2f}us, Restore: {restored / count * 1e6:.2f}us "
+          f"({reused / count * 1e6:.2f}us reusing the generator)")
+
+if __name__ == "__main__":
+    main()
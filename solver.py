@@ -0,0 +1,157 @@
+"""
+    Computes the outcome of a fight exactly instead of by sampling. A fight follows battle()
+    for a player who always attacks: the character with the higher agility goes first (the
+    player wins ties), and every hit deals int(attack * r / 10) - int(defense // 2 * s / 10)
+    damage (never less than 0) for r and s drawn from randrange(5, 21). Because r and s only
+    take 16 values each, the chance of every amount of damage is known, and the win
+    probability, expected number of turns and expected health left can be built up with
+    dynamic programming over (player health, enemy health, whose turn it is). One table
+    answers every starting health at once, and tables are memoized by the stats they use.
+"""
+
+from functools import lru_cache
+
+#------------------------------ Damage ------------------------------
+
+@lru_cache(maxsize = None)
+def damageDistribution(attack, defense):
+    """
+        Returns the damage an attacker deals to a defender as (chance of 0 damage, list of
+        (damage, chance) pairs for every damage above 0), using the same formulas (and the
+        same float arithmetic) as Character.damageGen() and Character.takeDamage().
+    """
+    counts = {}
+    for r in range(5, 21):
+        damage = int(attack * (r / 10))
+        for s in range(5, 21):
+            blocked = int(defense // 2 * (s / 10))
+            modifier = damage - blocked if damage - blocked > 0 else 0
+            counts[modifier] = counts.get(modifier, 0) + 1
+    zero = counts.pop(0, 0) / 256
+    return zero, [(damage, count / 256) for damage, count in sorted(counts.items())]
+
+#------------------------------ Tables ------------------------------
+
+class FightTable:
+    """
+        The solved outcomes of a fight between a player and an enemy with fixed attack and
+        defense for every starting health up to the table's size. Each value is indexed
+        [player health][enemy health] and comes in two versions: the player moving first
+        and the enemy moving first.
+    """
+    def __init__(self, maxPlayerHealth, maxEnemyHealth, win, turns, playerHealth, enemyHealth):
+        self.maxPlayerHealth = maxPlayerHealth
+        self.maxEnemyHealth = maxEnemyHealth
+        self.win = win
+        self.turns = turns
+        self.playerHealth = playerHealth
+        self.enemyHealth = enemyHealth
+
+    def outcome(self, playerHealth, enemyHealth, playerFirst):
+        """
+            Returns the FightSolution of a fight starting from the given health.
+        """
+        turn = 0 if playerFirst else 1
+        return FightSolution(self.win[turn][playerHealth][enemyHealth], self.turns[turn][playerHealth][enemyHealth],
+                             self.playerHealth[turn][playerHealth][enemyHealth], self.enemyHealth[turn][playerHealth][enemyHealth])
+
+class FightSolution:
+    """
+        The exact outcome of one fight: the probability the player wins, the expected number
+        of turns, and the expected health the player and the enemy are left with (0 for
+        whoever lost).
+    """
+    def __init__(self, winProbability, expectedTurns, expectedPlayerHealth, expectedEnemyHealth):
+        self.winProbability = winProbability
+        self.expectedTurns = expectedTurns
+        self.expectedPlayerHealth = expectedPlayerHealth
+        self.expectedEnemyHealth = expectedEnemyHealth
+
+    def __repr__(self):
+        return (f"FightSolution(winProbability={self.winProbability:.6f}, expectedTurns={self.expectedTurns:.4f}, "
+                f"expectedPlayerHealth={self.expectedPlayerHealth:.4f}, expectedEnemyHealth={self.expectedEnemyHealth:.4f})")
+
+@lru_cache(maxsize = 256)
+def solveTable(maxPlayerHealth, playerAttack, playerDefense, maxEnemyHealth, enemyAttack, enemyDefense):
+    """
+        Solves the fight for every player health up to maxPlayerHealth and every enemy
+        health up to maxEnemyHealth and returns the FightTable.
+
+        With the player to move (A) and the enemy to move (B) at the same health, a hit of 0
+        damage hands the turn over without changing anything, so A and B depend on each
+        other. Writing a0 and b0 for the chances of 0 damage and Sa and Sb for the sums over
+        every hit that does damage (which only reach lower health, already solved), the pair
+        is solved directly: A = (Sa + a0 * Sb) / (1 - a0 * b0) and B = (Sb + b0 * Sa) / (1 - a0 * b0).
+    """
+    a0, toEnemy = damageDistribution(playerAttack, enemyDefense)
+    b0, toPlayer = damageDistribution(enemyAttack, playerDefense)
+    denominator = 1 - a0 * b0
+    rows = maxPlayerHealth + 1
+    columns = maxEnemyHealth + 1
+    # [turn][player health][enemy health] with turn 0 for the player moving and 1 for the enemy.
+    win = [[[0.0] * columns for pH in range(rows)] for turn in range(2)]
+    turns = [[[0.0] * columns for pH in range(rows)] for turn in range(2)]
+    playerLeft = [[[0.0] * columns for pH in range(rows)] for turn in range(2)]
+    enemyLeft = [[[0.0] * columns for pH in range(rows)] for turn in range(2)]
+
+    for pH in range(rows):
+        for eH in range(columns):
+            # A fight that is already over: the player wins if the enemy has no health left.
+            if pH == 0 or eH == 0:
+                for turn in range(2):
+                    win[turn][pH][eH] = 1.0 if pH > 0 else 0.0
+                    playerLeft[turn][pH][eH] = pH
+                    enemyLeft[turn][pH][eH] = eH
+                continue
+            # Neither side can ever deal damage, so the fight never ends and nobody wins.
+            if denominator == 0:
+                for turn in range(2):
+                    turns[turn][pH][eH] = float("inf")
+                    playerLeft[turn][pH][eH] = pH
+                    enemyLeft[turn][pH][eH] = eH
+                continue
+            for values, extra in ((win, 0.0), (turns, 1.0), (playerLeft, 0.0), (enemyLeft, 0.0)):
+                enemyMoves = values[1]
+                playerMoves = values[0]
+                sa = extra + sum(chance * enemyMoves[pH][eH - damage if damage < eH else 0] for damage, chance in toEnemy)
+                sb = extra + sum(chance * playerMoves[pH - damage if damage < pH else 0][eH] for damage, chance in toPlayer)
+                playerMoves[pH][eH] = (sa + a0 * sb) / denominator
+                enemyMoves[pH][eH] = (sb + b0 * sa) / denominator
+
+    return FightTable(maxPlayerHealth, maxEnemyHealth, win, turns, playerLeft, enemyLeft)
+
+#------------------------------ Fights ------------------------------
+
+def solveFight(playerHealth, playerAttack, playerDefense, playerAgility,
+               enemyHealth, enemyAttack, enemyDefense, enemyAgility):
+    """
+        Returns the exact FightSolution of a fight between a player and an enemy with the
+        given stats (attack and defense including their gear).
+    """
+    table = solveTable(playerHealth, playerAttack, playerDefense, enemyHealth, enemyAttack, enemyDefense)
+    return table.outcome(playerHealth, enemyHealth, playerAgility >= enemyAgility)
+
+def solveMatchup(player, enemy):
+    """
+        Returns the exact FightSolution of a fight between a Player and an Enemy as they are now.
+    """
+    return solveFight(player.health, player.attack, player.defense, player.agility,
+                      enemy.health, enemy.attack, enemy.defense, enemy.agility)
+
+def dominates(first, second, playerAttack, playerDefense, playerAgility, enemyAttack, enemyDefense, enemyAgility,
+              maxPlayerHealth = 120, maxEnemyHealth = 120):
+    """
+        Answers "is item first at least as good as item second?" for a player with the given
+        base stats facing an enemy with the given stats: returns True if equipping first wins
+        with at least the probability of equipping second from every starting health up to
+        the maximums (both items must be weapons or both armor).
+    """
+    tables = []
+    for item in (first, second):
+        attack = playerAttack + (item.stat if item.kind == 'W' else 0)
+        defense = playerDefense + (item.stat if item.kind == 'A' else 0)
+        tables.append(solveTable(maxPlayerHealth, attack, defense, maxEnemyHealth, enemyAttack, enemyDefense))
+    turn = 0 if playerAgility >= enemyAgility else 1
+    firstWin = tables[0].win[turn]
+    secondWin = tables[1].win[turn]
+    return all(firstWin[pH][eH] >= secondWin[pH][eH] for pH in range(1, maxPlayerHealth + 1) for eH in range(1, maxEnemyHealth + 1))
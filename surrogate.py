@@ -0,0 +1,351 @@
+"""
+    A precomputed table of fight win probabilities so a matchup can be looked up in
+    microseconds instead of simulated. The table is dense over the stats a fight depends on:
+    the player's and enemy's attack and block (half the defense, which is all that
+    takeDamage() uses) for every value a character can have (a base stat from
+    Character.STAT_RANGE or an enemy template's range plus the bonus of any weapon or armor in
+    the catalog, or none), both sides' starting health (every healthStep points across
+    Character.HEALTH_RANGE and the templates' ranges) and who moves first (agility only
+    matters through that). Every entry is exact (solved as in solver.py, for a player who
+    always attacks) rather than sampled, and the fights are solved in batches with NumPy
+    (which must be installed to build a table, but not to read one).
+
+    The table is stored as 16-bit fixed point probabilities (a quarter of the size of
+    doubles, to within 1 / 65535) after a small header with its axes, and queries read it
+    straight from the memory-mapped file, interpolating linearly between grid points (so
+    only health in between steps, or stats no character can have, are approximated).
+    Rebuilding after Items.txt changes only solves the rows for stats the table did not
+    already cover (such as those a new, stronger weapon makes possible); every other entry
+    is copied over.
+"""
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import time
+from bisect import bisect_right
+
+from RPG import Character, readItems, readEnemies
+from solver import damageDistribution, solveFight
+
+MAGIC = b"RPGWIN01"
+# The header: magic, the number of attack, block and health grid points, and padding.
+HEADER = struct.Struct("<8s3Hxx")
+# Probabilities are stored as round(probability * SCALE).
+SCALE = 65535
+
+#------------------------------ Axes ------------------------------
+
+def statRanges(roster):
+    """
+        Returns the stat ranges and health ranges (as randrange() bounds) characters are
+        generated within: Character's and those of the templates in roster.
+    """
+    stats = {tuple(Character.STAT_RANGE)} | {tuple(template.statRange) for template in roster if template.statRange}
+    health = {tuple(Character.HEALTH_RANGE)} | {tuple(template.healthRange) for template in roster if template.healthRange}
+    return sorted(stats), sorted(health)
+
+def statAxis(itemList, kind, roster):
+    """
+        Returns every attack (kind 'W') or block (kind 'A') a character can have: a base stat
+        from any of the stat ranges plus the bonus of any weapon (or armor), or none. Block
+        is half the defense, rounded down as in takeDamage().
+    """
+    gear = itemList[0] if kind == 'W' else itemList[1]
+    bonuses = {0} | {item.stat for item in gear}
+    values = {base + bonus for low, high in statRanges(roster)[0] for base in range(low, high) for bonus in bonuses}
+    return sorted(values) if kind == 'W' else sorted({value // 2 for value in values})
+
+def healthAxis(roster, healthStep):
+    """
+        Returns the grid of starting health: every healthStep points from the lowest health
+        a character can have until the highest is covered.
+    """
+    ranges = statRanges(roster)[1]
+    low = min(low for low, high in ranges)
+    top = max(high for low, high in ranges) - 1
+    return list(range(low, top + healthStep, healthStep))
+
+def position(axis, value):
+    """
+        Returns (index, fraction) placing value between axis[index] and axis[index + 1],
+        clamped to the ends of the axis.
+    """
+    if value <= axis[0]:
+        return 0, 0.0
+    if value >= axis[-1]:
+        return len(axis) - 1, 0.0
+    index = bisect_right(axis, value) - 1
+    return index, (value - axis[index]) / (axis[index + 1] - axis[index])
+
+#------------------------------ Solving ------------------------------
+
+def solveWins(matchups, maxHealth):
+    """
+        Solves the win probability of a batch of matchups (playerAttack, playerDefense,
+        enemyAttack, enemyDefense) for every player and enemy health up to maxHealth at once.
+        It returns a NumPy array indexed [matchup, turn, player health, enemy health] with
+        turn 0 for the player moving first and 1 for the enemy, matching solver.solveTable().
+
+        A row of player health is solved at once: the enemy's hits only reach rows already
+        solved, while the player's hits reach lower enemy health in the same row, which is
+        walked up one enemy health at a time for the whole batch. The health axes are padded
+        with the values of health at or below 0, so the health a hit of every damage leaves is
+        a contiguous window and each sum over damage is a single dot product.
+    """
+    import numpy as np
+    count = len(matchups)
+    toEnemy = [damageDistribution(attack, enemyDefense) for attack, defense, enemyAttack, enemyDefense in matchups]
+    toPlayer = [damageDistribution(enemyAttack, defense) for attack, defense, enemyAttack, enemyDefense in matchups]
+    most = max([hits[-1][0] for zero, hits in toEnemy + toPlayer if hits], default = 1)
+    # The chance of each damage above 0, highest damage first: [matchup, most - damage].
+    pa = np.zeros((count, most + 1))
+    pb = np.zeros((count, most + 1))
+    for index in range(count):
+        for damage, chance in toEnemy[index][1]:
+            pa[index, most - damage] = chance
+        for damage, chance in toPlayer[index][1]:
+            pb[index, most - damage] = chance
+    a0 = np.array([zero for zero, hits in toEnemy])
+    b0 = np.array([zero for zero, hits in toPlayer])
+    denominator = 1 - a0 * b0
+    # Neither side can ever deal damage: the fight never ends and nobody wins.
+    stalemate = denominator == 0
+    denominator[stalemate] = 1.0
+
+    size = maxHealth + 1
+    # Health h is kept at h + most along the padded axis: the player's health when the
+    # player moves and the enemy's when the enemy moves.
+    playerMoves = np.zeros((count, most + size, size))
+    enemyMoves = np.zeros((count, size, most + size))
+    playerMoves[:, most + 1:, 0] = 1.0
+    enemyMoves[:, 1:, :most + 1] = 1.0
+    for pH in range(1, size):
+        # Sb for every enemy health: the enemy hits, leaving the player in a row already solved.
+        sb = np.einsum("cd,cde->ce", pb, playerMoves[:, pH:pH + most + 1, :])
+        playerRow = playerMoves[:, most + pH]
+        enemyRow = enemyMoves[:, pH]
+        for eH in range(1, size):
+            sa = np.einsum("cd,cd->c", pa, enemyRow[:, eH:eH + most + 1])
+            value = (sa + a0 * sb[:, eH]) / denominator
+            playerRow[:, eH] = value
+            enemyRow[:, most + eH] = sb[:, eH] + b0 * value
+    playerMoves = playerMoves[:, most:]
+    enemyMoves = enemyMoves[:, :, most:]
+    playerMoves[stalemate, 1:, 1:] = 0.0
+    enemyMoves[stalemate, 1:, 1:] = 0.0
+    return np.stack((playerMoves, enemyMoves), 1)
+
+#------------------------------ Building ------------------------------
+
+def readAxes(path):
+    """
+        Returns the (attack, block, health) axes of a table file and the offset of its values.
+    """
+    with open(path, "rb") as infile:
+        magic, attacks, blocks, healths = HEADER.unpack(infile.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a win probability table")
+        counts = (attacks, blocks, healths)
+        values = struct.unpack(f"<{sum(counts)}h", infile.read(2 * sum(counts)))
+    attack = list(values[:attacks])
+    block = list(values[attacks:attacks + blocks])
+    health = list(values[attacks + blocks:])
+    offset = HEADER.size + 2 * sum(counts)
+    # The values start on an 8 byte boundary.
+    return attack, block, health, offset + -offset % 8
+
+def buildTable(path = "winrates.bin", itemList = None, roster = None, healthStep = 10, batchSize = 128):
+    """
+        Builds the table for the items in itemList and the enemy templates in roster (read
+        from Items.txt and Enemies.txt by default) and writes it to path. If path already
+        holds a table with the same health axis, every matchup whose stats it already covers
+        is copied from it and only the rest are solved. It returns (matchups solved, matchups
+        copied).
+    """
+    import numpy as np
+    if itemList is None:
+        itemList = readItems()
+    if roster is None:
+        roster = readEnemies()
+    attack = statAxis(itemList, 'W', roster)
+    block = statAxis(itemList, 'A', roster)
+    health = healthAxis(roster, healthStep)
+    shape = (len(attack), len(block), len(attack), len(block), 2, len(health), len(health))
+
+    old = None
+    if os.path.exists(path):
+        oldAttack, oldBlock, oldHealth, oldOffset = readAxes(path)
+        if oldHealth == health:
+            old = np.memmap(path, dtype = "<u2", mode = "r", offset = oldOffset,
+                            shape = (len(oldAttack), len(oldBlock), len(oldAttack), len(oldBlock), 2,
+                                     len(health), len(health)))
+
+    # Written next to the old table and moved over it once complete.
+    temporary = path + ".tmp"
+    header = HEADER.pack(MAGIC, len(attack), len(block), len(health))
+    header += struct.pack(f"<{len(attack) + len(block) + len(health)}h", *attack, *block, *health)
+    header += bytes(-len(header) % 8)
+    with open(temporary, "wb") as outfile:
+        outfile.write(header)
+    table = np.memmap(temporary, dtype = "<u2", mode = "r+", offset = len(header), shape = shape)
+
+    # Which points of the new axes the old table has (and where).
+    covered = np.zeros(shape[:4], dtype = bool)
+    if old is not None:
+        attackKept = [index for index, value in enumerate(attack) if value in oldAttack]
+        blockKept = [index for index, value in enumerate(block) if value in oldBlock]
+        attackFrom = [oldAttack.index(attack[index]) for index in attackKept]
+        blockFrom = [oldBlock.index(block[index]) for index in blockKept]
+        keep = np.ix_(attackKept, blockKept, attackKept, blockKept)
+        table[keep] = old[np.ix_(attackFrom, blockFrom, attackFrom, blockFrom)]
+        covered[keep] = True
+        del old
+
+    # Solved in order of the hardest hit either side can deal, so each batch only pads its
+    # health axes by about as much as its own matchups need.
+    missing = np.argwhere(~covered)
+    missing = missing[np.argsort(np.maximum(missing[:, 0], missing[:, 2]), kind = "stable")]
+    healthIndex = np.array(health)
+    for start in range(0, len(missing), batchSize):
+        batch = missing[start:start + batchSize]
+        # Any defense with the right block will do.
+        matchups = [(attack[a], block[d] * 2, attack[ea], block[ed] * 2) for a, d, ea, ed in batch]
+        wins = solveWins(matchups, health[-1])[:, :, healthIndex][:, :, :, healthIndex]
+        table[tuple(batch.T)] = np.rint(wins * SCALE).astype("<u2")
+    table.flush()
+    del table
+    os.replace(temporary, path)
+    return len(missing), int(covered.sum())
+
+#------------------------------ Lookups ------------------------------
+
+class WinTable:
+    """
+        A table file opened for lookups. The values are read straight from the memory-mapped
+        file, so opening a table costs nothing however big it is.
+    """
+    def __init__(self, path = "winrates.bin"):
+        """
+            Opens the table at path.
+        """
+        self.attack, self.block, self.health, offset = readAxes(path)
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+        self.values = memoryview(self.map)[offset:].cast("H")
+        # How far apart neighbouring entries of each axis are.
+        self.healthStride = len(self.health)
+        self.turnStride = self.healthStride * len(self.health)
+        self.enemyBlockStride = self.turnStride * 2
+        self.enemyAttackStride = self.enemyBlockStride * len(self.block)
+        self.blockStride = self.enemyAttackStride * len(self.attack)
+        self.attackStride = self.blockStride * len(self.block)
+
+    def winProbability(self, playerHealth, playerAttack, playerDefense, playerAgility,
+                       enemyHealth, enemyAttack, enemyDefense, enemyAgility):
+        """
+            Returns the chance the player wins a fight with the given stats (attack and
+            defense including gear). Attack and defense any character can have are on the
+            table's grid, so only health is interpolated between grid points (and any other
+            stats). Stats beyond the table are treated as its nearest edge.
+        """
+        attack, block, health = self.attack, self.block, self.health
+        corners = [(0 if playerAgility >= enemyAgility else self.turnStride, 1.0)]
+        for axis, value, stride in ((attack, playerAttack, self.attackStride), (block, playerDefense // 2, self.blockStride),
+                                    (attack, enemyAttack, self.enemyAttackStride), (block, enemyDefense // 2, self.enemyBlockStride),
+                                    (health, playerHealth, self.healthStride), (health, enemyHealth, 1)):
+            index, fraction = position(axis, value)
+            offset = index * stride
+            if fraction:
+                corners = [pair for start, weight in corners
+                           for pair in ((start + offset, weight * (1 - fraction)), (start + offset + stride, weight * fraction))]
+            else:
+                corners = [(start + offset, weight) for start, weight in corners]
+        values = self.values
+        return sum(values[start] * weight for start, weight in corners) / SCALE
+
+    def matchup(self, player, enemy):
+        """
+            Returns the chance a Player wins against an Enemy as they are now.
+        """
+        return self.winProbability(player.health, player.attack, player.defense, player.agility,
+                                   enemy.health, enemy.attack, enemy.defense, enemy.agility)
+
+    def close(self):
+        """
+            Closes the table's file.
+        """
+        self.values.release()
+        self.map.close()
+        self.file.close()
+
+def loadTable(path = "winrates.bin"):
+    """
+        Memory-maps the values of a table as a read-only NumPy array (requires NumPy) indexed
+        [player attack, player block, enemy attack, enemy block, turn, player health, enemy
+        health] by grid point, with the axes: returns (values, attack, block, health). Nothing
+        is read or copied until it is used.
+    """
+    import numpy as np
+    attack, block, health, offset = readAxes(path)
+    shape = (len(attack), len(block), len(attack), len(block), 2, len(health), len(health))
+    return np.memmap(path, dtype = "<u2", mode = "r", offset = offset, shape = shape), attack, block, health
+
+#------------------------------ Main ------------------------------
+
+def check(table, count, itemList, roster, seed = 0):
+    """
+        Compares count random matchups with solveFight() and returns (largest error, mean
+        error, microseconds per lookup). Each side has a random health and base stats from
+        Character's ranges, plus a random weapon and armor from itemList (or none).
+    """
+    rng = random.Random(seed)
+    weapons = [0] + [item.stat for item in itemList[0]]
+    armors = [0] + [item.stat for item in itemList[1]]
+    def side():
+        return (rng.randrange(*Character.HEALTH_RANGE), rng.randrange(*Character.STAT_RANGE) + rng.choice(weapons),
+                rng.randrange(*Character.STAT_RANGE) + rng.choice(armors), rng.randrange(*Character.STAT_RANGE))
+    matchups = [side() + side() for _ in range(count)]
+    start = time.perf_counter()
+    estimates = [table.winProbability(*matchup) for matchup in matchups]
+    elapsed = time.perf_counter() - start
+    errors = [abs(estimate - solveFight(*matchup).winProbability) for estimate, matchup in zip(estimates, matchups)]
+    return max(errors), sum(errors) / count, elapsed / count * 1e6
+
+def main():
+    """
+        Builds (or incrementally rebuilds) a table, answers a query or checks a table against
+        the exact solver from the command line.
+    """
+    parser = argparse.ArgumentParser(description = "Precompute and look up fight win probabilities.")
+    parser.add_argument("--table", default = "winrates.bin", help = "table file")
+    parser.add_argument("--build", action = "store_true", help = "build the table, solving only what changed")
+    parser.add_argument("--items", default = "Items.txt", help = "item file the table covers")
+    parser.add_argument("--enemies", default = "Enemies.txt", help = "enemy file the table covers")
+    parser.add_argument("--health-step", type = int, default = 10, help = "health grid step")
+    parser.add_argument("--query", type = int, nargs = 8, metavar = "STAT",
+                        help = "player health, attack, defense, agility and enemy health, attack, defense, agility")
+    parser.add_argument("--check", type = int, default = 0, help = "compare this many random matchups with the exact solver")
+    args = parser.parse_args()
+
+    if args.build:
+        start = time.perf_counter()
+        solved, copied = buildTable(args.table, readItems(args.items), readEnemies(args.enemies), args.health_step)
+        print(f"Solved {solved:,} matchups and copied {copied:,} in {time.perf_counter() - start:.2f}s "
+              f"({os.path.getsize(args.table):,} bytes)")
+    table = WinTable(args.table)
+    if args.query:
+        start = time.perf_counter()
+        probability = table.winProbability(*args.query)
+        elapsed = time.perf_counter() - start
+        print(f"Win probability: {probability:.4f} (exact {solveFight(*args.query).winProbability:.4f}, "
+              f"looked up in {elapsed * 1e6:.1f} us)")
+    if args.check:
+        largest, mean, micros = check(table, args.check, readItems(args.items), readEnemies(args.enemies))
+        print(f"Checked {args.check:,} matchups: largest error {largest:.4f}, mean error {mean:.4f}, {micros:.1f} us per lookup")
+    table.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+    Simulates a grid of game balance settings (the weight limit, the stat ranges of
+    Character and the odds of enemy gear) across a pool of processes. The games for each
+    setting are split into chunks, and every chunk is played from its own seed derived from
+    a master seed, so the merged table is the same on every rerun (with the same chunk size)
+    no matter how many processes are used or which process plays which chunk.
+"""
+
+import argparse
+import hashlib
+import itertools
+import multiprocessing
+
+from RPG import Character, Player, readItems, items
+from simulator import POLICIES, Policy, SimulationResults, runGames
+
+#------------------------------ Settings ------------------------------
+
+def grid(weightLimits = None, healthRanges = None, statRanges = None, gearOdds = None):
+    """
+        Returns a setting (dictionary) for every combination of the given values. Values
+        left as None keep the game's current setting.
+    """
+    weightLimits = weightLimits or [Player.WEIGHT_LIMIT]
+    healthRanges = healthRanges or [Character.HEALTH_RANGE]
+    statRanges = statRanges or [Character.STAT_RANGE]
+    gearOdds = gearOdds or [items.GEAR_ODDS]
+    return [{"weightLimit": weightLimit, "healthRange": tuple(healthRange), "statRange": tuple(statRange), "gearOdds": tuple(odds)}
+            for weightLimit, healthRange, statRange, odds in itertools.product(weightLimits, healthRanges, statRanges, gearOdds)]
+
+def applySettings(settings):
+    """
+        Changes the game's balance settings and returns the previous ones so they can be
+        restored. Each process has its own copy of the game, so this only affects the
+        process it runs in.
+    """
+    previous = {"weightLimit": Player.WEIGHT_LIMIT, "healthRange": Character.HEALTH_RANGE,
+                "statRange": Character.STAT_RANGE, "gearOdds": items.GEAR_ODDS}
+    Player.WEIGHT_LIMIT = settings["weightLimit"]
+    Character.HEALTH_RANGE = settings["healthRange"]
+    Character.STAT_RANGE = settings["statRange"]
+    # Set where generateEnemies() reads it (the package only has a copy).
+    items.GEAR_ODDS = settings["gearOdds"]
+    return previous
+
+def chunkSeed(masterSeed, settingIndex, chunkIndex):
+    """
+        Derives the seed of a chunk of games from the master seed by hashing, so every
+        chunk gets its own stream of games that does not overlap with its neighbours.
+    """
+    digest = hashlib.sha256(f"{masterSeed}:{settingIndex}:{chunkIndex}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+#------------------------------ Sweeps ------------------------------
+
+def playChunk(task):
+    """
+        Plays one chunk of games with the given settings and returns the index of the
+        setting with the SimulationResults. Runs inside a worker process.
+    """
+    settingIndex, settings, seed, games, policy, itemList = task
+    previous = applySettings(settings)
+    try:
+        return settingIndex, runGames(games, policy, seed, itemList)
+    finally:
+        applySettings(previous)
+
+def runSweep(settingsList, gamesPerSetting, masterSeed = 0, processes = None, chunkSize = 10000, policy = None, itemList = None):
+    """
+        Plays gamesPerSetting games for every setting in settingsList, spread over a pool of
+        processes (all cores if processes is None, in this process if it is 1). It returns
+        one row (dictionary) per setting with the setting and its merged results.
+    """
+    if policy is None:
+        policy = Policy()
+    if itemList is None:
+        itemList = readItems()
+
+    tasks = []
+    for settingIndex, settings in enumerate(settingsList):
+        for chunkIndex, start in enumerate(range(0, gamesPerSetting, chunkSize)):
+            games = min(chunkSize, gamesPerSetting - start)
+            tasks.append((settingIndex, settings, chunkSeed(masterSeed, settingIndex, chunkIndex), games, policy, itemList))
+
+    merged = [SimulationResults() for settings in settingsList]
+    if processes == 1:
+        for task in tasks:
+            settingIndex, results = playChunk(task)
+            merged[settingIndex].merge(results)
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            # Results come back in task order, so merging is the same on every run.
+            for settingIndex, results in pool.imap(playChunk, tasks):
+                merged[settingIndex].merge(results)
+
+    rows = []
+    for settings, results in zip(settingsList, merged):
+        row = dict(settings)
+        row.update(games = results.games, wins = results.wins, winRate = results.winRate(), averageTurns = results.averageTurns())
+        rows.append(row)
+    return rows
+
+def formatTable(rows):
+    """
+        Returns the rows of a sweep as a text table.
+    """
+    lines = [f"{'Weight':>6} {'Health':>9} {'Stats':>7} {'Gear odds':>12} {'Games':>9} {'Win rate':>9} {'Turns':>6}"]
+    for row in rows:
+        lines.append(f"{row['weightLimit']:>6} {'%d-%d' % row['healthRange']:>9} {'%d-%d' % row['statRange']:>7} "
+                     f"{','.join(map(str, row['gearOdds'])):>12} {row['games']:>9} {row['winRate']:>9.4f} {row['averageTurns']:>6.2f}")
+    return "\n".join(lines)
+
+#------------------------------ Main ------------------------------
+
+def parseRange(text):
+    """
+        Parses a range written as low-high (randrange() bounds) into a tuple.
+    """
+    low, high = text.split("-")
+    return (int(low), int(high))
+
+def parseOdds(text):
+    """
+        Parses gear odds written as four comma separated numbers into a tuple.
+    """
+    return tuple(int(odds) for odds in text.split(","))
+
+def main():
+    """
+        Runs a sweep from the command line and prints the table.
+    """
+    parser = argparse.ArgumentParser(description = "Simulate a grid of balance settings across processes.")
+    parser.add_argument("--games", type = int, default = 100000, help = "games per setting")
+    parser.add_argument("--seed", type = int, default = 0, help = "master seed")
+    parser.add_argument("--processes", type = int, default = None, help = "worker processes (default: all cores)")
+    parser.add_argument("--chunk", type = int, default = 10000, help = "games per task")
+    parser.add_argument("--policy", choices = sorted(POLICIES), default = "attack", help = "player policy")
+    parser.add_argument("--start", type = int, default = 0, help = "index of the starting item")
+    parser.add_argument("--weight-limit", type = int, nargs = "+", help = "weight limits, e.g. 8 10 12")
+    parser.add_argument("--health", type = parseRange, nargs = "+", help = "health ranges, e.g. 80-121")
+    parser.add_argument("--stats", type = parseRange, nargs = "+", help = "attack/defense/agility ranges, e.g. 5-13")
+    parser.add_argument("--gear-odds", type = parseOdds, nargs = "+", help = "enemy gear odds (both,weapon,armor,none), e.g. 1,1,1,1")
+    args = parser.parse_args()
+
+    settingsList = grid(args.weight_limit, args.health, args.stats, args.gear_odds)
+    rows = runSweep(settingsList, args.games, args.seed, args.processes, args.chunk, POLICIES[args.policy](args.start))
+    print(formatTable(rows))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+    Runs every test from the repository's root, where the game reads Items.txt and
+    Enemies.txt, with the root importable.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+@pytest.fixture(autouse = True)
+def root(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+@pytest.fixture
+def quiet(monkeypatch):
+    """
+        Runs the console game without printing or writing battle-log.txt.
+    """
+    import io
+    import RPG
+    from battlelog import NullLog
+    monkeypatch.setattr("sys.stdout", io.StringIO())
+    previousLog = RPG.setLog(NullLog())
+    previousInput = RPG.setInput(input)
+    yield
+    RPG.setInput(previousInput)
+    RPG.setLog(previousLog)
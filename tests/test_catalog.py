@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+import catalog
+from catalog import loadCatalog, reloadHooks
+from RPG import Player, readItems, generateEnemies
+from rng import GameRandom
+
+ITEMS = """W, sword, 10, 3
+W, axe, 15, 4
+W, spear, 5, 2
+A, shield, 20, 5
+P, health potion, 50, 1
+"""
+
+@pytest.fixture
+def items(tmp_path):
+    path = tmp_path / "Items.txt"
+    path.write_text(ITEMS)
+    return path
+
+def rewrite(path, text):
+    """
+        Replaces the file's text, moving its modification time on so the change is seen.
+    """
+    modified = os.stat(path).st_mtime_ns
+    path.write_text(text)
+    os.utime(path, ns = (modified + 10**9, modified + 10**9))
+
+def testEditUpdatesHeldItems(items):
+    itemList = readItems(str(items))
+    sword = itemList[0][0]
+    rng = GameRandom(0)
+    player = Player("Hero", rng)
+    player.equip(sword)
+    enemies = generateEnemies(itemList, rng = rng)
+    before = [(enemy.attack, enemy.weapon) for enemy in enemies]
+    rewrite(items, ITEMS.replace("sword, 10, 3", "sword, 14, 2"))
+    assert readItems(str(items)) is itemList
+    assert itemList[0][0] is sword and (sword.stat, sword.weight) == (14, 2)
+    assert player.attack == player.baseAttack + 14 and player.weight == 2
+    for enemy, (attack, weapon) in zip(enemies, before):
+        assert enemy.attack == attack + (4 if weapon is sword else 0)
+    current = loadCatalog(str(items))
+    assert current.withStat('W', 14, 14) == [sword]
+    assert current.stats['W'] == [5, 14, 15]
+
+def testInsertAndRemove(items):
+    itemList = readItems(str(items))
+    axe = itemList[0][1]
+    rewrite(items, ITEMS.replace("W, axe, 15, 4\n", "") + "W, club, 7, 1\n")
+    readItems(str(items))
+    assert [item.name for item in itemList[0]] == ["sword", "spear", "club"]
+    current = loadCatalog(str(items))
+    assert current.find("axe") is None and current.find("club").stat == 7
+    # Whoever holds a removed item keeps it as it was.
+    assert (axe.stat, axe.weight) == (15, 4)
+
+def testMalformedLineLeavesCatalog(items):
+    itemList = readItems(str(items))
+    sword = itemList[0][0]
+    rewrite(items, ITEMS.replace("sword, 10, 3", "sword, 99, 3") + "\nW, broken\n")
+    with pytest.raises(ValueError, match = "line 7"):
+        readItems(str(items))
+    assert sword.stat == 10 and len(itemList[0]) == 3
+
+def testEditsParseOnlyChangedLines(items, monkeypatch):
+    readItems(str(items))
+    parsed = []
+    original = catalog.parseItem
+    monkeypatch.setattr(catalog, "parseItem", lambda line, number: parsed.append(line) or original(line, number))
+    rewrite(items, ITEMS.replace("spear, 5, 2", "spear, 6, 2").replace("shield, 20, 5", "shield, 20, 5, 3"))
+    readItems(str(items))
+    assert parsed == ["W, spear, 6, 2", "A, shield, 20, 5, 3"]
+
+def testReloadHooksSeeChangedItems(items, monkeypatch):
+    itemList = readItems(str(items))
+    seen = []
+    monkeypatch.setattr(catalog, "reloadHooks", reloadHooks + [lambda current, changed: seen.append(changed)])
+    rewrite(items, ITEMS.replace("axe, 15, 4", "axe, 15, 5"))
+    readItems(str(items))
+    assert seen == [[itemList[0][1]]]
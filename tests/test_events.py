@@ -0,0 +1,46 @@
+import pytest
+
+from events import EventStream, readEvents, readNames, ATTACK, HEAL, HEADER, MAGIC, MAX_NAMES
+
+def testTornRecordIsCutOff(tmp_path):
+    path = str(tmp_path / "events.bin")
+    stream = EventStream(path)
+    stream.emit(ATTACK, 1, "Hero", "goblin", 12, 3, 90)
+    stream.close()
+    # A crash part way through writing the next record.
+    with open(path, "ab") as outfile:
+        outfile.write(b"\x01\x02\x03\x04\x05")
+    stream = EventStream(path)
+    assert stream.game == 1
+    stream.startGame(1)
+    stream.emit(HEAL, 1, "Hero", "", 50, 0, 100)
+    stream.close()
+    events = list(readEvents(path))
+    assert [(game, kind, value, health) for game, kind, side, actor, target, value, extra, health in events] == \
+        [(0, ATTACK, 12, 90), (1, HEAL, 50, 100)]
+
+def testTornHeaderIsRewritten(tmp_path):
+    path = str(tmp_path / "events.bin")
+    with open(path, "wb") as outfile:
+        outfile.write(MAGIC[:5])
+    stream = EventStream(path)
+    stream.emit(ATTACK, 1, "Hero", "goblin", 7, 0, 80)
+    stream.close()
+    with open(path, "rb") as infile:
+        assert infile.read(len(HEADER)) == HEADER
+    assert len(list(readEvents(path))) == 1
+
+def testNamesTableFull(tmp_path):
+    path = str(tmp_path / "events.bin")
+    EventStream(path).close()
+    with open(path + ".names", "w") as outfile:
+        outfile.writelines(f"name {index}\n" for index in range(MAX_NAMES))
+    stream = EventStream(path)
+    stream.emit(ATTACK, 1, "name 0", f"name {MAX_NAMES - 1}", 5, 0, 90)
+    with pytest.raises(ValueError):
+        stream.emit(ATTACK, 1, "name 1", "Hero", 5, 0, 90)
+    stream.close()
+    # The name that did not fit is not recorded and the stream is still readable.
+    assert len(readNames(path)) == MAX_NAMES
+    assert [(actor, target) for game, kind, side, actor, target, value, extra, health in readEvents(path)] == \
+        [(0, MAX_NAMES - 1)]
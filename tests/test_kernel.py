@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from kernel import resolveFights
+from solver import solveFight
+
+def testScalarFight():
+    outcomes = resolveFights(100, 12, 8, 10, 90, 10, 6, 7, rng = 0)
+    assert len(outcomes.playerWon) == 1
+    assert outcomes.turns[0] > 0
+    assert (outcomes.playerHealth[0] == 0) != (outcomes.enemyHealth[0] == 0)
+
+def testScalarsBroadcastWithArrays():
+    outcomes = resolveFights(np.array([100, 90, 80]), 12, 8, 10, 90, 10, 6, 7, rng = 0)
+    assert len(outcomes.turns) == 3
+
+@pytest.mark.parametrize("stats", [(100, 12, 8, 10, 90, 10, 6, 7), (85, 9, 12, 5, 110, 14, 5, 9),
+                                   (120, 20, 7, 6, 100, 18, 20, 11)])
+def testKernelAgreesWithSolver(stats):
+    size = 40000
+    outcomes = resolveFights(*[np.full(size, stat) for stat in stats], rng = 1)
+    exact = solveFight(*stats).winProbability
+    # Four standard errors of the Monte Carlo estimate.
+    assert abs(outcomes.winRate() - exact) < 4 * (exact * (1 - exact) / size) ** 0.5 + 1e-3
@@ -0,0 +1,57 @@
+import pytest
+
+from RPG import Battle, Player, readItems, readEnemies, generateEnemies
+from planner import Planner, PlannedPolicy, copyBattle, playBattleWith
+from rng import GameRandom
+from simulator import Policy, GreedyPolicy, storeItem
+from solver import solveMatchup, solveTable
+
+def setUp(seed, start = 0):
+    """
+        Sets up the battle of a game the way planner.py's main() does and returns the player,
+        the potion and the enemies in the order they are fought.
+    """
+    itemList = readItems()
+    rng = GameRandom(seed)
+    player = Player("Hero", rng)
+    storeItem(player, (itemList[0] + itemList[1] + itemList[2])[start], Policy())
+    potion = itemList[2][0]
+    enemies = Battle(player, potion, generateEnemies(itemList, readEnemies(), rng = rng), rng).enemies
+    return player, potion, enemies
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("start", [0, 4])
+def testSingleFightMatchesSolver(seed, start):
+    player, potion, enemies = setUp(seed, start)
+    enemy = enemies[0]
+    planner = Planner(player, [enemy], potion)
+    # With no potions and no running from the last enemy, attacking is the only choice.
+    assert planner.winProbability() == pytest.approx(solveMatchup(player, enemy).winProbability, abs = 1e-12)
+    table = solveTable(player.MAX_HEALTH, player.attack, player.defense, enemy.health, enemy.attack, enemy.defense)
+    plan = planner.plan(*planner.start)
+    for health in range(player.MAX_HEALTH + 1):
+        assert plan.playerMoves[health] == pytest.approx(table.win[0][health], abs = 1e-12), health
+        assert plan.enemyMoves[health] == pytest.approx(table.win[1][health], abs = 1e-12), health
+
+@pytest.mark.parametrize("seed", range(6))
+def testPotionsNeverLowerTheSingleFightValue(seed):
+    player, potion, enemies = setUp(seed)
+    exact = solveMatchup(player, enemies[0]).winProbability
+    player.equip(potion)
+    assert Planner(player, enemies[:1], potion).winProbability() >= exact - 1e-12
+
+@pytest.mark.parametrize("seed", [8, 11, 20, 22])
+def testPlanIsNeverBelowGreedy(seed):
+    player, potion, enemies = setUp(seed)
+    planner = Planner(player, enemies, potion)
+    planned = planner.winProbability()
+    games = 1500
+    rates = []
+    for policy in (PlannedPolicy(planner), GreedyPolicy()):
+        wins = sum(playBattleWith(copyBattle(player, potion, enemies, GameRandom(game)), policy) for game in range(games))
+        rates.append(wins / games)
+    planRate, greedyRate = rates
+    # Four standard errors of the estimates.
+    error = 4 * (planned * (1 - planned) / games) ** 0.5 + 1e-3
+    assert abs(planRate - planned) < error
+    assert greedyRate < planned + error
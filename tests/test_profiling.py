@@ -0,0 +1,27 @@
+import RPG
+from RPG import cli, combat, console, models
+from profiling import Profiler, instrumentGame
+
+def playGame(seed):
+    answers = iter(["Hero"])
+    RPG.setInput(lambda prompt = "": next(answers, "n" if "(y/n)" in prompt else "0"))
+    RPG.main(seed)
+
+def testProfiledGameTimesImportedFunctions(quiet):
+    profiler = Profiler()
+    instrumentGame(profiler)
+    try:
+        playGame(3)
+    finally:
+        profiler.restore()
+    timers = profiler.summary()["timers"]
+    for name in ("RPG.console.say", "RPG.console.askNumber", "RPG.items.generateEnemies", "RPG.items.readItems", "Battle.playerAttack"):
+        assert timers[name]["calls"] > 0, name
+
+def testRestorePutsImportedNamesBack(quiet):
+    originals = (cli.say, combat.say, models.say, console.say, RPG.say, cli.generateEnemies)
+    profiler = Profiler()
+    instrumentGame(profiler)
+    assert cli.say is not originals[0] and cli.say is combat.say is models.say is console.say
+    profiler.restore()
+    assert (cli.say, combat.say, models.say, console.say, RPG.say, cli.generateEnemies) == originals
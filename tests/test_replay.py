@@ -0,0 +1,51 @@
+import random
+
+import RPG
+from replay import TraceWriter, GameTrace, readTraces, replayAll, replayGame, LOST, WON, UNFINISHED
+from simulator import GreedyPolicy, runGames
+
+def testSimulatedGamesReplay(tmp_path):
+    path = str(tmp_path / "trace.bin")
+    trace = TraceWriter(path)
+    runGames(50, GreedyPolicy(), seed = 0, trace = trace)
+    trace.close()
+    traces = list(readTraces(path))
+    assert len(traces) == 50
+    assert {trace.outcome for trace in traces} <= {WON, LOST}
+    assert replayAll(path) == (50, [])
+
+def testConsoleGamesReplay(tmp_path, quiet):
+    path = str(tmp_path / "trace.bin")
+    trace = TraceWriter(path)
+    previous = RPG.setTrace(trace)
+    try:
+        for seed in range(30):
+            choices = random.Random(seed)
+            answers = iter(["Hero"])
+            def answer(prompt = ""):
+                response = next(answers, None)
+                if response is not None:
+                    return response
+                if "(y/n)" in prompt:
+                    return choices.choice("yn")
+                return str(choices.choice([0, 0, 0, 1, 2, 3, 4]))
+            RPG.setInput(answer)
+            try:
+                RPG.main(seed)
+            except AttributeError:
+                # A loot index that picks nothing stops the console game (recorded as unfinished).
+                pass
+    finally:
+        RPG.setTrace(previous)
+    trace.close()
+    traces = list(readTraces(path))
+    assert {trace.outcome for trace in traces} >= {LOST, UNFINISHED}
+    assert replayAll(path) == (30, [])
+
+def testChoiceOutOfRangeIsUnfinished():
+    itemList = RPG.readItems()
+    items = sum(len(group) for group in itemList)
+    assert replayGame(GameTrace(0, "Hero", [items]), itemList) == (UNFINISHED, 0)
+    assert replayGame(GameTrace(0, "Hero", [-1]), itemList) == (UNFINISHED, 0)
+    # Running out of choices part way through.
+    assert replayGame(GameTrace(0, "Hero", [0, 0]), itemList) == (UNFINISHED, 0)
@@ -0,0 +1,85 @@
+from collections import Counter
+
+import pytest
+
+from results import ResultStore, readHeader, readResults, loadResults, TURN_BUCKETS, WON, LOST, FLED
+from simulator import GreedyPolicy, RandomPolicy, runGames
+
+# Positions of the fields of a record read with readResults().
+OUTCOME, TURNS, HEALTH = 9, 10, 11
+
+def crash(store):
+    """
+        Stops using a store the way a killed process would: whatever reached the mapped file
+        stays there, but nothing is committed.
+    """
+    store.map.flush()
+    store.map.close()
+    store.file.close()
+
+def testLargeSeeds(tmp_path):
+    path = str(tmp_path / "results.bin")
+    store = ResultStore(path)
+    first = 2**64 - 5
+    runGames(4, GreedyPolicy(), first, store = store)
+    store.close()
+    assert {record[0] for record in readResults(path)} == set(range(first, first + 4))
+    assert readHeader(path)[2] == first + 4
+    assert set(loadResults(path)["seed"].tolist()) == set(range(first, first + 4))
+
+def testResumeAfterCrash(tmp_path):
+    path = str(tmp_path / "results.bin")
+    store = ResultStore(path, commitEvery = 5, growBy = 8)
+    runGames(12, RandomPolicy(), 100, store = store)
+    committed = store.ended
+    runGames(1, RandomPolicy(), 112, store = store)
+    assert store.records > committed
+    crash(store)
+
+    store = ResultStore(path, commitEvery = 5, growBy = 8)
+    assert (store.games, store.nextSeed) == (10, 110)
+    resumed = store.records
+    runGames(5, RandomPolicy(), store.nextSeed, store = store)
+    store.close()
+
+    clean = str(tmp_path / "clean.bin")
+    store = ResultStore(clean, commitEvery = 5, growBy = 8)
+    runGames(15, RandomPolicy(), 100, store = store)
+    store.close()
+    assert resumed < committed
+    assert list(readResults(path)) == list(readResults(clean))
+    assert readHeader(path) == readHeader(clean)
+
+def testTotalsMatchRecords(tmp_path):
+    path = str(tmp_path / "results.bin")
+    store = ResultStore(path, commitEvery = 7)
+    runGames(60, RandomPolicy(), 0, store = store)
+    summary = store.summary()
+    store.close()
+    records = list(readResults(path))
+    outcomes = Counter(record[OUTCOME] for record in records)
+    turns = Counter(min(record[TURNS], TURN_BUCKETS - 1) for record in records)
+    assert summary["fights"] == len(records)
+    assert (summary["fightsWon"], summary["fightsLost"], summary["fightsFled"]) == (outcomes[WON], outcomes[LOST],
+                                                                                      outcomes[FLED])
+    assert summary["averageTurns"] == pytest.approx(sum(record[TURNS] for record in records) / len(records))
+    assert summary["turnsPerFight"] == dict(sorted(turns.items()))
+    assert summary["averageHealthLeft"] == pytest.approx(sum(record[HEALTH] for record in records if record[OUTCOME] == WON)
+                                                         / outcomes[WON])
+
+def testViewAcrossGrow(tmp_path):
+    store = ResultStore(str(tmp_path / "results.bin"), growBy = 4)
+    runGames(2, GreedyPolicy(), 0, store = store)
+    before = store.view()
+    seeds = before["seed"].tolist()
+    capacity = store.capacity
+    runGames(10, GreedyPolicy(), 2, store = store)
+    assert store.capacity > capacity
+    # The old view still reads the records it was made with.
+    assert before["seed"].tolist() == seeds
+    after = store.view()
+    assert len(after) == store.records
+    assert after["seed"][:len(seeds)].tolist() == seeds
+    assert set(after["seed"].tolist()) == set(range(12))
+    del before, after
+    store.close()
@@ -0,0 +1,51 @@
+import pytest
+
+from rng import GameRandom
+
+def draw(rng):
+    """
+        Draws a mix of values the way a game does.
+    """
+    return [rng.randrange(0, 10), rng.randrange(5, 21), rng.random(), rng.next()] + list(rng.values(70))
+
+@pytest.mark.parametrize("blockSize", [1, 7, 64])
+def testSameSeedSameStream(blockSize):
+    first, second = GameRandom(42, blockSize), GameRandom(42, blockSize)
+    streams = [draw(first) for _ in range(5)], [draw(second) for _ in range(5)]
+    assert streams[0] == streams[1]
+    second.seed(42)
+    assert [draw(second) for _ in range(5)] == streams[0]
+    assert [draw(GameRandom(43, blockSize)) for _ in range(5)] != streams[0]
+
+@pytest.mark.parametrize("blockSize", [1, 8, 64])
+@pytest.mark.parametrize("skip", [0, 3, 8, 13])
+@pytest.mark.parametrize("count", [0, 1, 5, 8, 9, 30])
+def testBulkDrawsMatchSingleDraws(blockSize, skip, count):
+    single, bulk, ranges = GameRandom(7, blockSize), GameRandom(7, blockSize), GameRandom(7, blockSize)
+    for rng in (single, bulk, ranges):
+        for _ in range(skip):
+            rng.next()
+    expected = [single.randrange(-3, 11) for _ in range(count)]
+    assert [-3 + (14 * value >> 32) for value in bulk.values(count)] == expected
+    assert ranges.randranges(-3, 11, count) == expected
+    # All three continue from the same place.
+    assert single.next() == bulk.next() == ranges.next()
+
+@pytest.mark.parametrize("start, stop", [(0, 1), (0, 2), (5, 21), (-10, -3), (-7, 7), (0, 1 << 32)])
+def testResultsStayInRange(start, stop):
+    rng = GameRandom(3, 16)
+    singles = [rng.randrange(start, stop) for _ in range(2000)]
+    bulk = rng.randranges(start, stop, 2000)
+    assert all(start <= value < stop for value in singles + bulk)
+    if stop - start <= 16:
+        assert set(singles) == set(range(start, stop))
+
+@pytest.mark.parametrize("start, stop", [(0, 0), (5, 5), (-2, -2), (3, 1)])
+def testEmptyRangesAreRejected(start, stop):
+    rng, other = GameRandom(11), GameRandom(11)
+    with pytest.raises(ValueError):
+        rng.randrange(start, stop)
+    with pytest.raises(ValueError):
+        rng.randranges(start, stop, 4)
+    # A rejected draw uses up no values.
+    assert rng.next() == other.next()
@@ -0,0 +1,101 @@
+import asyncio
+import random
+
+import RPG
+from battlelog import BattleLog, SessionLog
+from events import EventStream, readEvents
+from replay import TraceWriter, readTraces, replayAll, UNFINISHED
+from server import Session
+
+class ScriptedConnection:
+    """
+        A connection whose player answers every prompt from answer(prompt).
+    """
+    def __init__(self, answer):
+        self.answer = answer
+        self.lines = []
+
+    def send(self, text):
+        self.lines.append(text)
+
+    async def receive(self):
+        return self.answer(self.lines[-1])
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+def answers(seed, stop = None):
+    """
+        Returns a player answering at random (mostly attacking) from seed, who disconnects
+        after stop answers if stop is given.
+    """
+    choices = random.Random(seed)
+    given = [0]
+    def answer(prompt):
+        given[0] += 1
+        if stop is not None and given[0] > stop:
+            return None
+        if "name" in prompt:
+            return "Hero"
+        if "(y/n)" in prompt:
+            return choices.choice("yn")
+        return choices.choice("0001234")
+    return answer
+
+def playConsole(seed, path):
+    """
+        Plays main(seed) answered like answers(seed) with its log at path, and returns False
+        if the console game crashed on an answer the server asks again for.
+    """
+    answer = answers(seed)
+    RPG.setInput(lambda prompt = "": answer(prompt))
+    previous = RPG.setLog(BattleLog(path, asynchronous = False))
+    try:
+        RPG.main(seed)
+    except (AttributeError, ValueError):
+        return False
+    finally:
+        RPG.setLog(previous).close()
+    return True
+
+def testSessionPlaysTheConsoleGame(tmp_path, quiet):
+    itemList = RPG.readItems()
+    compared = 0
+    for seed in range(30):
+        if not(playConsole(seed, str(tmp_path / "console.txt"))):
+            continue
+        session = Session(ScriptedConnection(answers(seed)), itemList, seed, SessionLog(str(tmp_path / "session.txt")))
+        asyncio.run(session.run())
+        assert (tmp_path / "session.txt").read_text() == (tmp_path / "console.txt").read_text(), seed
+        compared += 1
+    assert compared >= 20
+
+def testConcurrentSessionsRecordWholeGames(tmp_path):
+    itemList = RPG.readItems()
+    events = EventStream(str(tmp_path / "events.bin"))
+    trace = TraceWriter(str(tmp_path / "trace.bin"))
+    async def playAll():
+        sessions = [Session(ScriptedConnection(answers(seed, 12 if seed % 5 == 0 else None)), itemList, seed,
+                            events = events, trace = trace) for seed in range(20)]
+        await asyncio.gather(*(session.run() for session in sessions))
+    asyncio.run(playAll())
+    events.close()
+    trace.close()
+    traces = list(readTraces(str(tmp_path / "trace.bin")))
+    assert len(traces) == 20
+    assert sum(game.outcome == UNFINISHED for game in traces) == 4
+    assert replayAll(str(tmp_path / "trace.bin"), itemList) == (20, [])
+    # Every game's events are stored together, in the order the games ended.
+    games = [event[0] for event in readEvents(str(tmp_path / "events.bin"))]
+    assert games == sorted(games)
+    assert len(set(games)) == 20
+
+def testStepsRestoreTheConsole(tmp_path):
+    from RPG import console
+    sinks = (console.sinks, console.responseSinks, console.eventStream, console.traceWriter, console.readInput)
+    session = Session(ScriptedConnection(answers(0)), RPG.readItems(), 0)
+    asyncio.run(session.run())
+    assert (console.sinks, console.responseSinks, console.eventStream, console.traceWriter, console.readInput) == sinks
@@ -0,0 +1,114 @@
+import pytest
+
+import RPG
+from RPG import Player, readItems, readEnemies, generateEnemies, battle
+from catalog import Item
+from events import EventStream, ACQUIRED, REPLACED, KEPT, TOO_HEAVY
+from rng import GameRandom
+from simulator import Policy, playGame, storeItem
+
+def playConsole(seed, start):
+    """
+        Sets a game up the way playGame() does and plays it with battle(), answering every
+        question the way Policy(start) would: attack, take the first item, never replace.
+    """
+    itemList = readItems()
+    rng = GameRandom(seed)
+    RPG.setInput(lambda prompt = "": "n" if "(y/n)" in prompt else "0")
+    player = Player("Hero", rng)
+    player.addItem((itemList[0] + itemList[1] + itemList[2])[start])
+    enemies = generateEnemies(itemList, readEnemies(), rng = rng)
+    return battle(player, itemList[2][0], enemies, rng), player
+
+@pytest.mark.parametrize("start", [0, 1, 3])
+def testPlayGameMatchesBattle(quiet, start):
+    itemList = readItems()
+    outcomes = set()
+    for seed in range(40):
+        result = playGame(seed, itemList, Policy(start))
+        outcome, player = playConsole(seed, start)
+        assert result.victory == (outcome == "Victory!"), seed
+        assert result.health == player.health, seed
+        outcomes.add(result.victory)
+    assert outcomes == {True, False}
+
+def testPlayGameRecordsTheSameEvents(tmp_path, quiet):
+    itemList = readItems()
+    simulated = EventStream(str(tmp_path / "simulated.bin"))
+    console = EventStream(str(tmp_path / "console.bin"))
+    for seed in range(20):
+        playGame(seed, itemList, Policy(3), events = simulated)
+        console.startGame()
+        previous = RPG.setEvents(console)
+        try:
+            playConsole(seed, 3)
+        finally:
+            RPG.setEvents(previous)
+    simulated.close()
+    console.close()
+    for suffix in ("", ".names"):
+        assert (tmp_path / f"simulated.bin{suffix}").read_bytes() == (tmp_path / f"console.bin{suffix}").read_bytes()
+
+class Recorder:
+    """
+        Keeps the events it is sent, in place of an EventStream.
+    """
+    def __init__(self):
+        self.events = []
+
+    def emit(self, kind, side, actor, target = "", value = 0, extra = 0, health = 0):
+        self.events.append((kind, side, actor, target, value, extra, health))
+
+def held(player):
+    """
+        Returns what the player carries and its weight.
+    """
+    inventory = player.inventory
+    return inventory.weapon, inventory.armor, list(inventory.potions), player.weight
+
+class Answer(Policy):
+    """
+        Answers every replace question with the same answer and counts the questions.
+    """
+    def __init__(self, answer):
+        super().__init__()
+        self.answer = answer
+        self.asked = 0
+
+    def chooseReplace(self, player, oldItem, newItem):
+        self.asked += 1
+        return self.answer
+
+def testStoreItemMatchesAddItem(quiet):
+    light = [Item('W', "dagger", 2, 1), Item('A', "vest", 2, 1)]
+    heavy = [Item('W', "maul", 9, 9), Item('A', "plate", 9, 9)]
+    items = light + heavy + [Item('W', "stick", 1, 0), Item('P', "potion", 50, 1), Item('P', "barrel", 90, 11)]
+    gear = [None] + light + heavy
+    outcomes = set()
+    for weapon in [item for item in gear if item is None or item.kind == 'W']:
+        for armor in [item for item in gear if item is None or item.kind == 'A']:
+            for item in items:
+                for answer in (True, False):
+                    players = []
+                    for _ in range(2):
+                        player = Player("Hero", GameRandom(0))
+                        for worn in (weapon, armor):
+                            if worn is not None:
+                                player.equip(worn)
+                        players.append(player)
+                    console, simulated = Recorder(), Recorder()
+                    prompts = []
+                    RPG.setInput(lambda prompt = "": prompts.append(prompt) or ("y" if answer else "n"))
+                    previous = RPG.setEvents(console)
+                    try:
+                        players[0].addItem(item)
+                    finally:
+                        RPG.setEvents(previous)
+                    policy = Answer(answer)
+                    storeItem(players[1], item, policy, simulated)
+                    case = (weapon and weapon.name, armor and armor.name, item.name, answer)
+                    assert console.events == simulated.events, case
+                    assert len(prompts) == policy.asked, case
+                    assert held(players[0]) == held(players[1]), case
+                    outcomes.add(simulated.events[0][5])
+    assert outcomes == {ACQUIRED, REPLACED, KEPT, TOO_HEAVY}
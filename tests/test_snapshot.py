@@ -0,0 +1,49 @@
+import pytest
+
+from RPG import Battle, Player, readItems, generateEnemies, invalidateGear
+from rng import GameRandom
+from snapshot import Snapshots
+
+def startBattle(seed):
+    itemList = readItems()
+    rng = GameRandom(seed)
+    player = Player("Hero", rng)
+    player.equip(itemList[0][0])
+    player.equip(itemList[2][0])
+    battle = Battle(player, itemList[2][0], generateEnemies(itemList, rng = rng))
+    battle.startFight()
+    return battle
+
+@pytest.mark.parametrize("seed", [0, 12345, 2**63 - 1, 2**63, 2**64 - 1, -7])
+def testSeedRoundTrip(seed):
+    battle = startBattle(seed)
+    snapshots = Snapshots(readItems())
+    restored = snapshots.restore(snapshots.save(battle))
+    assert restored.rng.getstate()[1:] == battle.rng.getstate()[1:]
+    assert [restored.rng.randrange(0, 1000) for _ in range(50)] == [battle.rng.randrange(0, 1000) for _ in range(50)]
+
+def testOperatingSystemSeeds():
+    snapshots = Snapshots(readItems())
+    for _ in range(20):
+        battle = startBattle(None)
+        restored = snapshots.restore(snapshots.save(battle))
+        assert restored.rng.getstate() == battle.rng.getstate()
+
+def testRestoreAfterItemsChange():
+    battle = startBattle(5)
+    itemList = readItems()
+    snapshots = Snapshots(itemList)
+    data = snapshots.save(battle)
+    player, enemy = battle.player, battle.enemy()
+    weapon = itemList[0][0]
+    weapon.stat += 7
+    invalidateGear()
+    try:
+        restored = snapshots.restore(data)
+        assert restored.player.baseAttack == player.baseAttack
+        assert restored.player.baseDefense == player.baseDefense
+        assert restored.player.attack == player.baseAttack + weapon.stat
+        assert (restored.enemy().baseAttack, restored.enemy().baseDefense) == (enemy.baseAttack, enemy.baseDefense)
+    finally:
+        weapon.stat -= 7
+        invalidateGear()
@@ -0,0 +1,61 @@
+import random
+import shutil
+
+import pytest
+
+from RPG import Character
+from solver import solveTable
+from surrogate import SCALE, WinTable, buildTable
+
+pytest.importorskip("numpy")
+
+# No gear and no templates keep the table small: Character's own stat and health ranges.
+ITEMS = [[], [], []]
+
+@pytest.fixture(scope = "module")
+def table(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("surrogate") / "winrates.bin")
+    solved, copied = buildTable(path, ITEMS, [], healthStep = 20)
+    assert solved > 0 and copied == 0
+    table = WinTable(path)
+    yield table
+    table.close()
+
+def matchups(table, count):
+    """
+        Yields count random stat sets (player attack and defense, enemy attack and defense)
+        from Character's range, each with the exact FightTable for every health on the grid.
+    """
+    rng = random.Random(0)
+    top = table.health[-1]
+    for _ in range(count):
+        stats = [rng.randrange(*Character.STAT_RANGE) for _ in range(4)]
+        yield stats, solveTable(top, stats[0], stats[1], top, stats[2], stats[3])
+
+def testGridPointsMatchSolver(table):
+    for (attack, defense, enemyAttack, enemyDefense), exact in matchups(table, 6):
+        for playerHealth in table.health:
+            for enemyHealth in table.health:
+                for agility in (0, 1):
+                    estimate = table.winProbability(playerHealth, attack, defense, agility,
+                                                    enemyHealth, enemyAttack, enemyDefense, 1 - agility)
+                    # Only rounding to 16-bit fixed point separates a grid point from the exact answer.
+                    expected = exact.outcome(playerHealth, enemyHealth, agility == 1).winProbability
+                    assert abs(estimate - expected) <= 0.5 / SCALE + 1e-9
+
+def testInterpolationStaysClose(table):
+    errors = []
+    for (attack, defense, enemyAttack, enemyDefense), exact in matchups(table, 6):
+        for playerHealth in range(table.health[0], table.health[-1], 7):
+            for enemyHealth in range(table.health[0], table.health[-1], 7):
+                estimate = table.winProbability(playerHealth, attack, defense, 1, enemyHealth, enemyAttack, enemyDefense, 0)
+                errors.append(abs(estimate - exact.outcome(playerHealth, enemyHealth, True).winProbability))
+    assert sum(errors) / len(errors) < 0.03
+    assert max(errors) < 0.15
+
+def testRebuildCopiesEverything(table, tmp_path):
+    path = str(tmp_path / "winrates.bin")
+    shutil.copy(table.file.name, path)
+    solved, copied = buildTable(path, ITEMS, [], healthStep = 20)
+    assert solved == 0 and copied > 0
+    assert open(path, "rb").read() == open(table.file.name, "rb").read()
@@ -0,0 +1,69 @@
+import pytest
+
+from RPG import readItems, invalidateGear
+from rng import GameRandom
+from planner import copyBattle, playBattleWith
+from simulator import GreedyPolicy
+from tournament import generatePopulation, generateDungeon, runTournament
+
+@pytest.mark.parametrize("count", [100, 152, 40000])
+def testLargeCatalogs(tmp_path, count):
+    path = tmp_path / "Items.txt"
+    lines = [f"W, weapon{index}, {5 + index % 20}, {1 + index % 6}" for index in range(count)]
+    lines += [f"A, armor{index}, {5 + index % 20}, {1 + index % 6}" for index in range(count)]
+    lines.append("P, health potion, 50, 1")
+    path.write_text("\n".join(lines) + "\n")
+    itemList = readItems(str(path))
+    size = 2 * count + 1
+    population = generatePopulation(itemList, size, GameRandom(0))
+    assert list(population.start) == list(range(size))
+    assert population.weapon[count - 1] == count - 1
+    assert population.armor[2 * count - 1] == 2 * count - 1
+    runTournament(population, generateDungeon(itemList, 0), GameRandom(1))
+    # Heroes may have swapped gear for loot, but it is still looked up by index.
+    for index in (count - 1, 2 * count - 1):
+        hero = population.hero(index)
+        weapon, armor = population.weapon[index], population.armor[index]
+        assert hero.inventory.weapon is (population.items[weapon] if weapon >= 0 else None)
+        assert hero.inventory.armor is (population.items[armor] if armor >= 0 else None)
+
+def testColumnsHoldBaseStats():
+    itemList = readItems()
+    population = generatePopulation(itemList, 50, GameRandom(0))
+    runTournament(population, generateDungeon(itemList, 0), GameRandom(1))
+    weapon = population.items[population.weapon[0]]
+    base = population.attack[0]
+    assert population.hero(0).attack == base + weapon.stat
+    weapon.stat += 7
+    invalidateGear()
+    try:
+        hero = population.hero(0)
+        assert hero.baseAttack == base
+        assert hero.attack == base + weapon.stat
+    finally:
+        weapon.stat -= 7
+        invalidateGear()
+
+@pytest.mark.parametrize("dungeonSeed, waveSize", [(0, None), (1, None), (2, 6)])
+def testTournamentMatchesGreedyPlay(dungeonSeed, waveSize):
+    itemList = readItems()
+    dungeon = generateDungeon(itemList, dungeonSeed, waveSize = waveSize)
+    size = 300
+    rolls = GameRandom(dungeonSeed + 10)
+    population = generatePopulation(itemList, size, rolls)
+    heroes = [population.hero(index) for index in range(size)]
+    runTournament(population, dungeon, rolls)
+    # Waves can hold more fights than 16 bits count.
+    assert population.fightsWon.itemsize >= 4
+    # The same rolls: skip the stats drawn for the population, then play hero after hero.
+    rng = GameRandom(dungeonSeed + 10)
+    rng.values(size * 4)
+    policy = GreedyPolicy()
+    for index, hero in enumerate(heroes):
+        battle = copyBattle(hero, itemList[2][0], dungeon, rng)
+        won = playBattleWith(battle, policy)
+        player = battle.player
+        assert (population.fightsWon[index], population.won[index], population.health[index]) == \
+               (battle.index, 1 if won else 0, player.health), index
+        played = population.hero(index)
+        assert (played.attack, played.defense, played.weight) == (player.attack, player.defense, player.weight), index
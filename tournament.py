@@ -0,0 +1,307 @@
+"""
+    Measures the strength of builds across whole populations of heroes. A tournament creates
+    thousands (or millions) of heroes, each starting with one item from the catalog in turn,
+    and sends every one of them through the same dungeon: one enemy set generated from a
+    seed the way main() generates it, in one shuffled order. Heroes play like the
+    simulator's GreedyPolicy (heal below a threshold, take the strongest loot, replace gear
+    with stronger gear) and the results are gathered into per-item win rates and a ranking
+    of the heroes.
+
+    The population is stored column by column in arrays (health, attack, defense, agility,
+    weight, gear and results) rather than as one Player object per hero, which takes about
+    20 bytes per hero, so a 1M-hero tournament fits easily in memory. The fights follow the
+    rules of battle() and draw every roll from one GameRandom, hero after hero in the order
+    battle() rolls them, so a tournament is reproducible from its seeds.
+"""
+
+import argparse
+import heapq
+import time
+from array import array
+
+from RPG import Character, Player, Inventory, readItems, readEnemies, generateEnemies, generateWave, randomizeEnemyOrder
+from rng import GameRandom
+
+#------------------------------ Population ------------------------------
+
+class Population:
+    """
+        A population of heroes stored as columns. Column i of every array belongs to hero i.
+        weapon and armor hold the index of the item carried in items (-1 for none) and start
+        the index of the hero's starting item. attack and defense are the heroes' base stats,
+        without their gear's bonuses (which are looked up from items), so the columns stay
+        right when the items are reloaded. Item indexes (the columns with the type code
+        ITEM) take the smallest signed type that holds every index of items. won and
+        fightsWon are filled in by runTournament().
+    """
+    ITEM = None
+    COLUMNS = (("maxHealth", "h"), ("health", "h"), ("attack", "h"), ("defense", "h"), ("agility", "h"),
+               ("weight", "b"), ("weapon", ITEM), ("armor", ITEM), ("potions", "B"), ("start", ITEM),
+               ("fightsWon", "I"), ("won", "B"))
+
+    def __init__(self, items, size):
+        """
+            Creates a population of size heroes with every column 0, for the given items
+            (weapons, then armor, then potions, the order main() lists them in).
+        """
+        self.items = items
+        self.size = size
+        itemType = next(typecode for typecode in "bhil" if len(items) <= 1 << (8 * array(typecode).itemsize - 1))
+        for name, typecode in self.COLUMNS:
+            setattr(self, name, array(itemType if typecode is self.ITEM else typecode, [0]) * size)
+
+    def nbytes(self):
+        """
+            Returns the memory taken by the columns in bytes.
+        """
+        return sum(getattr(self, name).itemsize * self.size for name, _ in self.COLUMNS)
+
+    def hero(self, index, name = None):
+        """
+            Returns hero index as a Player (for display or to keep playing it).
+        """
+        player = Player.__new__(Player)
+        player.name = name or f"Hero {index}"
+        player.rng = None
+        player.MAX_HEALTH = self.maxHealth[index]
+        player.health = self.health[index]
+        player.agility = self.agility[index]
+        inventory = Inventory()
+        for slot in (self.weapon[index], self.armor[index]):
+            if slot >= 0:
+                inventory.add(self.items[slot])
+        potions = [item for item in self.items if item.kind == 'P']
+        for _ in range(self.potions[index]):
+            inventory.add(potions[0])
+        player.inventory = inventory
+        player.baseAttack = self.attack[index]
+        player.baseDefense = self.defense[index]
+        player.invalidateStats()
+        return player
+
+def generatePopulation(itemList, size, rng = None):
+    """
+        Creates a population of size heroes. Their stats are drawn in bulk from rng (a
+        GameRandom, seeded from the operating system by default) within Character's ranges
+        and hero i starts with item i modulo the number of items, equipped by the rules of
+        Player.addItem().
+    """
+    if rng is None:
+        rng = GameRandom()
+    items = itemList[0] + itemList[1] + itemList[2]
+    population = Population(items, size)
+    healthLow, healthHigh = Character.HEALTH_RANGE
+    statLow, statHigh = Character.STAT_RANGE
+    healthWidth = healthHigh - healthLow
+    statWidth = statHigh - statLow
+    values = rng.values(size * 4)
+    maxHealth, health, attack, defense, agility = (population.maxHealth, population.health, population.attack,
+                                                   population.defense, population.agility)
+    weight, weapon, armor, potions, start = (population.weight, population.weapon, population.armor,
+                                             population.potions, population.start)
+    for index in range(size):
+        position = index * 4
+        maxHealth[index] = health[index] = healthLow + (healthWidth * values[position] >> 32)
+        attack[index] = statLow + (statWidth * values[position + 1] >> 32)
+        defense[index] = statLow + (statWidth * values[position + 2] >> 32)
+        agility[index] = statLow + (statWidth * values[position + 3] >> 32)
+        weapon[index] = armor[index] = -1
+        itemIndex = index % len(items)
+        start[index] = itemIndex
+        item = items[itemIndex]
+        # Starting with nothing carried, an item is only refused if it is too heavy on its own.
+        if item.weight > Player.WEIGHT_LIMIT:
+            continue
+        if item.kind == 'W':
+            weapon[index] = itemIndex
+            weight[index] = item.weight
+        elif item.kind == 'A':
+            armor[index] = itemIndex
+            weight[index] = item.weight
+        else:
+            potions[index] = 1
+    return population
+
+def generateDungeon(itemList, seed = 0, roster = None, waveSize = None):
+    """
+        Returns the enemies every hero of a tournament fights, in the order they are fought:
+        one of each template in roster (Enemies.txt by default) generated from seed the way
+        main() generates them, or a wave of waveSize enemies.
+    """
+    if roster is None:
+        roster = readEnemies()
+    rng = GameRandom(seed)
+    if waveSize is None:
+        enemies = generateEnemies(itemList, roster, rng = rng)
+    else:
+        enemies = generateWave(itemList, roster, waveSize, rng = rng)
+    return randomizeEnemyOrder(enemies, rng)
+
+#------------------------------ Tournament ------------------------------
+
+def runTournament(population, dungeon, rng = None, threshold = 0.4):
+    """
+        Sends every hero of population through dungeon (a list of enemies in fight order) and
+        records how many fights each won, whether it won them all and the gear and health it
+        finished with. Heroes drink a potion below threshold (a fraction of their max health),
+        take the loot with the highest stat and replace gear with stronger gear. Every roll is
+        drawn from rng (a GameRandom, seeded from the operating system by default).
+    """
+    if rng is None:
+        rng = GameRandom()
+    randrange = rng.randrange
+    items = population.items
+    stats = [item.stat for item in items]
+    weights = [item.weight for item in items]
+    potionIndex = next(index for index, item in enumerate(items) if item.kind == 'P')
+    potionStat = items[potionIndex].stat
+    potionWeight = items[potionIndex].weight
+    itemIndexes = {item: index for index, item in enumerate(items)}
+    limit = Player.WEIGHT_LIMIT
+    # Each enemy as (health, attack, half its defense, agility, loot it drops as item indexes).
+    enemies = [(enemy.health, enemy.attack, enemy.defense // 2, enemy.agility,
+                [itemIndexes[item] for item in (enemy.weapon, enemy.armor) if item is not None])
+               for enemy in dungeon]
+    last = len(enemies) - 1
+    maxHealth, healthColumn, attackColumn, defenseColumn, agilityColumn = (population.maxHealth, population.health,
+        population.attack, population.defense, population.agility)
+    weightColumn, weaponColumn, armorColumn, potionColumn = (population.weight, population.weapon,
+                                                             population.armor, population.potions)
+    fightsWon, won = population.fightsWon, population.won
+
+    for hero in range(population.size):
+        health = healthColumn[hero]
+        weapon = weaponColumn[hero]
+        armor = armorColumn[hero]
+        attack = attackColumn[hero] + (stats[weapon] if weapon >= 0 else 0)
+        defense = defenseColumn[hero] + (stats[armor] if armor >= 0 else 0)
+        block = defense // 2
+        agility = agilityColumn[hero]
+        weight = weightColumn[hero]
+        potions = potionColumn[hero]
+        healBelow = maxHealth[hero] * threshold
+        fights = 0
+        for position, (enemyHealth, enemyAttack, enemyBlock, enemyAgility, drops) in enumerate(enemies):
+            playerTurn = agility >= enemyAgility
+            while health > 0 and enemyHealth > 0:
+                if playerTurn:
+                    if potions and health < healBelow:
+                        potions -= 1
+                        health = min(health + potionStat, maxHealth[hero])
+                    else:
+                        damage = int(attack * (randrange(5, 21) / 10)) - int(enemyBlock * (randrange(5, 21) / 10))
+                        if damage > 0:
+                            enemyHealth = max(enemyHealth - damage, 0)
+                else:
+                    damage = int(enemyAttack * (randrange(5, 21) / 10)) - int(block * (randrange(5, 21) / 10))
+                    if damage > 0:
+                        health = max(health - damage, 0)
+                playerTurn = not(playerTurn)
+            if health <= 0:
+                break
+            fights += 1
+            # Health potion roll (20% chance), drawn even when nothing can be looted.
+            dropsPotion = randrange(0, 10) > 7
+            if position == last or not(drops or dropsPotion):
+                continue
+            loot = drops + [potionIndex] if dropsPotion else drops
+            # The first item with the highest stat, as GreedyPolicy chooses.
+            best = loot[0]
+            for index in loot:
+                if stats[index] > stats[best]:
+                    best = index
+            if best == potionIndex:
+                if weight + potionWeight <= limit:
+                    potions += 1
+            elif items[best].kind == 'W':
+                if weapon < 0:
+                    if weight + weights[best] <= limit:
+                        weapon = best
+                        attack += stats[best]
+                        weight += weights[best]
+                elif weight - weights[weapon] + weights[best] <= limit and stats[best] > stats[weapon]:
+                    attack += stats[best] - stats[weapon]
+                    weight += weights[best] - weights[weapon]
+                    weapon = best
+            else:
+                if armor < 0:
+                    if weight + weights[best] <= limit:
+                        armor = best
+                        defense += stats[best]
+                        weight += weights[best]
+                elif weight - weights[armor] + weights[best] <= limit and stats[best] > stats[armor]:
+                    defense += stats[best] - stats[armor]
+                    weight += weights[best] - weights[armor]
+                    armor = best
+                block = defense // 2
+        healthColumn[hero] = health
+        weightColumn[hero] = weight
+        weaponColumn[hero] = weapon
+        armorColumn[hero] = armor
+        potionColumn[hero] = potions
+        fightsWon[hero] = fights
+        won[hero] = 1 if health > 0 else 0
+    return population
+
+def itemWinRates(population):
+    """
+        Returns (item, heroes, wins, win rate) for every starting item, best first.
+    """
+    heroes = [0] * len(population.items)
+    wins = [0] * len(population.items)
+    for start, won in zip(population.start, population.won):
+        heroes[start] += 1
+        wins[start] += won
+    rows = [(item, heroes[index], wins[index], wins[index] / heroes[index] if heroes[index] else 0.0)
+            for index, item in enumerate(population.items)]
+    return sorted(rows, key = lambda row: -row[3])
+
+def rankings(population, count = 10):
+    """
+        Returns the indexes of the count best heroes: those who won the most fights, with the
+        most health left breaking ties.
+    """
+    fightsWon = population.fightsWon
+    health = population.health
+    return heapq.nlargest(count, range(population.size), key = lambda hero: (fightsWon[hero], health[hero]))
+
+#------------------------------ Main ------------------------------
+
+def main():
+    """
+        Runs a tournament from the command line and prints the per-item win rates and the
+        best heroes.
+    """
+    parser = argparse.ArgumentParser(description = "Run a population of heroes through one dungeon.")
+    parser.add_argument("--heroes", type = int, default = 100000, help = "number of heroes")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the heroes' stats and rolls")
+    parser.add_argument("--dungeon", type = int, default = 0, help = "seed of the dungeon's enemies")
+    parser.add_argument("--wave", type = int, help = "fight a wave of this many enemies instead of one of each")
+    parser.add_argument("--threshold", type = float, default = 0.4, help = "heal below this fraction of max health")
+    parser.add_argument("--top", type = int, default = 10, help = "number of heroes to rank")
+    args = parser.parse_args()
+
+    itemList = readItems()
+    dungeon = generateDungeon(itemList, args.dungeon, waveSize = args.wave)
+    rng = GameRandom(args.seed)
+    start = time.perf_counter()
+    population = generatePopulation(itemList, args.heroes, rng)
+    runTournament(population, dungeon, rng, args.threshold)
+    elapsed = time.perf_counter() - start
+
+    print(f"Dungeon: {', '.join(enemy.name for enemy in dungeon[:10])}{', ...' if len(dungeon) > 10 else ''}")
+    print(f"\n{'Starting item':<16}{'heroes':>10}{'wins':>10}{'win rate':>10}")
+    for item, heroes, wins, rate in itemWinRates(population):
+        print(f"{item.name.capitalize():<16}{heroes:>10,}{wins:>10,}{rate:>10.4f}")
+    print(f"\n{'Hero':<12}{'start':<16}{'fights':>7}{'health':>8}{'attack':>8}{'defense':>8}{'agility':>8}")
+    for hero in rankings(population, args.top):
+        player = population.hero(hero)
+        print(f"{hero:<12}{population.items[population.start[hero]].name.capitalize():<16}{population.fightsWon[hero]:>7}"
+              f"{player.health:>8}{player.attack:>8}{player.defense:>8}{player.agility:>8}")
+    wins = sum(population.won)
+    print(f"\nHeroes: {population.size:,}, Wins: {wins:,}, Win rate: {wins / population.size if population.size else 0:.4f}")
+    print(f"Columns: {population.nbytes() / 1e6:.1f} MB")
+    print(f"Elapsed: {elapsed:.2f}s ({population.size / elapsed if elapsed else 0:,.0f} heroes per second)")
+
+if __name__ == "__main__":
+    main()